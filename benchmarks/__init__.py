@@ -0,0 +1,29 @@
+"""Offline micro-benchmarks for the hot paths of the jobs collection, one module per benchmarked area.
+
+Usage: python -m benchmarks {dedup,parsers,backends,suite,replay,http,browser,sheets,startup}
+
+The 'suite' runs the parsers and the processor against result pages of several sizes (built from the sample pages
+in 'tests/fixtures'), reports cards/sec and peak memory, and can save/compare a JSON baseline:
+
+    python -m benchmarks suite --save-baseline benchmark-baseline.json
+    python -m benchmarks suite --baseline benchmark-baseline.json  # exits with 1 on regression
+
+The 'replay' runs 'Program.execute' end-to-end for each site, with the pages served by the ReplayDriver.
+
+The 'http' runs 'Program.execute' for each site with the HttpCollector, against local HTTP server serving the pages
+(at several concurrency limits).
+
+The 'browser' loads live page (requires Chrome) with and without the resource-blocking profile, and reports the
+page-load timings, the transferred bytes and the JS heap size.
+
+The 'sheets' measures the Google Sheets uploads rows/sec against a local worksheet stand-in, simulating the request
+latency and quota errors.
+
+The 'startup' times the '--version' of each console script in a new interpreter and lists the heavy modules (e.g.
+selenium, gspread, pkg_resources) imported before the run starts:
+
+    python -m benchmarks startup --max-startup-seconds 0.3  # exits with 1 if any is slower
+"""
+
+# the benchmark modules are imported on use (the CLI is in the __main__ module)
+__all__ = ["browser", "dedup", "fixtures", "http_collection", "parsers", "replay", "sheets", "startup", "suite"]
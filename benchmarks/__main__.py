@@ -0,0 +1,114 @@
+import argparse
+import sys
+
+from benchmarks.browser import report_browser
+from benchmarks.dedup import bench_dedup, report_dedup
+from benchmarks.fixtures import REPLAY_PAGES
+from benchmarks.http_collection import report_http
+from benchmarks.parsers import report_backends, report_parsers
+from benchmarks.replay import report_replay
+from benchmarks.sheets import report_sheets
+from benchmarks.startup import report_startup
+from benchmarks.suite import (DEFAULT_PAGE_SIZES, DEFAULT_TOLERANCE, find_regressions, load_baseline,
+                              report_suite, run_suite, save_baseline)
+from scrape_jobs import chrome
+from scrape_jobs.base.html_parsing import BACKENDS
+from scrape_jobs.seek import SeekPage
+
+
+def parse_args(args):
+    parser = argparse.ArgumentParser(description="Run offline 'scrape-jobs' micro-benchmarks.")
+    parser.add_argument(dest="benchmark",
+                        choices=["dedup", "parsers", "backends", "suite", "replay", "http", "browser", "sheets",
+                                 "startup"],
+                        help="benchmark to run")
+    parser.add_argument("--results", dest="results", type=int, default=12000,
+                        help="total results to simulate (dedup) / rows to upload (sheets)")
+    parser.add_argument("--backend", dest="backend", choices=sorted(BACKENDS),
+                        help="html parsing backend (suite, replay, http)")
+    parser.add_argument("--sizes", dest="sizes", type=int, nargs="+", default=list(DEFAULT_PAGE_SIZES),
+                        help="cards per page (suite)")
+    parser.add_argument("--min-seconds", dest="min_seconds", type=float, default=0.5,
+                        help="minimum measuring time per case (suite)")
+    parser.add_argument("--baseline", dest="baseline", help="compare against baseline JSON file (suite)")
+    parser.add_argument("--save-baseline", dest="save_baseline", help="save results as baseline JSON file (suite)")
+    parser.add_argument("--tolerance", dest="tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed cards/sec drop ratio before failing (suite)")
+    parser.add_argument("--pages", dest="pages", type=int, default=10,
+                        help="result pages to replay / serve (replay, http)")
+    parser.add_argument("--latency", dest="latency", type=float, default=0.0,
+                        help="simulated page load (replay, http) / request (sheets) seconds")
+    parser.add_argument("--incremental", dest="incremental", action="store_true",
+                        help="use incremental in-browser extraction (replay)")
+    parser.add_argument("--streaming", dest="streaming", action="store_true",
+                        help="filter, process and store the jobs batch by batch (replay)")
+    parser.add_argument("--rerun", dest="rerun", action="store_true",
+                        help="measure a second run, with all of the jobs already stored (replay)")
+    parser.add_argument("--stop-after-known-pages", dest="stop_after_known_pages", type=int, default=0,
+                        help="stop after this many consecutive pages with only stored jobs (replay)")
+    parser.add_argument("--url-search", dest="url_search", action="store_true",
+                        help="open the results pages by url, where supported (replay)")
+    parser.add_argument("--concurrency", dest="concurrency", type=int, default=4,
+                        help="max pages requested at once, compared with 1 (http)")
+    parser.add_argument("--url", dest="url", default=SeekPage.build_results_url(REPLAY_PAGES["seek.com.au"][1], 1),
+                        help="page to load (browser)")
+    parser.add_argument("--loads", dest="loads", type=int, default=5, help="loads per profile (browser)")
+    parser.add_argument("--block-resources", dest="block_resources", nargs="*", default=["image", "font", "media"],
+                        choices=sorted(chrome.RESOURCE_URL_PATTERNS), help="blocked resource types (browser)")
+    parser.add_argument("--block-domains", dest="block_domains", nargs="*", default=[],
+                        help="blocked domains (browser)")
+    parser.add_argument("--allow-domains", dest="allow_domains", nargs="*", default=[],
+                        help="the only reachable domains (browser)")
+    parser.add_argument("--quota-every", dest="quota_every", type=int, default=0,
+                        help="fail every n-th request with quota error (sheets)")
+    parser.add_argument("--runs", dest="runs", type=int, default=5, help="runs per console script (startup)")
+    parser.add_argument("--max-startup-seconds", dest="max_startup_seconds", type=float,
+                        help="fail if the median startup of any console script is slower (startup)")
+    return parser.parse_args(args)
+
+
+def main(call_args):
+    args = parse_args(call_args)
+    if args.benchmark == "dedup":
+        print(report_dedup(bench_dedup(total_results=args.results)))
+    elif args.benchmark == "parsers":
+        print(report_parsers())
+    elif args.benchmark == "backends":
+        print(report_backends())
+    elif args.benchmark == "replay":
+        print(report_replay(args.pages,
+                            args.latency,
+                            streaming=args.streaming,
+                            rerun=args.rerun,
+                            backend=args.backend,
+                            incremental=args.incremental,
+                            stop_after_known_pages=args.stop_after_known_pages,
+                            url_search=args.url_search))
+    elif args.benchmark == "http":
+        print(report_http(args.pages, args.latency, args.concurrency, backend=args.backend))
+    elif args.benchmark == "browser":
+        print(report_browser(args.url, args.loads, args.block_resources, args.block_domains, args.allow_domains))
+    elif args.benchmark == "sheets":
+        print(report_sheets(args.results, args.latency or 0.05, args.quota_every))
+    elif args.benchmark == "startup":
+        table, slow = report_startup(args.runs, args.max_startup_seconds)
+        print(table)
+        if slow:
+            print(f"\nSLOW STARTUP (median above {args.max_startup_seconds} s.): {', '.join(slow)}")
+            return 1
+    elif args.benchmark == "suite":
+        results = run_suite(page_sizes=args.sizes, min_seconds=args.min_seconds, backend=args.backend)
+        baseline = load_baseline(args.baseline) if args.baseline else None
+        print(report_suite(results, baseline))
+        if args.save_baseline:
+            save_baseline(results, args.save_baseline)
+        if baseline:
+            regressions = find_regressions(results, baseline, args.tolerance)
+            if regressions:
+                print(f"\nREGRESSIONS (cards/sec dropped more than {args.tolerance:.0%}): {', '.join(regressions)}")
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
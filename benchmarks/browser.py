@@ -0,0 +1,76 @@
+"""Live page loads in headless Chrome, with and without the resource-blocking profile"""
+
+import statistics
+from time import perf_counter
+from typing import Any, Dict, Sequence
+
+from tabulate import tabulate
+
+from scrape_jobs import chrome
+
+__all__ = ["bench_browser", "report_browser"]
+
+PAGE_STATS_SCRIPT = """
+var navigation = performance.getEntriesByType("navigation")[0] || {};
+var resources = performance.getEntriesByType("resource");
+var transferred = navigation.transferSize || 0;
+resources.forEach(function (entry) { transferred += entry.transferSize || 0; });
+return {"dom_content_loaded": (navigation.domContentLoadedEventEnd || 0) / 1000,
+        "resources": resources.length,
+        "transferred": transferred,
+        "heap": performance.memory ? performance.memory.usedJSHeapSize : 0};
+"""
+
+
+def bench_browser(url: str,
+                  loads=5,
+                  block_resources: Sequence[str] = (),
+                  block_domains: Sequence[str] = (),
+                  allow_domains: Sequence[str] = ()) -> Dict[str, Any]:
+    """Load the url 'loads' times in headless Chrome (with disabled cache) having the given resource-blocking profile"""
+
+    driver = chrome.create_driver(True,
+                                  block_resources=block_resources,
+                                  block_domains=block_domains,
+                                  allow_domains=allow_domains)
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": True})
+        load_seconds = []
+        stats = []
+        for _ in range(loads):
+            start_time = perf_counter()
+            driver.get(url)
+            load_seconds.append(perf_counter() - start_time)
+            stats.append(driver.execute_script(PAGE_STATS_SCRIPT))
+    finally:
+        driver.quit()
+
+    return {"median_load_seconds": statistics.median(load_seconds),
+            "max_load_seconds": max(load_seconds),
+            "dom_content_loaded": statistics.median(item["dom_content_loaded"] for item in stats),
+            "resources": statistics.median(item["resources"] for item in stats),
+            "transferred_kib": statistics.median(item["transferred"] for item in stats) / 1024,
+            "heap_mib": statistics.median(item["heap"] for item in stats) / 1024 / 1024}
+
+
+def report_browser(url: str,
+                   loads: int,
+                   block_resources: Sequence[str],
+                   block_domains: Sequence[str],
+                   allow_domains: Sequence[str]) -> str:
+    rows = []
+    for name, profile in [("none", {}),
+                          ("blocking", {"block_resources": block_resources,
+                                        "block_domains": block_domains,
+                                        "allow_domains": allow_domains})]:
+        result = bench_browser(url, loads=loads, **profile)
+        rows.append([name,
+                     f"{result['median_load_seconds']:.2f}",
+                     f"{result['max_load_seconds']:.2f}",
+                     f"{result['dom_content_loaded']:.2f}",
+                     f"{result['resources']:.0f}",
+                     f"{result['transferred_kib']:,.0f}",
+                     f"{result['heap_mib']:.1f}"])
+    return tabulate(rows, headers=["PROFILE", "MEDIAN LOAD SEC", "MAX LOAD SEC", "DOM READY SEC", "RESOURCES",
+                                   "TRANSFERRED KiB", "JS HEAP MiB"])
@@ -0,0 +1,44 @@
+"""Cost of the de-duplication of the collected jobs over a long pagination session"""
+
+from time import perf_counter
+from typing import List
+
+from tabulate import tabulate
+
+from benchmarks.fixtures import make_job
+from scrape_jobs.base.data_collection import filter_unknown_jobs
+
+__all__ = ["bench_dedup", "report_dedup"]
+
+
+def bench_dedup(total_results=12000, page_size=25, overlap=5) -> List[float]:
+    """Simulate a long pagination session and return the seconds spent de-duplicating at each iteration.
+
+    Every simulated page holds 'page_size' new results plus 'overlap' results seen on the previous page,
+    every 10th result has no url (de-duplicated by fingerprint).
+    """
+
+    known_identities = set()
+    timings = []
+    number = 0
+    while number < total_results:
+        repeated = [make_job(n, with_url=bool(n % 10)) for n in range(max(0, number - overlap), number)]
+        fresh = [make_job(n, with_url=bool(n % 10)) for n in range(number, number + page_size)]
+        number += page_size
+
+        start_time = perf_counter()
+        filter_unknown_jobs(repeated + fresh, known_identities)
+        timings.append(perf_counter() - start_time)
+
+    return timings
+
+
+def report_dedup(timings: List[float]) -> str:
+    window = max(1, len(timings) // 10)
+    first, last = timings[:window], timings[-window:]
+    first_avg, last_avg = sum(first) / len(first), sum(last) / len(last)
+    rows = [["iterations", len(timings)],
+            ["first 10% avg (ms)", f"{first_avg * 1000:.4f}"],
+            ["last 10% avg (ms)", f"{last_avg * 1000:.4f}"],
+            ["last / first", f"{last_avg / first_avg:.2f}"]]
+    return tabulate(rows, headers=["DEDUP", ""])
@@ -0,0 +1,96 @@
+"""Result pages of any size built from the sample pages in 'tests/fixtures', and generated jobs"""
+
+import copy
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Type
+
+from bs4 import BeautifulSoup, Comment
+
+from scrape_jobs.base.data_collection import JobParser
+from scrape_jobs.linkedin import LinkedinJob, LinkedinPage
+from scrape_jobs.replay import ADVANCE_SELECTORS
+from scrape_jobs.seek import SeekJob, SeekPage
+
+__all__ = ["FIXTURES", "REPLAY_PAGES", "load_fixture", "make_job", "make_page", "write_snapshots"]
+
+FIXTURES_DIR = Path(__file__).absolute().parent.parent.joinpath("tests", "fixtures")
+
+FIXTURES = {
+    "seek.com.au": (SeekJob, "seek_results.html"),
+    "linkedin.com": (LinkedinJob, "linkedin_results.html")
+}
+
+REPLAY_PAGES = {
+    "seek.com.au": (SeekPage, {"what": "Automation QA", "where": "All Sydney NSW"}),
+    "linkedin.com": (LinkedinPage, {"keywords": "Automation", "location": "Sofia", "date_posted": "Any Time"})
+}
+
+# every recorded seek page holds the next results page, linkedin pages keep growing with each 'see more jobs' click
+CUMULATIVE_SNAPSHOTS = {"linkedin.com"}
+
+_log = logging.getLogger(__name__)
+_log.addHandler(logging.NullHandler())
+
+
+def load_fixture(filename: str) -> str:
+    _log.debug("loading fixture: '%s'", filename)
+    return FIXTURES_DIR.joinpath(filename).read_text(encoding="utf-8")
+
+
+def make_job(number: int, with_url=True) -> Dict[str, Any]:
+    """Job with unique title and url (every 10th company and 50th location repeat), as collected by the parsers"""
+
+    return {"scraped_time": None,
+            "posted_time": None,
+            "location": f"Location {number % 50}",
+            "title": f"Title {number}",
+            "company": f"Company {number % 500}",
+            "url": f"https://example.com/job/{number}" if with_url else None}
+
+
+def make_page(parser_cls: Type[JobParser], filename: str, cards_count: int, first_number=0, last=False) -> str:
+    """Build result page with 'cards_count' unique job cards, by repeating the cards of the given fixture page.
+
+    The cards are numbered from 'first_number' (making their urls unique), the 'last' page has no 'next' controls.
+    """
+
+    parser = parser_cls()
+    soup = BeautifulSoup(load_fixture(filename), "lxml")
+    cards = parser.find_all(soup)
+    container = cards[0].parent
+    for card in cards:
+        card.extract()
+
+    if last:
+        for selector in ADVANCE_SELECTORS:
+            for element in soup.select(selector):
+                element.decompose()
+
+    url_selector = parser.FIELDS["url"].selector
+    cards_html = []
+    for number in range(first_number, first_number + cards_count):
+        card = copy.copy(cards[number % len(cards)])
+        link = card.select_one(url_selector)
+        path, separator, query = link["href"].partition("?")
+        link["href"] = f"{path}-{number}{separator}{query}"
+        cards_html.append(str(card))
+
+    container.append(Comment("cards"))
+    return str(soup).replace("<!--cards-->", "\n".join(cards_html))
+
+
+def write_snapshots(site: str, dst_dir: str, pages: int, cards_per_page: int, cumulative: bool = None) -> List[str]:
+    parser_cls, filename = FIXTURES[site]
+    cumulative = (site in CUMULATIVE_SNAPSHOTS) if cumulative is None else cumulative
+    filepaths = []
+    for page in range(pages):
+        html = make_page(parser_cls,
+                         filename,
+                         cards_per_page * (page + 1) if cumulative else cards_per_page,
+                         first_number=0 if cumulative else (page * cards_per_page),
+                         last=(page == pages - 1))
+        filepath = Path(dst_dir).joinpath(f"{page:04d}.html")
+        filepath.write_text(html, encoding="utf-8")
+        filepaths.append(str(filepath))
+    return filepaths
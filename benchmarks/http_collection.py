@@ -0,0 +1,125 @@
+"""End-to-end 'Program.execute' with the HttpCollector, against local HTTP server serving the result pages"""
+
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from socketserver import ThreadingMixIn
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Any, Dict, List
+from urllib.parse import parse_qs, urlsplit
+
+from tabulate import tabulate
+
+from benchmarks.fixtures import FIXTURES, REPLAY_PAGES, write_snapshots
+from scrape_jobs.base.data_processing import TimeProcessor
+from scrape_jobs.base.data_storage import CsvJobsStorage
+from scrape_jobs.base.http_collection import HttpCollector
+from scrape_jobs.linkedin import LinkedinPage
+from scrape_jobs.program import Program
+
+__all__ = ["bench_http", "FixtureServer", "report_http"]
+
+_log = logging.getLogger(__name__)
+_log.addHandler(logging.NullHandler())
+
+
+class FixtureServer(ThreadingMixIn, HTTPServer):
+    """Local HTTP server serving the given result pages by number, taken from the 'page=n' (or 'start=offset')
+    query of any path, sleeping 'latency' seconds per request. Pages past the last one are served without results.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, pages: List[str], latency=0.0, page_size=LinkedinPage.RESULTS_PER_PAGE):
+        self.pages = pages
+        self.latency = latency
+        self.page_size = page_size
+        self.requests = 0
+        self._thread = None  # type: threading.Thread
+        super().__init__(("127.0.0.1", 0), FixtureRequestHandler)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def get_page(self, query: str) -> str:
+        params = parse_qs(query)
+        if "page" in params:
+            index = int(params["page"][0]) - 1
+        else:
+            index = int(params.get("start", ["0"])[0]) // self.page_size
+        return self.pages[index] if 0 <= index < len(self.pages) else "<html><body></body></html>"
+
+    def __enter__(self) -> "FixtureServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="fixture-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+
+class FixtureRequestHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        server = self.server  # type: FixtureServer
+        server.requests += 1
+        time.sleep(server.latency)
+        body = server.get_page(urlsplit(self.path).query).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        _log.debug("fixture server: " + format, *args)
+
+
+def bench_http(site: str, pages=10, latency=0.0, concurrency=4, backend=None) -> Dict[str, Any]:
+    """Run 'Program.execute' with HttpCollector requesting the site's pages from FixtureServer, and CSV storage"""
+
+    page_cls, search_params = REPLAY_PAGES[site]
+    parser_cls, _ = FIXTURES[site]
+    with TemporaryDirectory() as tmp_dir:
+        snapshots = write_snapshots(site, tmp_dir, pages, LinkedinPage.RESULTS_PER_PAGE, cumulative=False)
+        html_pages = [Path(snapshot).read_text(encoding="utf-8") for snapshot in snapshots]
+        storage = CsvJobsStorage(parser_cls.KEYS, str(Path(tmp_dir).joinpath("jobs.csv")))
+        storage.init_file()
+        with FixtureServer(html_pages, latency=latency) as server:
+            def build_url(params: Dict[str, Any], page_number: int) -> str:
+                parts = urlsplit(page_cls.build_results_url(params, page_number))
+                return f"{server.url}{parts.path}?{parts.query}"
+
+            collector = HttpCollector([dict(search_params)],
+                                      build_url,
+                                      parser_cls(backend=backend),
+                                      36500,
+                                      3,
+                                      concurrency=concurrency)
+            program = Program(collector, TimeProcessor("UTC"), storage)
+
+            start_time = perf_counter()
+            program.execute()
+            elapsed = perf_counter() - start_time
+            collector.close()
+
+        return {"site": site,
+                "concurrency": concurrency,
+                "seconds": elapsed,
+                "requests": server.requests,
+                "stored": len(storage.get_known_jobs_urls())}
+
+
+def report_http(pages: int, latency: float, concurrency: int, backend: str = None) -> str:
+    rows = []
+    for site in REPLAY_PAGES:
+        for limit in sorted({1, concurrency}):
+            result = bench_http(site, pages=pages, latency=latency, concurrency=limit, backend=backend)
+            rows.append([site, limit, result["requests"], result["stored"], f"{result['seconds']:.2f}"])
+    return tabulate(rows, headers=["SITE", "CONCURRENCY", "REQUESTS", "STORED JOBS", "SECONDS"])
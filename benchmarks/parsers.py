@@ -0,0 +1,67 @@
+"""Job cards parsing throughput of each site parser and html parsing backend"""
+
+from time import perf_counter
+from typing import Type
+
+from tabulate import tabulate
+
+from benchmarks.fixtures import FIXTURES, load_fixture
+from scrape_jobs.base.data_collection import JobParser
+from scrape_jobs.base.html_parsing import BACKENDS
+
+__all__ = ["bench_page", "bench_parse", "report_backends", "report_parsers"]
+
+
+def bench_parse(parser_cls: Type[JobParser], html: str, min_seconds=1.0, backend: str = None) -> float:
+    """Parse the job cards found in the html page until 'min_seconds' elapse, then return the cards per second"""
+
+    parser = parser_cls(backend=backend)
+    tags = parser.find_all(parser.parse_document(html))
+    if not tags:
+        raise ValueError("No job cards in the given html!", parser_cls.__name__)
+
+    parsed_count = 0
+    start_time = perf_counter()
+    while True:
+        for tag in tags:
+            parser.parse(tag)
+        parsed_count += len(tags)
+        elapsed = perf_counter() - start_time
+        if elapsed >= min_seconds:
+            return parsed_count / elapsed
+
+
+def report_parsers(min_seconds=1.0) -> str:
+    rows = []
+    for site, (parser_cls, filename) in FIXTURES.items():
+        cards_per_second = bench_parse(parser_cls, load_fixture(filename), min_seconds=min_seconds)
+        rows.append([site, parser_cls.__name__, f"{cards_per_second:.0f}"])
+    return tabulate(rows, headers=["SITE", "PARSER", "CARDS/SEC"])
+
+
+def bench_page(parser_cls: Type[JobParser], html: str, min_seconds=1.0, backend: str = None) -> float:
+    """Same as 'bench_parse', but parsing the whole page (document, cards lookup and fields) on each round"""
+
+    parser = parser_cls(backend=backend)
+    parsed_count = 0
+    start_time = perf_counter()
+    while True:
+        tags = parser.find_all(parser.parse_document(html))
+        for tag in tags:
+            parser.parse(tag)
+        parsed_count += len(tags)
+        elapsed = perf_counter() - start_time
+        if elapsed >= min_seconds:
+            return parsed_count / elapsed
+
+
+def report_backends(min_seconds=1.0) -> str:
+    rows = []
+    for site, (parser_cls, filename) in FIXTURES.items():
+        html = load_fixture(filename)
+        for name in BACKENDS:
+            rows.append([site,
+                         name,
+                         f"{bench_page(parser_cls, html, min_seconds=min_seconds, backend=name):.0f}",
+                         f"{bench_parse(parser_cls, html, min_seconds=min_seconds, backend=name):.0f}"])
+    return tabulate(rows, headers=["SITE", "BACKEND", "PAGE CARDS/SEC", "PARSE CARDS/SEC"])
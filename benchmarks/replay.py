@@ -0,0 +1,62 @@
+"""End-to-end 'Program.execute' with the result pages served by the ReplayDriver"""
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Any, Dict
+
+from hed_utils.selenium import SharedDriver
+from tabulate import tabulate
+
+from benchmarks.fixtures import FIXTURES, REPLAY_PAGES, write_snapshots
+from scrape_jobs.base.data_processing import TimeProcessor
+from scrape_jobs.base.data_storage import CsvJobsStorage
+from scrape_jobs.program import Program
+from scrape_jobs.replay import ReplayDriver
+
+__all__ = ["bench_replay", "report_replay"]
+
+
+def bench_replay(site: str,
+                 pages=10,
+                 cards_per_page=25,
+                 latency=0.0,
+                 streaming=False,
+                 rerun=False,
+                 **page_kwargs) -> Dict[str, Any]:
+    """Run 'Program.execute' with the site's Page served by ReplayDriver and CSV storage in temp folder.
+
+    With 'rerun' the program is executed once more with the jobs already stored and only the second run is measured.
+    """
+
+    page_cls, search_params = REPLAY_PAGES[site]
+    parser_cls, _ = FIXTURES[site]
+    with TemporaryDirectory() as tmp_dir:
+        snapshots = write_snapshots(site, tmp_dir, pages, cards_per_page)
+        storage = CsvJobsStorage(parser_cls.KEYS, str(Path(tmp_dir).joinpath("jobs.csv")))
+        storage.init_file()
+        try:
+            for _ in range(2 if rerun else 1):
+                driver = ReplayDriver(snapshots, latency=latency)
+                SharedDriver.set_instance(driver)
+                page = page_cls(dict(search_params), 36500, 3, **page_kwargs)
+                program = Program(page, TimeProcessor("UTC"), storage, streaming=streaming)
+
+                start_time = perf_counter()
+                program.execute()
+                elapsed = perf_counter() - start_time
+
+            return {"site": site,
+                    "seconds": elapsed,
+                    "page_loads": driver.page_loads,
+                    "stored": len(storage.get_known_jobs_urls())}
+        finally:
+            SharedDriver.set_instance(None)
+
+
+def report_replay(pages: int, latency: float, streaming=False, rerun=False, **page_kwargs) -> str:
+    rows = []
+    for site in REPLAY_PAGES:
+        result = bench_replay(site, pages=pages, latency=latency, streaming=streaming, rerun=rerun, **page_kwargs)
+        rows.append([site, result["page_loads"], result["stored"], f"{result['seconds']:.2f}"])
+    return tabulate(rows, headers=["SITE", "PAGE LOADS", "STORED JOBS", "SECONDS"])
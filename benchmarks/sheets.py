@@ -0,0 +1,106 @@
+"""Google Sheets uploads against a local worksheet stand-in, with simulated latency and quota errors"""
+
+import time
+from time import perf_counter
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+from tabulate import tabulate
+
+from scrape_jobs.base.data_storage import SheetsUploader
+
+__all__ = ["bench_sheets", "LocalWorksheet", "report_sheets"]
+
+
+class QuotaExceededError(Exception):
+    """Mimics the gspread APIError raised on 'RESOURCE_EXHAUSTED' responses"""
+
+    def __init__(self):
+        super().__init__("Quota exceeded (simulated)")
+        self.response = SimpleNamespace(status_code=429)
+
+
+class LocalWorksheet:
+    """In-memory stand-in for the gspread Worksheet methods used by the uploads.
+
+    Each request sleeps 'latency' seconds, and every 'quota_every'-th request fails with quota error.
+    """
+
+    def __init__(self, latency=0.05, quota_every=0):
+        self.latency = latency
+        self.quota_every = quota_every
+        self.requests = 0
+        self.row_count = 100
+        self.cells = {}
+
+    def _request(self):
+        self.requests += 1
+        time.sleep(self.latency)
+        if self.quota_every and (self.requests % self.quota_every == 0):
+            raise QuotaExceededError()
+
+    def col_values(self, col: int) -> List[str]:
+        self._request()
+        rows = [row for (row, cell_col) in self.cells if cell_col == col]
+        return [self.cells[(row, col)] for row in range(1, max(rows, default=0) + 1)]
+
+    def add_rows(self, rows: int):
+        self._request()
+        self.row_count += rows
+
+    def update_cells(self, cells: List[Any]):
+        self._request()
+        for cell in cells:
+            self.cells[(cell.row, cell.col)] = cell.value
+
+
+def bench_sheets(rows=5000,
+                 batch_size=250,
+                 chunk_size=500,
+                 latency=0.05,
+                 quota_every=0,
+                 write_behind=False) -> Dict[str, Any]:
+    """Upload 'rows' in batches of 'batch_size' (one batch per collected page) to LocalWorksheet"""
+
+    worksheet = LocalWorksheet(latency=latency, quota_every=quota_every)
+    uploader = SheetsUploader(worksheet,
+                              chunk_size=chunk_size,
+                              max_retries=5,
+                              backoff_seconds=latency,
+                              write_behind=write_behind)
+    values = [[f"job #{number}", f"https://example.com/jobs/{number}"] for number in range(rows)]
+
+    blocked = 0.0
+    start_time = perf_counter()
+    for start in range(0, rows, batch_size):
+        upload_start = perf_counter()
+        uploader.upload(values[start:start + batch_size])
+        blocked += perf_counter() - upload_start
+    uploader.flush()
+    elapsed = perf_counter() - start_time
+
+    assert uploader.uploaded_rows == rows, f"uploaded {uploader.uploaded_rows} of {rows} rows!"
+    return {"chunk_size": chunk_size,
+            "write_behind": write_behind,
+            "requests": worksheet.requests,
+            "retries": uploader.retries,
+            "rows_per_sec": rows / elapsed,
+            "blocked_seconds": blocked}
+
+
+def report_sheets(rows: int, latency: float, quota_every: int, chunk_sizes=(100, 500, 2000)) -> str:
+    data = []
+    for chunk_size in chunk_sizes:
+        for write_behind in (False, True):
+            result = bench_sheets(rows=rows,
+                                  chunk_size=chunk_size,
+                                  latency=latency,
+                                  quota_every=quota_every,
+                                  write_behind=write_behind)
+            data.append([chunk_size,
+                         "yes" if write_behind else "no",
+                         result["requests"],
+                         result["retries"],
+                         f"{result['rows_per_sec']:,.0f}",
+                         f"{result['blocked_seconds']:.2f}"])
+    return tabulate(data, headers=["CHUNK SIZE", "WRITE BEHIND", "REQUESTS", "RETRIES", "ROWS/SEC", "BLOCKED SECONDS"])
@@ -0,0 +1,68 @@
+"""Startup time of the console scripts, and the heavy modules they import before the run starts"""
+
+import statistics
+import subprocess
+import sys
+from time import perf_counter
+from typing import Any, Dict, List, Sequence, Tuple
+
+from tabulate import tabulate
+
+__all__ = ["bench_startup", "HEAVY_MODULES", "report_startup", "STARTUP_COMMANDS"]
+
+STARTUP_COMMANDS = {
+    "scrape-jobs": "scrape_jobs.cli.jobs_scraper",
+    "scrape-jobs-init-config": "scrape_jobs.cli.config_initializer",
+    "scrape-jobs-compact-csv": "scrape_jobs.cli.csv_compactor",
+    "scrape-jobs-daemon": "scrape_jobs.cli.jobs_daemon"
+}
+
+# modules that are needed only once the run starts, so should not be imported for '--version' / '--help'
+HEAVY_MODULES = ("pkg_resources", "selenium", "hed_utils", "gspread", "bs4", "lxml", "tabulate")
+
+STARTUP_SCRIPT = """
+import sys
+from {module} import run
+try:
+    run()
+except SystemExit:
+    pass
+print(",".join(name for name in {heavy_modules!r} if name in sys.modules), file=sys.stderr)
+"""
+
+
+def bench_startup(command: str, args: Sequence[str] = ("--version",), runs=5) -> Dict[str, Any]:
+    """Time the startup of the console script in new interpreter, and list the heavy modules it imported"""
+
+    script = STARTUP_SCRIPT.format(module=STARTUP_COMMANDS[command], heavy_modules=HEAVY_MODULES)
+    timings = []
+    heavy_modules = []
+    for _ in range(runs):
+        start_time = perf_counter()
+        result = subprocess.run([sys.executable, "-c", script, *args],
+                                stdout=subprocess.DEVNULL,
+                                stderr=subprocess.PIPE,
+                                universal_newlines=True)
+        timings.append(perf_counter() - start_time)
+        lines = result.stderr.strip().splitlines()
+        heavy_modules = [name for name in (lines[-1] if lines else "").split(",") if name]
+
+    return {"median_seconds": statistics.median(timings),
+            "min_seconds": min(timings),
+            "heavy_modules": heavy_modules}
+
+
+def report_startup(runs: int, max_seconds: float = None) -> Tuple[str, List[str]]:
+    """Report the startup of each console script and the ones slower than 'max_seconds' (median) if given"""
+
+    rows = []
+    slow = []
+    for command in STARTUP_COMMANDS:
+        result = bench_startup(command, runs=runs)
+        rows.append([f"{command} --version",
+                     f"{result['median_seconds']:.3f}",
+                     f"{result['min_seconds']:.3f}",
+                     ", ".join(result["heavy_modules"]) or "-"])
+        if max_seconds and result["median_seconds"] > max_seconds:
+            slow.append(command)
+    return tabulate(rows, headers=["COMMAND", "MEDIAN SECONDS", "MIN SECONDS", "HEAVY MODULES"]), slow
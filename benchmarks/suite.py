@@ -0,0 +1,128 @@
+"""Parsers and processor throughput and peak memory at several page sizes, compared with a saved baseline"""
+
+import json
+import logging
+import tracemalloc
+from collections import namedtuple
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, List
+
+from tabulate import tabulate
+
+from benchmarks.fixtures import FIXTURES, make_page
+from scrape_jobs.base.data_processing import TimeProcessor
+
+__all__ = ["CaseResult", "find_regressions", "load_baseline", "report_suite", "run_suite", "save_baseline"]
+
+DEFAULT_PAGE_SIZES = (25, 100, 500)
+DEFAULT_TOLERANCE = 0.25
+
+CaseResult = namedtuple("CaseResult", "name cards cards_per_sec peak_memory_kib")
+
+_log = logging.getLogger(__name__)
+_log.addHandler(logging.NullHandler())
+
+
+def measure(func: Callable[[], int], min_seconds: float) -> float:
+    """Call 'func' (returning the count of processed cards) until 'min_seconds' elapse, then return cards/sec"""
+
+    count = 0
+    start_time = perf_counter()
+    while True:
+        count += func()
+        elapsed = perf_counter() - start_time
+        if elapsed >= min_seconds:
+            return count / elapsed
+
+
+def measure_peak_memory(func: Callable[[], int]) -> float:
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def get_suite_cases(page_sizes=DEFAULT_PAGE_SIZES, backend: str = None):
+    """Yield (name, cards_count, func) for every benchmarked operation and page size"""
+
+    processor = TimeProcessor("Australia/Sydney")
+
+    for site, (parser_cls, filename) in FIXTURES.items():
+        for size in page_sizes:
+            html = make_page(parser_cls, filename, size)
+            parser = parser_cls(backend=backend)
+            document = parser.parse_document(html)
+            tags = parser.find_all(document)
+            jobs = [parser.parse(tag) for tag in tags]
+
+            def parse_cards(_parser=parser, _tags=tags):
+                for tag in _tags:
+                    _parser.parse(tag)
+                return len(_tags)
+
+            def find_all(_parser=parser, _document=document):
+                return len(_parser.find_all(_document))
+
+            def find_new(_parser=parser, _document=document):
+                _parser.known_identities.clear()
+                return len(_parser.find_new(_document))
+
+            def process_jobs(_jobs=jobs):
+                return len(processor.process_jobs([dict(job) for job in _jobs]))
+
+            prefix = f"{parser_cls.__name__}[{parser.backend.NAME}]"
+            yield f"{prefix}.parse[{size}]", size, parse_cards
+            yield f"{prefix}.find_all[{size}]", size, find_all
+            yield f"{prefix}.find_new[{size}]", size, find_new
+            yield f"TimeProcessor.process_jobs[{site}][{size}]", size, process_jobs
+
+
+def run_suite(page_sizes=DEFAULT_PAGE_SIZES, min_seconds=0.5, backend: str = None) -> List[CaseResult]:
+    results = []
+    for name, cards, func in get_suite_cases(page_sizes, backend):
+        _log.debug("running benchmark case: %s", name)
+        results.append(CaseResult(name=name,
+                                  cards=cards,
+                                  cards_per_sec=measure(func, min_seconds),
+                                  peak_memory_kib=measure_peak_memory(func)))
+    return results
+
+
+def save_baseline(results: List[CaseResult], filepath: str):
+    _log.info("saving benchmark baseline to: '%s'", filepath)
+    data = {result.name: result._asdict() for result in results}
+    Path(filepath).write_text(json.dumps(data, indent=4, sort_keys=True), encoding="utf-8")
+
+
+def load_baseline(filepath: str) -> Dict[str, Dict[str, Any]]:
+    _log.info("loading benchmark baseline from: '%s'", filepath)
+    return json.loads(Path(filepath).read_text(encoding="utf-8"))
+
+
+def find_regressions(results: List[CaseResult],
+                     baseline: Dict[str, Dict[str, Any]],
+                     tolerance=DEFAULT_TOLERANCE) -> List[str]:
+    """Return the names of the cases whose cards/sec dropped more than 'tolerance' (ratio) below the baseline"""
+
+    return [result.name
+            for result in results
+            if (result.name in baseline
+                and result.cards_per_sec < baseline[result.name]["cards_per_sec"] * (1 - tolerance))]
+
+
+def report_suite(results: List[CaseResult], baseline: Dict[str, Dict[str, Any]] = None) -> str:
+    baseline = baseline or {}
+    rows = []
+    for result in results:
+        row = [result.name, result.cards, f"{result.cards_per_sec:.0f}", f"{result.peak_memory_kib:.0f}"]
+        if result.name in baseline:
+            base_cards_per_sec = baseline[result.name]["cards_per_sec"]
+            row.extend([f"{base_cards_per_sec:.0f}", f"{(result.cards_per_sec / base_cards_per_sec - 1) * 100:+.1f}%"])
+        else:
+            row.extend(["", ""])
+        rows.append(row)
+    return tabulate(rows, headers=["CASE", "CARDS", "CARDS/SEC", "PEAK KiB", "BASELINE CARDS/SEC", "CHANGE"])
@@ -1,5 +1,11 @@
-from . import data_collection
-from . import data_processing
-from . import data_storage
+import importlib
 
-__all__ = ["data_collection", "data_processing", "data_storage"]
+# the submodules are imported on first use, keeping the heavy dependencies out of the console scripts startup
+# ('scrape_jobs.base.data_storage' still works without importing it first, 'from scrape_jobs.base import *' imports all)
+__all__ = ["data_collection", "data_processing", "data_storage", "html_parsing", "http_collection"]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,23 +1,108 @@
+import hashlib
 import logging
 from abc import ABC, abstractmethod
+from collections import namedtuple
 from datetime import datetime, timedelta
 from operator import itemgetter
-from typing import Dict, Any, List, Set
+from time import perf_counter
+from typing import Dict, Any, List, Set, Optional, Callable, Iterable, Iterator, Union
+from urllib.parse import urljoin
 
-from bs4 import Tag, BeautifulSoup
-from hed_utils.selenium import SharedDriver
+from hed_utils.support.text_tool import normalize_spacing
 from hed_utils.support.time_tool import utc_moment
 from tabulate import tabulate
 
+from scrape_jobs import run_report
+from scrape_jobs.base.html_parsing import DEFAULT_BACKEND, HtmlBackend, get_backend
+
 __all__ = [
     "ACollector",
+    "Field",
     "JobParser",
-    "Page"
+    "Page",
+    "filter_unknown_jobs",
+    "get_job_identity"
 ]
 
 _log = logging.getLogger(__name__)
 _log.addHandler(logging.NullHandler())
 
+SEEN_ATTRIBUTE = "data-scrape-jobs-seen"
+
+# the parsing backend of JobParser class along with its compiled SELECTOR, FIELDS selectors and (bound) FIELDS
+CompiledParser = namedtuple("CompiledParser", "backend selector selectors fields")
+
+FINGERPRINT_KEYS = ("title", "company", "location")
+
+# Marks the matching result cards that were not handed over yet and returns their outerHTML.
+# The page itself keeps track of what was extracted, so each call costs only as much as the new cards.
+EXTRACT_NEW_RESULTS_SCRIPT = """
+var selector = arguments[0], attribute = arguments[1], fresh = [];
+document.querySelectorAll(selector).forEach(function (element) {
+    if (!element.hasAttribute(attribute)) {
+        fresh.push(element.outerHTML);
+        element.setAttribute(attribute, "");
+    }
+});
+return fresh;
+"""
+
+
+# Returns the count of the elements matching the selector (only the rendered ones if 'visible_only' is set).
+COUNT_ELEMENTS_SCRIPT = """
+var selector = arguments[0], visibleOnly = arguments[1], count = 0;
+document.querySelectorAll(selector).forEach(function (element) {
+    if (!visibleOnly || element.getClientRects().length > 0) {
+        count += 1;
+    }
+});
+return count;
+"""
+
+# Waits (async) until more than 'minCount' elements match the selector, checking on each DOM mutation instead of
+# polling. It gives up as soon as the loaded page did not change for 'quietMs' (nothing more is coming) or after
+# 'timeoutMs', and calls back with the final count, the reason ("condition", "settled" or "timeout") and waited seconds.
+WAIT_FOR_ELEMENTS_SCRIPT = """
+var selector = arguments[0], visibleOnly = arguments[1], minCount = arguments[2], quietMs = arguments[3],
+    timeoutMs = arguments[4], callback = arguments[arguments.length - 1], start = Date.now(),
+    finished = false, observer = null, quietTimer = null, timeoutTimer = null;
+function count() {
+    var total = 0;
+    document.querySelectorAll(selector).forEach(function (element) {
+        if (!visibleOnly || element.getClientRects().length > 0) {
+            total += 1;
+        }
+    });
+    return total;
+}
+function finish(reason) {
+    if (finished) {
+        return;
+    }
+    finished = true;
+    observer.disconnect();
+    document.removeEventListener("readystatechange", check);
+    clearTimeout(quietTimer);
+    clearTimeout(timeoutTimer);
+    callback({"count": count(), "reason": reason, "waited": (Date.now() - start) / 1000});
+}
+function check() {
+    if (count() > minCount) {
+        finish("condition");
+        return;
+    }
+    clearTimeout(quietTimer);
+    if (document.readyState === "complete") {
+        quietTimer = setTimeout(function () { finish("settled"); }, quietMs);
+    }
+}
+observer = new MutationObserver(check);
+observer.observe(document.documentElement, {"childList": true, "subtree": true, "attributes": true});
+document.addEventListener("readystatechange", check);
+timeoutTimer = setTimeout(function () { finish("timeout"); }, timeoutMs);
+check();
+"""
+
 
 def format_jobs(jobs: List[Dict[str, Any]], skip_keys: Set[str] = None) -> str:
     skip_keys = skip_keys or {"posted_time", "scraped_time"}
@@ -25,6 +110,29 @@ def format_jobs(jobs: List[Dict[str, Any]], skip_keys: Set[str] = None) -> str:
     return tabulate(data, headers={key: key.upper() for key in jobs[0].keys()})
 
 
+def get_job_identity(job: Dict[str, Any]) -> str:
+    """Stable identity of a job: the canonical url, or fingerprint of the title/company/location if url is missing"""
+
+    url = job.get("url", None)
+    if url:
+        return url
+
+    fingerprint = "\x1f".join(str(job.get(key, None) or "") for key in FINGERPRINT_KEYS)
+    return "sha1:" + hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()
+
+
+def filter_unknown_jobs(jobs: List[Dict[str, Any]], known_identities: Set[str]) -> List[Dict[str, Any]]:
+    """Drop the jobs whose identity is already known and add the identities of the remaining ones to the index"""
+
+    unknown_jobs = []
+    for job in jobs:
+        identity = get_job_identity(job)
+        if identity not in known_identities:
+            known_identities.add(identity)
+            unknown_jobs.append(job)
+    return unknown_jobs
+
+
 class ACollector(ABC):
 
     @abstractmethod
@@ -33,48 +141,207 @@ class ACollector(ABC):
 
         pass
 
+    def set_known_jobs_urls(self, known_jobs_urls: Set[str]):
+        """Receive the urls of the already stored jobs before the collection starts (ignored by default)"""
+
+        pass
+
+    def iter_jobs(self) -> Iterator[List[Dict[str, Any]]]:
+        """Collect the data in batches, yielding each batch as soon as it is ready (all at once by default)"""
+
+        yield self.collect_jobs()
+
+
+class Field:
+    """Declarative spec of a single job field.
+
+    The value is read from the first element in the job card that matches the CSS 'selector':
+        - the given 'attribute' (stripped) or the element's text (stripped, with normalized spacing) if not given
+        - then passed to 'convert' (if given and the read value is not empty), which can also be the name of
+          classmethod of the parser, e.g. 'parse_url'
+    """
+
+    def __init__(self, selector: str, attribute: str = None, convert: Union[Callable[[str], Any], str] = None):
+        self.selector = selector
+        self.attribute = attribute
+        self.convert = convert
+
+    def __repr__(self):
+        return f"{type(self).__name__}(selector={self.selector!r}, attribute={self.attribute!r})"
+
+    def bind(self, parser_cls: type) -> "Field":
+        """Get the field with its 'convert' method name resolved on the given parser class"""
+
+        if not isinstance(self.convert, str):
+            return self
+        return Field(self.selector, self.attribute, getattr(parser_cls, self.convert))
+
+    def read(self, backend: HtmlBackend, element: Optional[Any]) -> Any:
+        if element is None:
+            return None
+
+        if self.attribute:
+            value = backend.get_attribute(element, self.attribute)
+            if value is None:
+                return None
+            value = value.strip()
+        else:
+            value = normalize_spacing(backend.get_text(element).strip())
+
+        if self.convert:
+            return self.convert(value) if value else None
+
+        return value
+
 
 class JobParser(ABC):
     KEYS: List[str]
     SELECTOR: str
+    FIELDS: Dict[str, Field] = {}
+    BASE_URL: str
 
-    def __init__(self):
+    def __init__(self, backend: str = None):
         self.creation_time_utc = utc_moment().replace(second=0, microsecond=0)
-        self.known_tags = set()
+        self.known_identities = set()  # type: Set[str]
+        compiled = self.get_compiled(backend)
+        self.backend = compiled.backend
+        self._compiled_selector = compiled.selector
+        self._compiled_selectors = compiled.selectors
+        self._fields = compiled.fields
+
+    @classmethod
+    def get_compiled(cls, backend: str = None) -> CompiledParser:
+        """Get the backend and the compiled selectors of the parser class, they are compiled once per class and backend.
+
+        Each distinct selector is compiled once, fields sharing a selector will share the lookup too.
+        """
+
+        backend = backend or DEFAULT_BACKEND
+        cache = cls.__dict__.get("_compiled_parsers", None)  # own cache of each class, not the inherited one
+        if cache is None:
+            cache = {}
+            cls._compiled_parsers = cache
+
+        compiled = cache.get(backend, None)
+        if compiled is None:
+            html_backend = get_backend(backend)
+            compiled = cache[backend] = CompiledParser(
+                html_backend,
+                html_backend.compile(cls.SELECTOR),
+                {field.selector: html_backend.compile(field.selector) for field in cls.FIELDS.values()},
+                {name: field.bind(cls) for name, field in cls.FIELDS.items()})
+        return compiled
 
-    def find_all(self, page_soup: BeautifulSoup) -> List[Tag]:
+    @classmethod
+    def parse_url(cls, href: str) -> str:
+        """Absolute url of the job (relative to the site's BASE_URL), without the query"""
+
+        url = urljoin(cls.BASE_URL, href)
+        return url[:url.index("?")] if ("?" in url) else url
+
+    def parse_document(self, html: str) -> Any:
+        return self.backend.parse_document(html)
+
+    def parse_html(self, html: str) -> Optional[Any]:
+        """Parse the outerHTML of a single job card"""
+
+        return self.backend.parse_fragment(html)
+
+    def find_all(self, document: Any) -> List[Any]:
         _log.debug("getting job tags...")
-        job_tags = page_soup.select(self.SELECTOR) or []
+        job_tags = self.backend.select(self._compiled_selector, document) or []
         _log.debug("got %s job tags", len(job_tags))
         return job_tags
 
-    def find_new(self, page_soup: BeautifulSoup, memoize=True):
-        new_tags = [tag for tag in self.find_all(page_soup) if tag not in self.known_tags]
+    def extract(self, tag: Any, names: Iterable[str] = None) -> Dict[str, Any]:
+        """Read the values of the FIELDS with given names (or all of them) from the job card tag"""
+
+        backend = self.backend
+        compiled_selectors = self._compiled_selectors
+        fields = self._fields
+        elements = {}
+        values = {}
+        for name in (fields if names is None else names):
+            field = fields[name]
+            selector = field.selector
+            if selector not in elements:
+                elements[selector] = backend.select_one(compiled_selectors[selector], tag)
+            values[name] = field.read(backend, elements[selector])
+        return values
+
+    @classmethod
+    def read_field(cls, tag: Any, name: str, backend: str = None) -> Any:
+        """Read the value of a single field (by its FIELDS spec) from the job card tag, without a parser instance"""
+
+        compiled = cls.get_compiled(backend)
+        field = compiled.fields[name]
+        return field.read(compiled.backend, compiled.backend.select_one(compiled.selectors[field.selector], tag))
+
+    def get_identity(self, tag: Any) -> str:
+        """Same as 'get_job_identity' of the parsed tag, but without parsing the fields that are not needed"""
+
+        url = self.extract(tag, ["url"])["url"]
+        if url:
+            return url
+
+        return get_job_identity(self.extract(tag, FINGERPRINT_KEYS))
+
+    def find_new(self, document: Any, memoize=True) -> List[Any]:
+        """Find the job tags whose identity is not present in the 'known_identities' index"""
+
+        known_identities = self.known_identities
+        batch_identities = set()
+        new_tags = []
+        for tag in self.find_all(document):
+            identity = self.get_identity(tag)
+            if (identity in known_identities) or (identity in batch_identities):
+                continue
+            batch_identities.add(identity)
+            new_tags.append(tag)
+
         _log.debug("got %s new tags", len(new_tags))
         if memoize:
-            self.known_tags.update(new_tags)
+            known_identities.update(batch_identities)
         return new_tags
 
     @abstractmethod
-    def parse(self, tag: Tag) -> Dict[str, Any]:
-        return {key: None for key in self.KEYS}
+    def parse(self, tag: Any) -> Dict[str, Any]:
+        job = {key: None for key in self.KEYS}
+        job.update(self.extract(tag))
+        return job
 
 
 class Page(ACollector, ABC):
     PAGE_URL: str
-    driver = SharedDriver()
 
     def __init__(self,
                  search_params: Dict[str, Any],
                  max_post_age_days: int,
                  max_attempts: int,
-                 parser: JobParser):
+                 parser: JobParser,
+                 incremental: bool = False,
+                 stop_after_known_pages: int = 0,
+                 url_search: bool = False):
         self.search_params = search_params
         self.utc_posted_after = self.calc_utc_posted_after(max_post_age_days)
         self.max_attempts = max_attempts
         self.parser = parser
-        _log.info("initialized %s: max_post_age_days=%s, max_attempts=%s, utc_posted_after=%s, search_params=%s",
-                  type(self).__name__, max_post_age_days, max_attempts, self.utc_posted_after, search_params)
+        self.incremental = incremental
+        self.stop_after_known_pages = stop_after_known_pages
+        self.url_search = url_search
+        self.page_number = 0
+        self.wait_seconds = 0.0
+        self.known_jobs_urls = set()  # type: Set[str]
+        _log.info("initialized %s: max_post_age_days=%s, max_attempts=%s, incremental=%s, stop_after_known_pages=%s, "
+                  "url_search=%s, utc_posted_after=%s, search_params=%s",
+                  type(self).__name__, max_post_age_days, max_attempts, incremental, stop_after_known_pages,
+                  url_search, self.utc_posted_after, search_params)
+
+    @property
+    def driver(self):
+        from hed_utils.selenium import SharedDriver  # selenium is loaded only once a page drives the browser
+
+        return SharedDriver()
 
     @classmethod
     def calc_utc_posted_after(cls, days_ago: int) -> datetime:
@@ -84,14 +351,83 @@ class Page(ACollector, ABC):
             _log.exception("error while calculating utc_posted_after! (%s) %s", type(err).__name__, err)
             raise
 
+    def set_known_jobs_urls(self, known_jobs_urls: Set[str]):
+        self.known_jobs_urls = known_jobs_urls
+
+    def is_known_page(self, visible_results: List[Dict[str, Any]]) -> bool:
+        """Tell if all of the (non-empty) visible results are already stored"""
+
+        # no emptiness (size) check of the known urls - with none of them, the first lookup fails anyway
+        known_jobs_urls = self.known_jobs_urls
+        return bool(visible_results) and all(result.get("url", None) in known_jobs_urls for result in visible_results)
+
     @property
     def visible_jobs_count(self) -> int:
-        return len(self.parser.find_all(self.driver.page_soup))
+        return self.count_elements(self.parser.SELECTOR)
+
+    def count_elements(self, selector: str, visible_only=False) -> int:
+        """Count the matching elements in the page, without serializing it"""
+
+        return int(self.driver.execute_script(COUNT_ELEMENTS_SCRIPT, selector, visible_only) or 0)
+
+    def wait_for_elements(self,
+                          selector: str,
+                          min_count: int = 0,
+                          visible_only=False,
+                          timeout: float = 15.0,
+                          quiet: float = 0.5) -> int:
+        """Wait until more than 'min_count' elements match the selector, or until the loaded page did not change for
+        'quiet' seconds (so they are not coming), or the timeout - and return the count of the matching elements.
+
+        The condition is checked in the page on each DOM mutation, and the waited time is added to 'wait_seconds'.
+        """
+
+        start_time = perf_counter()
+        result = self.driver.execute_async_script(WAIT_FOR_ELEMENTS_SCRIPT,
+                                                  selector,
+                                                  visible_only,
+                                                  min_count,
+                                                  int(quiet * 1000),
+                                                  int(timeout * 1000)) or {}
+        waited = perf_counter() - start_time
+        self.wait_seconds += waited
+        count = int(result.get("count", 0))
+        _log.debug("waited %.3f s. for more than %s of '%s' (%s, count: %s)",
+                   waited, min_count, selector, result.get("reason", None), count)
+        return count
 
     @abstractmethod
     def perform_search(self):
         pass
 
+    def get_results_url(self, page_number: int) -> Optional[str]:
+        """Get the url of the (sorted by date) results page with the given number, if the site allows opening it
+        directly (without going through the search form)"""
+
+        return None
+
+    def open_results_page(self, page_number: int):
+        url = self.get_results_url(page_number)
+        _log.info("navigating to results page #%s: %s", page_number, url)
+        self.driver.get(url)
+        self.page_number = page_number
+
+    def start_search(self) -> bool:
+        """Open the first page of results, directly by url if possible, and tell if it was opened that way"""
+
+        if self.url_search:
+            if self.get_results_url(1):
+                self.open_results_page(1)
+                return True
+            _log.warning("%s does not support url search, using the search form", type(self).__name__)
+
+        _log.info("navigating to page: %s", self.PAGE_URL)
+        self.driver.get(self.PAGE_URL)
+
+        _log.info("performing search...")
+        self.perform_search()
+        return False
+
     @abstractmethod
     def wait_for_results_to_load(self):
         pass
@@ -104,24 +440,55 @@ class Page(ACollector, ABC):
     def load_more_results(self):
         pass
 
-    def get_visible_results(self) -> List[Dict[str, Any]]:
-        tags = self.parser.find_new(self.driver.page_soup)
-        return [self.parser.parse(tag) for tag in tags]
-
-    def collect_jobs(self) -> List[Dict[str, Any]]:
-        _log.info("navigating to page: %s", self.PAGE_URL)
-        self.driver.get(self.PAGE_URL)
+    def extract_new_results(self) -> List[Any]:
+        """Get only the result cards that were not extracted before, without serializing the whole page"""
 
-        _log.info("performing search...")
-        self.perform_search()
+        report = run_report.get_report()
+        _log.debug("extracting new job cards in page...")
+        with report.span("collect.extract"):
+            cards_html = self.driver.execute_script(EXTRACT_NEW_RESULTS_SCRIPT,
+                                                    self.parser.SELECTOR,
+                                                    SEEN_ATTRIBUTE) or []
+        _log.debug("got %s new job cards", len(cards_html))
+        with report.span("collect.soup"):
+            tags = [self.parser.parse_html(html) for html in cards_html]
+        return [tag for tag in tags if tag is not None]
 
-        collected_results = []
-        known_results = []
+    def get_visible_results(self) -> List[Dict[str, Any]]:
+        report = run_report.get_report()
+        if self.incremental:
+            tags = self.extract_new_results()
+        else:
+            with report.span("collect.extract"):
+                page_source = self.driver.page_source
+            with report.span("collect.soup"):
+                tags = self.parser.find_new(self.parser.parse_document(page_source), memoize=False)
+
+        with report.span("collect.parse"):
+            results = [self.parser.parse(tag) for tag in tags]
+        report.count("cards", len(results))
+        return results
+
+    def iter_jobs(self) -> Iterator[List[Dict[str, Any]]]:
+        """Yield the recent results of each loaded page (sorted by posted time) as soon as they are collected"""
+
+        report = run_report.get_report()
+        with report.span("collect.search"):
+            url_navigation = self.start_search()
+
+        collected_count = 0
+        known_pages = 0
+        pages_count = 0
+        self.wait_seconds = 0.0
 
         remaining_attempts = self.max_attempts
         while remaining_attempts > 0:
+            pages_count += 1
+            report.count("pages")
+            page_wait_start = self.wait_seconds
             _log.info("waiting for results to load...")
-            self.wait_for_results_to_load()
+            with report.span("collect.wait"):
+                self.wait_for_results_to_load()
 
             _log.info("getting visible results...")
             visible_results = self.get_visible_results()
@@ -131,33 +498,54 @@ class Page(ACollector, ABC):
                 _log.warning("no visible results were present! Exiting loop...")
                 break
 
-            unknown_results = [vr for vr in visible_results if vr not in known_results]
-            _log.info("unknown results: %s", len(unknown_results))
-            known_results.extend(unknown_results)
+            with report.span("collect.dedup"):
+                if self.stop_after_known_pages > 0:
+                    known_pages = (known_pages + 1) if self.is_known_page(visible_results) else 0
+                    if known_pages >= self.stop_after_known_pages:
+                        _log.info("%s consecutive page(s) contained only already stored jobs! Exiting loop...",
+                                  known_pages)
+                        break
+
+                unknown_results = filter_unknown_jobs(visible_results, self.parser.known_identities)
+                recent_results = [result
+                                  for result
+                                  in unknown_results
+                                  if (result.get("posted_time", None) is not None
+                                      and result["posted_time"] > self.utc_posted_after)]
 
-            recent_results = [result
-                              for result
-                              in unknown_results
-                              if (result.get("posted_time", None) is not None
-                                  and result["posted_time"] > self.utc_posted_after)]
+            _log.info("unknown results: %s", len(unknown_results))
             _log.info("recent  results: %s", len(recent_results))
 
             if recent_results:
-                collected_results.extend(recent_results)
+                collected_count += len(recent_results)
+                report.count("collected", len(recent_results))
                 remaining_attempts = self.max_attempts
                 _log.info("\n\n\n%s\n\n\n", format_jobs(recent_results))
+                recent_results.sort(key=itemgetter("posted_time"))
+                yield recent_results
             else:
                 remaining_attempts -= 1
                 _log.warning("no new results were collected in this iteration! remaining attempts: %s",
                              remaining_attempts)
 
-            if self.has_more_results():
-                _log.info("loading more results...")
-                self.load_more_results()
-            else:
+            with report.span("collect.paginate"):
+                has_more_results = self.has_more_results()
+                if has_more_results:
+                    _log.info("loading more results...")
+                    if url_navigation:
+                        self.open_results_page(self.page_number + 1)
+                    else:
+                        self.load_more_results()
+
+            _log.info("waited %.2f s. for page #%s", self.wait_seconds - page_wait_start, pages_count)
+            if not has_more_results:
                 _log.warning("no more results to load! Exiting loop...")
                 break
 
-        _log.info("total of %s results collected!", len(collected_results))
+        _log.info("total of %s results collected! (waited %.2f s. for %s pages)",
+                  collected_count, self.wait_seconds, pages_count)
+
+    def collect_jobs(self) -> List[Dict[str, Any]]:
+        collected_results = [job for batch in self.iter_jobs() for job in batch]
         collected_results.sort(key=itemgetter("posted_time"))
         return collected_results
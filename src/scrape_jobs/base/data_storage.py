@@ -1,15 +1,33 @@
 import csv
+import io
+import json
 import logging
+import mmap
+import os
+import sqlite3
+import threading
+import time
+import uuid
 from abc import ABC, abstractmethod
+from collections.abc import Set as AbstractSet
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Set
-
-from hed_utils.support import google_spreadsheet
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
 __all__ = [
     "AStorage",
     "CsvJobsStorage",
-    "GoogleSheetsJobsStorage"
+    "CsvOffsetIndex",
+    "GoogleSheetsJobsStorage",
+    "IndexedCsvJobsStorage",
+    "IndexedStorage",
+    "MemoryUrlIndex",
+    "ParquetJobsStorage",
+    "SheetsUploader",
+    "SqliteJobsStorage",
+    "SqliteUrlSet",
+    "UrlIndex"
 ]
 
 _log = logging.getLogger(__name__)
@@ -17,6 +35,8 @@ _log.addHandler(logging.NullHandler())
 
 
 class AStorage(ABC):
+    # if set, the jobs are passed to 'store_jobs' as collected (e.g. with datetime values), without processing
+    STORES_RAW_JOBS = False
 
     def __init__(self, columns: List[str]):
         self.columns = columns
@@ -37,6 +57,16 @@ class AStorage(ABC):
 
         pass
 
+    def get_revision(self) -> Optional[str]:
+        """Cheap token that changes whenever the stored data changes (None if it can not be told)"""
+
+        return None
+
+    def flush(self):
+        """Wait for the pending (background) writes to complete, re-raising the first error if any"""
+
+        pass
+
 
 class CsvJobsStorage(AStorage):
 
@@ -73,28 +103,880 @@ class CsvJobsStorage(AStorage):
             writer = csv.writer(fp)
             writer.writerows(rows)
 
+    def get_revision(self) -> Optional[str]:
+        try:
+            stat = self.filepath.stat()
+        except FileNotFoundError:
+            return None
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class CsvOffsetIndex(AbstractSet):
+    """Sidecar index of CSV rows byte offsets: a header line followed by 'url<TAB>start<TAB>end' lines.
+
+    The lines written on (re)build are sorted by url and searched in place (binary search over memory-mapped file),
+    only the lines appended since then are loaded in memory - the load time does not depend on the CSV size.
+    """
+
+    HEADER_PREFIX = "#sorted"
+
+    def __init__(self, filepath: Path, fp: Any, data_start: int, sorted_end: int, sorted_count: int, csv_end: int):
+        self.filepath = filepath
+        self.csv_end = csv_end
+        self._fp = fp
+        self._data_start = data_start
+        self._sorted_end = sorted_end
+        self._sorted_count = sorted_count
+        self._mmap = mmap.mmap(fp.fileno(), sorted_end, access=mmap.ACCESS_READ) if sorted_count else None
+        self._appended = {}  # type: Dict[str, Tuple[int, int]]
+
+    def __repr__(self):
+        return f"{type(self).__name__}(filepath='{self.filepath}')"
+
+    @staticmethod
+    def format_line(url: str, start: int, end: int) -> bytes:
+        return f"{url}\t{start}\t{end}\n".encode("utf-8")
+
+    @classmethod
+    def write(cls, filepath: Path, entries: Iterable[Tuple[str, int, int]], csv_end: int):
+        """Write new index file, with the entries sorted by url (keeping the first entry of each url)"""
+
+        lines = {}
+        for url, start, end in entries:
+            if url and (url not in lines):
+                lines[url] = cls.format_line(url, start, end)
+        data = b"".join(line for _, line in sorted(lines.items(), key=lambda item: item[0].encode("utf-8")))
+        header = f"{cls.HEADER_PREFIX}\t{{}}\t{len(lines)}\t{csv_end}\n"
+        # the header holds the end of the sorted lines, which depends on the header's own length
+        header_size = len(header.format(0).encode("utf-8"))
+        sorted_end = header_size + len(data)
+        while len(header.format(sorted_end).encode("utf-8")) != header_size:
+            header_size = len(header.format(sorted_end).encode("utf-8"))
+            sorted_end = header_size + len(data)
+
+        tmp_filepath = filepath.with_name(filepath.name + ".tmp")
+        tmp_filepath.write_bytes(header.format(sorted_end).encode("utf-8") + data)
+        os.replace(str(tmp_filepath), str(filepath))
+
+    @classmethod
+    def load(cls, filepath: Path) -> Optional["CsvOffsetIndex"]:
+        """Open the index file and load the lines appended after the sorted ones, or return None if it is invalid"""
+
+        try:
+            fp = filepath.open(mode="rb")
+        except FileNotFoundError:
+            return None
+
+        try:
+            fields = fp.readline().decode("utf-8").rstrip("\n").split("\t")
+            if (len(fields) != 4) or (fields[0] != cls.HEADER_PREFIX):
+                raise ValueError(f"Invalid index header: {fields}")
+
+            sorted_end, sorted_count, csv_end = (int(field) for field in fields[1:])
+            index = cls(filepath, fp, fp.tell(), sorted_end, sorted_count, csv_end)
+            fp.seek(sorted_end)
+            for line in fp.read().decode("utf-8").splitlines():
+                url, start, end = line.rsplit("\t", 2)
+                index.add_entry(url, int(start), int(end))
+            return index
+        except Exception as err:
+            _log.warning("Error while loading csv index! (%s) %s", type(err).__name__, err)
+            fp.close()
+            return None
+
+    def add_entry(self, url: str, start: int, end: int):
+        if url and (self.get(url) is None):
+            self._appended[url] = (start, end)
+        self.csv_end = end
+
+    def append(self, entries: List[Tuple[str, int, int]]):
+        with self.filepath.open(mode="ab") as fp:
+            fp.write(b"".join(self.format_line(url, start, end) for url, start, end in entries))
+        for url, start, end in entries:
+            self.add_entry(url, start, end)
+
+    def find_sorted(self, url: str) -> Optional[int]:
+        if self._mmap is None:
+            return None
+
+        data = self._mmap
+        target = url.encode("utf-8")
+        low, high = self._data_start, self._sorted_end
+        while low < high:
+            line_start = data.rfind(b"\n", low - 1, (low + high) // 2) + 1
+            line_end = data.find(b"\n", line_start)
+            url_end = data.find(b"\t", line_start)
+            key = data[line_start:url_end]
+            if key == target:
+                return int(data[url_end + 1:data.find(b"\t", url_end + 1)])
+            if key < target:
+                low = line_end + 1
+            else:
+                high = line_start
+        return None
+
+    def get(self, url: str) -> Optional[int]:
+        """Get the start offset of the row with the given url"""
+
+        offsets = self._appended.get(url, None)
+        return self.find_sorted(url) if offsets is None else offsets[0]
+
+    def __contains__(self, url) -> bool:
+        return isinstance(url, str) and (self.get(url) is not None)
+
+    def __len__(self) -> int:
+        return self._sorted_count + len(self._appended)
+
+    def __iter__(self) -> Iterator[str]:
+        for url, _, _ in self.entries():
+            yield url
+
+    @property
+    def appended_count(self) -> int:
+        return len(self._appended)
+
+    def entries(self) -> Iterator[Tuple[str, int, int]]:
+        if self._mmap is not None:
+            for line in self._mmap[self._data_start:self._sorted_end].decode("utf-8").splitlines():
+                url, start, end = line.rsplit("\t", 2)
+                yield url, int(start), int(end)
+        for url, (start, end) in list(self._appended.items()):
+            yield url, start, end
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+        self._fp.close()
+
+
+class IndexedCsvJobsStorage(CsvJobsStorage):
+    """CSV storage with sidecar CsvOffsetIndex ('<csv>.idx'), appended along with each write.
+
+    The index is rebuilt from the CSV if it is missing or the CSV size differs from the end of the last indexed row,
+    and re-sorted once more than MAX_APPENDED rows were appended to it.
+    """
+
+    MAX_APPENDED = 1000
+
+    def __init__(self, columns: List[str], filepath: str):
+        super().__init__(columns, filepath)
+        self.index_filepath = self.filepath.with_name(self.filepath.name + ".idx")
+        self._index = None  # type: Optional[CsvOffsetIndex]
+
+    def init_file(self):
+        _log.debug("initializing jobs csv: columns=%s, file='%s'", self.columns, str(self.filepath))
+        header = self.format_row(self.columns)
+        self.filepath.write_bytes(header)
+        self.write_index([], len(header))
+
+    @staticmethod
+    def format_row(row: List[str]) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(row)
+        return buffer.getvalue().encode("utf-8")
+
+    def scan_rows(self) -> Iterator[Tuple[int, int, List[str]]]:
+        """Yield the (start, end) byte offsets and the values of each CSV row (including the header)"""
+
+        with self.filepath.open(mode="rb") as fp:
+            end = 0
+
+            def read_lines():
+                nonlocal end
+                for line in fp:
+                    end += len(line)
+                    yield line.decode("utf-8")
+
+            start = 0
+            for row in csv.reader(read_lines()):
+                yield start, end, row
+                start = end
+
+    def write_index(self, entries: Iterable[Tuple[str, int, int]], csv_end: int):
+        if self._index is not None:
+            self._index.close()
+        CsvOffsetIndex.write(self.index_filepath, entries, csv_end)
+        self._index = CsvOffsetIndex.load(self.index_filepath)
+
+    def rebuild_index(self):
+        _log.info("rebuilding csv index: '%s'", str(self.index_filepath))
+        entries = []
+        csv_end = 0
+        for start, end, row in self.scan_rows():
+            if start and (len(row) > self.urls_column_index):
+                entries.append((row[self.urls_column_index], start, end))
+            csv_end = end
+        self.write_index(entries, csv_end)
+
+    def load_index(self) -> CsvOffsetIndex:
+        if self._index is None:
+            self._index = CsvOffsetIndex.load(self.index_filepath)
+            csv_size = self.filepath.stat().st_size
+            if (self._index is None) or (self._index.csv_end != csv_size):
+                _log.warning("csv index is missing or out of sync! (csv: %s bytes)", csv_size)
+                self.rebuild_index()
+            elif self._index.appended_count > self.MAX_APPENDED:
+                _log.info("re-sorting csv index: '%s'", str(self.index_filepath))
+                self.write_index(list(self._index.entries()), self._index.csv_end)
+        return self._index
+
+    def get_known_jobs_urls(self) -> Set[str]:
+        known_jobs_urls = self.load_index()
+        _log.debug("got %s known jobs urls from csv index", len(known_jobs_urls))
+        return known_jobs_urls
+
+    def read_job(self, url: str) -> Optional[Dict[str, str]]:
+        """Read the stored job with the given url, seeking directly to its row"""
+
+        start = self.load_index().get(url)
+        if start is None:
+            return None
+
+        with self.filepath.open(mode="rb") as fp:
+            fp.seek(start)
+            row = next(csv.reader(line.decode("utf-8") for line in fp))
+        return dict(zip(self.columns, row))
+
+    def store_jobs(self, jobs: List[Dict[str, str]]):
+        index = self.load_index()
+        rows = self.convert_to_rows(jobs)
+        _log.debug("appending %s rows to csv at: %s", len(rows), str(self.filepath))
+
+        start = index.csv_end
+        data = []
+        entries = []
+        for row in rows:
+            line = self.format_row(row)
+            entries.append((row[self.urls_column_index], start, start + len(line)))
+            data.append(line)
+            start += len(line)
+
+        with self.filepath.open(mode="ab") as fp:
+            fp.write(b"".join(data))
+        index.append(entries)
+
+    def compact(self, sort_key: str = "posted_time") -> int:
+        """Rewrite the CSV without duplicate urls, sorted by the (text of the) given column, and rebuild the index.
+
+        Returns the count of the remaining job rows.
+        """
+
+        sort_index = self.columns.index(sort_key)
+        seen_urls = set()
+        rows = []
+        for start, _, row in self.scan_rows():
+            if (not start) or (len(row) <= self.urls_column_index):
+                continue
+            url = row[self.urls_column_index]
+            if url in seen_urls:
+                continue
+            seen_urls.add(url)
+            rows.append(row)
+        rows.sort(key=lambda r: r[sort_index] if len(r) > sort_index else "")
+
+        _log.info("compacting csv: '%s' (rows: %s)", str(self.filepath), len(rows))
+        entries = []
+        tmp_filepath = self.filepath.with_name(self.filepath.name + ".tmp")
+        with tmp_filepath.open(mode="wb") as fp:
+            fp.write(self.format_row(self.columns))
+            for row in rows:
+                start = fp.tell()
+                fp.write(self.format_row(row))
+                entries.append((row[self.urls_column_index], start, fp.tell()))
+            csv_end = fp.tell()
+        os.replace(str(tmp_filepath), str(self.filepath))
+
+        self.write_index(entries, csv_end)
+        return len(rows)
+
+    def close(self):
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+
+
+class SheetsUploader:
+    """Appends rows to a worksheet in chunks, retrying the quota / transient errors with exponential backoff.
+
+    With 'write_behind' the uploads are done (in order) by a background worker and 'upload' returns right away. Once
+    an upload failed, the queued ones are skipped (they would leave a gap in the worksheet) and the error is raised by
+    the next 'upload' or 'flush'.
+    """
+
+    RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+    def __init__(self,
+                 worksheet: Any,
+                 chunk_size: int = 500,
+                 max_retries: int = 5,
+                 backoff_seconds: float = 1.0,
+                 write_behind: bool = False):
+        if chunk_size < 1:
+            raise ValueError(f"The chunk size must be positive! (got: {chunk_size})")
+
+        self.worksheet = worksheet
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.uploaded_rows = 0
+        self.retries = 0
+        self._next_row = None  # type: Optional[int]
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sheets") if write_behind else None
+        self._pending = []  # futures of the write-behind uploads, in order
+        self._error = None  # type: Optional[BaseException]
+        _log.info("initialized %s: chunk_size=%s, max_retries=%s, backoff_seconds=%s, write_behind=%s",
+                  type(self).__name__, chunk_size, max_retries, backoff_seconds, write_behind)
+
+    @classmethod
+    def is_retryable(cls, err: BaseException) -> bool:
+        import requests  # (with gspread) only when the Google Sheets storage is used
+
+        status_code = getattr(getattr(err, "response", None), "status_code", None)
+        if status_code is not None:
+            return status_code in cls.RETRY_STATUS_CODES
+        return isinstance(err, (ConnectionError, TimeoutError, requests.ConnectionError, requests.Timeout))
+
+    def call(self, func: Callable, *args) -> Any:
+        """Call the worksheet method, retrying it with exponential backoff on retryable errors"""
+
+        attempt = 0
+        while True:
+            try:
+                return func(*args)
+            except Exception as err:
+                if (attempt >= self.max_retries) or (not self.is_retryable(err)):
+                    raise
+
+                delay = self.backoff_seconds * (2 ** attempt)
+                attempt += 1
+                self.retries += 1
+                _log.warning("retrying failed worksheet request in %.2f s. (attempt %s of %s) (%s) %s",
+                             delay, attempt, self.max_retries, type(err).__name__, err)
+                time.sleep(delay)
+
+    def append_chunk(self, rows: List[List[str]]):
+        from hed_utils.support import google_spreadsheet
+
+        if self._next_row is None:
+            self._next_row = len(self.call(self.worksheet.col_values, 1)) + 1
+
+        cells = google_spreadsheet.convert_values_to_cells(rows, start_row=self._next_row)
+        self.call(self.worksheet.add_rows, len(rows))
+        self.call(self.worksheet.update_cells, cells)
+        self._next_row += len(rows)
+        self.uploaded_rows += len(rows)
+
+    def upload_now(self, rows: List[List[str]]):
+        for start in range(0, len(rows), self.chunk_size):
+            chunk = rows[start:start + self.chunk_size]
+            _log.debug("appending %s rows (chunk at %s of %s) to worksheet: %s",
+                       len(chunk), start, len(rows), self.worksheet)
+            self.append_chunk(chunk)
+
+    def upload(self, rows: List[List[str]]):
+        if not rows:
+            return
+
+        if self._executor is None:
+            self.upload_now(rows)
+            return
+
+        self._check_pending()
+        self._pending.append(self._executor.submit(self.upload_behind, rows))
+
+    def upload_behind(self, rows: List[List[str]]):
+        if self._error is not None:
+            raise RuntimeError("Upload skipped after previous upload failure!") from self._error
+
+        try:
+            self.upload_now(rows)
+        except BaseException as err:
+            self._error = err
+            self._next_row = None  # the failed chunk may be partially written, so the next row is read again
+            raise
+
+    def _check_pending(self):
+        for future in self._pending:
+            if future.done():
+                future.result()
+        self._pending = [future for future in self._pending if not future.done()]
+
+    def flush(self):
+        pending, self._pending = self._pending, []
+        _log.debug("waiting for %s pending uploads...", len(pending))
+        wait(pending)
+        self._error = None  # reported below, so the next uploads start over
+        for future in pending:
+            future.result()
+
 
 class GoogleSheetsJobsStorage(AStorage):
 
-    def __init__(self, columns: List[str], spreadsheet_title: str, worksheet_title: str, json_filepath: str):
+    def __init__(self,
+                 columns: List[str],
+                 spreadsheet_title: str,
+                 worksheet_title: str,
+                 json_filepath: str,
+                 chunk_size: int = 500,
+                 max_retries: int = 5,
+                 write_behind: bool = False,
+                 urls_cache_filepath: str = None):
+        # gspread (and the google auth libraries) are imported only when the Google Sheets storage is used
+        from hed_utils.support import google_spreadsheet
+
         super().__init__(columns)
         self.urls_column_index = columns.index("url") + 1  # 1-based index
+        self.urls_cache_filepath = Path(urls_cache_filepath).absolute() if urls_cache_filepath else None
         self.worksheet = google_spreadsheet.open_worksheet(spreadsheet_title=spreadsheet_title,
                                                            worksheet_title=worksheet_title,
                                                            json_filepath=json_filepath)
+        self.uploader = SheetsUploader(self.worksheet,
+                                       chunk_size=chunk_size,
+                                       max_retries=max_retries,
+                                       write_behind=write_behind)
 
         _log.info("initialized %s: "
-                  "columns=%s, urls_column_index=%s, spreadsheet_title='%s', worksheet_title='%s', json_filepath='%s'",
+                  "columns=%s, urls_column_index=%s, spreadsheet_title='%s', worksheet_title='%s', json_filepath='%s', "
+                  "urls_cache_filepath='%s'",
                   type(self).__name__,
-                  columns, self.urls_column_index, spreadsheet_title, worksheet_title, json_filepath)
+                  columns, self.urls_column_index, spreadsheet_title, worksheet_title, json_filepath,
+                  self.urls_cache_filepath)
 
     def get_known_jobs_urls(self) -> Set[str]:
-        _log.debug("getting known jobs urls from worksheet...")
-        known_jobs_urls = set(self.worksheet.col_values(self.urls_column_index))
+        if self.urls_cache_filepath:
+            known_jobs_urls = set(self.sync_urls_column())
+        else:
+            _log.debug("getting known jobs urls from worksheet...")
+            known_jobs_urls = set(self.uploader.call(self.worksheet.col_values, self.urls_column_index))
         _log.debug("got %s known jobs urls", len(known_jobs_urls))
         return known_jobs_urls
 
+    def get_urls_range(self, first_row: int) -> List[str]:
+        """Get the values of the urls column, starting from the given (1-based) row"""
+
+        from gspread.utils import rowcol_to_a1
+
+        column = rowcol_to_a1(1, self.urls_column_index).rstrip("0123456789")
+        title = self.worksheet.title.replace("'", "''")  # quotes in quoted sheet name are doubled
+        a1_range = f"'{title}'!{column}{first_row}:{column}"
+        response = self.uploader.call(self.worksheet.spreadsheet.values_get, a1_range)
+        return [(row[0] if row else "") for row in response.get("values", [])]
+
+    def load_urls_cache(self) -> Optional[Dict[str, Any]]:
+        try:
+            with self.urls_cache_filepath.open(mode="r", encoding="utf-8") as fp:
+                cache = json.load(fp)
+        except FileNotFoundError:
+            return None
+        except Exception as err:
+            _log.warning("Error while reading urls cache! (%s) %s", type(err).__name__, err)
+            return None
+
+        if (cache.get("worksheet_id", None), cache.get("column", None)) != (self.worksheet.id, self.urls_column_index):
+            _log.warning("urls cache is for another worksheet or column!")
+            return None
+        return cache
+
+    def save_urls_cache(self, urls: List[str]):
+        cache = {"worksheet_id": self.worksheet.id, "column": self.urls_column_index, "urls": urls}
+        with self.urls_cache_filepath.open(mode="w", encoding="utf-8") as fp:
+            json.dump(cache, fp)
+
+    def sync_urls_column(self) -> List[str]:
+        """Fetch only the rows appended since the last sync (starting at the last cached row, to verify it is intact).
+
+        Falls back to full download if there is no cache, or the last cached row was changed (sheet shrunk/edited).
+        """
+
+        cache = self.load_urls_cache()
+        urls = cache["urls"] if cache else []
+        if urls:
+            fetched = self.get_urls_range(len(urls))
+            if fetched and (fetched[0] == urls[-1]):
+                _log.debug("got %s new rows since the last urls sync", len(fetched) - 1)
+                urls.extend(fetched[1:])
+            else:
+                _log.warning("worksheet was changed since the last urls sync! Doing full sync...")
+                urls = []
+
+        if not urls:
+            _log.debug("getting all urls from worksheet...")
+            urls = self.get_urls_range(1)
+
+        self.save_urls_cache(urls)
+        return urls
+
     def store_jobs(self, jobs: List[Dict[str, str]]):
         rows = self.convert_to_rows(jobs)
         _log.debug("appending %s jobs to worksheet: %s", len(rows), self.worksheet)
-        google_spreadsheet.append_worksheet_values(worksheet=self.worksheet, values=rows)
+        self.uploader.upload(rows)
+
+    def flush(self):
+        self.uploader.flush()
+
+    def get_modified_time(self) -> str:
+        """Get the last modification time of the spreadsheet (from the Drive API), it changes on any cell edit"""
+
+        from gspread.urls import DRIVE_FILES_API_V3_URL
+
+        spreadsheet = self.worksheet.spreadsheet
+        response = self.uploader.call(spreadsheet.client.request,
+                                      "get",
+                                      f"{DRIVE_FILES_API_V3_URL}/{spreadsheet.id}",
+                                      {"fields": "modifiedTime"})
+        return response.json()["modifiedTime"]
+
+    def get_revision(self) -> Optional[str]:
+        """Get the row count of the worksheet along with the modification time of the spreadsheet.
+
+        The row count alone does not change when rows are edited / replaced in place. The modification time covers all
+        worksheets of the spreadsheet, so editing another worksheet causes (harmless) reconcile of the urls index.
+        """
+
+        _log.debug("getting worksheet row count and spreadsheet modification time...")
+        metadata = self.uploader.call(self.worksheet.spreadsheet.fetch_sheet_metadata)
+        for sheet in metadata.get("sheets", []):
+            properties = sheet.get("properties", {})
+            if properties.get("sheetId", None) == self.worksheet.id:
+                row_count = properties.get("gridProperties", {}).get("rowCount", "")
+                return f"{row_count}:{self.get_modified_time()}"
+        return None
+
+
+class SqliteUrlSet(AbstractSet):
+    """Read-only Set view of the (uniquely indexed) 'url' column of SQLite table, each lookup is an index search.
+
+    It is pickled as its database path and table, so other processes (e.g. the search workers) get a view of the same
+    table over their own connection, instead of a copy of all urls.
+    """
+
+    def __init__(self, connection: sqlite3.Connection, lock: threading.Lock, table: str, filepath: Path):
+        self._connection = connection
+        self._lock = lock
+        self._table = table
+        self.filepath = filepath
+
+    @classmethod
+    def open(cls, filepath: str, table: str) -> "SqliteUrlSet":
+        return cls(sqlite3.connect(filepath, check_same_thread=False), threading.Lock(), table, Path(filepath))
+
+    def __reduce__(self):
+        return SqliteUrlSet.open, (str(self.filepath), self._table)
+
+    def __contains__(self, url) -> bool:
+        with self._lock:
+            query = f'SELECT 1 FROM "{self._table}" WHERE url = ?'
+            return self._connection.execute(query, (url,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute(f'SELECT COUNT(*) FROM "{self._table}"').fetchone()[0]
+
+    def __bool__(self) -> bool:
+        with self._lock:
+            return self._connection.execute(f'SELECT 1 FROM "{self._table}" LIMIT 1').fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            urls = [row[0] for row in self._connection.execute(f'SELECT url FROM "{self._table}"')]
+        return iter(urls)
+
+
+class UrlIndex(SqliteUrlSet):
+    """Persistent (SQLite) set of the stored jobs urls, along with the revision of the storage it was synced with"""
+
+    def __init__(self, filepath: str):
+        filepath = Path(filepath).absolute()
+        super().__init__(sqlite3.connect(str(filepath), check_same_thread=False), threading.Lock(), "urls", filepath)
+        with self._lock, self._connection:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY) WITHOUT ROWID")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        _log.info("initialized %s: filepath='%s'", type(self).__name__, str(self.filepath))
+
+    def __repr__(self):
+        return f"{type(self).__name__}(filepath='{self.filepath}')"
+
+    @property
+    def revision(self) -> Optional[str]:
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()
+        return row[0] if row else None
+
+    def update(self, urls: Iterable[str], revision: Optional[str]):
+        """Add the urls and mark the index as synced with the given storage revision"""
+
+        with self._lock, self._connection:
+            self._insert(urls, revision)
+
+    def replace(self, urls: Iterable[str], revision: Optional[str]):
+        """Replace all urls and mark the index as synced with the given storage revision (in single transaction)"""
+
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM urls")
+            self._insert(urls, revision)
+
+    def _insert(self, urls: Iterable[str], revision: Optional[str]):
+        self._connection.executemany("INSERT OR IGNORE INTO urls (url) VALUES (?)", ((url,) for url in urls if url))
+        self._connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('revision', ?)", (revision,))
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class MemoryUrlIndex(set):
+    """In-memory counterpart of the UrlIndex, kept warm between the runs of long-lived process"""
+
+    def __init__(self):
+        super().__init__()
+        self.revision = None  # type: Optional[str]
+
+    def __repr__(self):
+        return f"{type(self).__name__}(urls={len(self)}, revision={self.revision})"
+
+    def update(self, urls: Iterable[str], revision: Optional[str] = None):
+        """Add the urls and mark the index as synced with the given storage revision"""
+
+        super().update(url for url in urls if url)
+        self.revision = revision
+
+    def replace(self, urls: Iterable[str], revision: Optional[str]):
+        """Replace all urls and mark the index as synced with the given storage revision"""
+
+        self.clear()
+        self.update(urls, revision)
+
+    def close(self):
+        self.clear()
+
+
+class SqliteJobsStorage(AStorage):
+    """Stores the jobs of a site in SQLite table (one column per job key) having unique index on the 'url' column"""
+
+    def __init__(self, columns: List[str], filepath: str, table: str):
+        super().__init__(columns)
+        if "url" not in columns:
+            raise ValueError(f"The 'url' column is required! (columns: {columns})")
+
+        self.filepath = Path(filepath).absolute()
+        self.table = table
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.filepath), check_same_thread=False)
+        self._known_jobs_urls = SqliteUrlSet(self._connection, self._lock, table, self.filepath)
+        self._insert_query = 'INSERT OR IGNORE INTO "{}" ({}) VALUES ({})'.format(
+            table, ", ".join(f'"{column}"' for column in columns), ", ".join("?" for _ in columns))
+        _log.info("initialized %s: columns=%s, filepath='%s', table='%s'",
+                  type(self).__name__, columns, str(self.filepath), table)
+
+    def init_table(self):
+        _log.debug("initializing jobs table: table='%s', columns=%s, file='%s'",
+                   self.table, self.columns, str(self.filepath))
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            with self._connection:
+                self._connection.execute('CREATE TABLE IF NOT EXISTS "{}" ({})'.format(
+                    self.table, ", ".join(f'"{column}" TEXT' for column in self.columns)))
+                self._connection.execute(
+                    f'CREATE UNIQUE INDEX IF NOT EXISTS "{self.table}_url" ON "{self.table}" (url)')
+
+    def get_known_jobs_urls(self) -> Set[str]:
+        _log.debug("serving known jobs urls from the '%s' table url index", self.table)
+        return self._known_jobs_urls
+
+    def store_jobs(self, jobs: List[Dict[str, str]]):
+        rows = self.convert_to_rows(jobs)
+        _log.debug("inserting %s rows to table '%s' at: %s", len(rows), self.table, str(self.filepath))
+        with self._lock, self._connection:
+            self._connection.executemany(self._insert_query, rows)
+
+    def get_revision(self) -> Optional[str]:
+        with self._lock:
+            count, last_rowid = self._connection.execute(f'SELECT COUNT(*), MAX(rowid) FROM "{self.table}"').fetchone()
+        return f"{count}:{last_rowid}"
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class IndexedStorage(AStorage):
+    """Wraps another storage, serving the known jobs urls from a local UrlIndex.
+
+    The urls are read from the wrapped storage only when its revision differs from the one the index was synced with.
+
+    The stored urls are added to the index right away, but its revision is moved forward only on 'flush' (once the
+    write-behind uploads are done), and only if the storage was not written by anyone else since the index was synced.
+    Otherwise the index keeps the old revision, so the next run reconciles it.
+    """
+
+    def __init__(self, storage: AStorage, index: Union[UrlIndex, MemoryUrlIndex]):
+        super().__init__(storage.columns)
+        self.storage = storage
+        self.index = index
+        self.STORES_RAW_JOBS = storage.STORES_RAW_JOBS
+        self._in_sync = False  # whether the index is known to match the storage (before our own writes)
+        self._unflushed = False
+        _log.info("initialized %s: storage=%s, index=%s", type(self).__name__, type(storage).__name__, index)
+
+    def get_known_jobs_urls(self) -> Set[str]:
+        revision = self.storage.get_revision()
+        if (revision is None) or (revision != self.index.revision):
+            _log.info("reconciling jobs urls index with %s... (revision: %s -> %s)",
+                      type(self.storage).__name__, self.index.revision, revision)
+            self.index.replace(self.storage.get_known_jobs_urls(), revision)
+        self._in_sync = revision is not None
+
+        _log.debug("got %s known jobs urls from index", len(self.index))
+        return self.index
+
+    def store_jobs(self, jobs: List[Dict[str, str]]):
+        if self._in_sync and not self._unflushed:
+            # no writes of ours are pending, so a changed revision means someone else wrote to the storage
+            revision = self.storage.get_revision()
+            self._in_sync = (revision is not None) and (revision == self.index.revision)
+            if not self._in_sync:
+                _log.warning("%s was changed since the index sync! (revision: %s -> %s)",
+                             type(self.storage).__name__, self.index.revision, revision)
+
+        self.storage.store_jobs(jobs)
+        self._unflushed = True
+        self.index.update((job.get("url", "") for job in jobs), self.index.revision)
+
+    def flush(self):
+        self.storage.flush()
+        if not self._unflushed:
+            return
+
+        self._unflushed = False
+        if self._in_sync:
+            self.index.update([], self.storage.get_revision())
+
+    def get_revision(self) -> Optional[str]:
+        return self.storage.get_revision()
+
+
+class ParquetJobsStorage(AStorage):
+    """Stores the raw jobs as typed Parquet files (requires 'pyarrow': pip install scrape-jobs[parquet]).
+
+    Layout: '<root_dir>/site=<site>/scrape_date=<YYYY-MM-DD>/part-*.parquet' - each 'store_jobs' call writes small
+    file per scrape date, and the partitions having more than 'compact_after_files' files are merged into one.
+
+    The merged files are listed in manifest file before the compacted one takes their place, so a compaction
+    interrupted at any point is either rolled back or finished (see 'recover') - the jobs are never duplicated or lost.
+    """
+
+    STORES_RAW_JOBS = True
+    DATETIME_COLUMNS = {"posted_time", "scraped_time"}
+    MANIFEST_FILENAME = "compaction.json"
+    COMPACTED_TMP_FILENAME = "compacted.parquet.tmp"
+
+    def __init__(self, columns: List[str], root_dir: str, site: str, compact_after_files: int = 20):
+        super().__init__(columns)
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as err:
+            raise RuntimeError("The Parquet storage requires the 'pyarrow' package!") from err
+
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self.site = site
+        self.site_dir = Path(root_dir).absolute().joinpath(f"site={site}")
+        self.compact_after_files = compact_after_files
+        self.schema = pyarrow.schema([(column, pyarrow.timestamp("us", tz="UTC")
+                                      if column in self.DATETIME_COLUMNS else pyarrow.string())
+                                      for column in columns])
+        _log.info("initialized %s: columns=%s, site_dir='%s', compact_after_files=%s",
+                  type(self).__name__, columns, str(self.site_dir), compact_after_files)
+
+    def get_partition_files(self) -> Dict[Path, List[Path]]:
+        partitions = [partition for partition in sorted(self.site_dir.glob("scrape_date=*")) if partition.is_dir()]
+        for partition in partitions:
+            self.recover(partition)
+        return {partition: sorted(partition.glob("*.parquet")) for partition in partitions}
+
+    def recover(self, partition: Path):
+        """Finish the interrupted compaction of the partition (if its file was already in place) or roll it back"""
+
+        manifest = partition.joinpath(self.MANIFEST_FILENAME)
+        if not manifest.exists():
+            return
+
+        data = json.loads(manifest.read_text(encoding="utf-8"))
+        if partition.joinpath(data["compacted"]).exists():
+            _log.warning("finishing interrupted compaction of partition: '%s'", str(partition))
+            leftovers = [partition.joinpath(name) for name in data["merged"]]
+        else:
+            _log.warning("rolling back interrupted compaction of partition: '%s'", str(partition))
+            leftovers = [partition.joinpath(self.COMPACTED_TMP_FILENAME)]
+        for file in leftovers:
+            if file.exists():
+                file.unlink()
+        manifest.unlink()
+
+    def get_known_jobs_urls(self) -> Set[str]:
+        _log.debug("reading url column of parquet files in: '%s'", str(self.site_dir))
+        known_jobs_urls = set()
+        for files in self.get_partition_files().values():
+            for file in files:
+                known_jobs_urls.update(self._pq.read_table(str(file), columns=["url"]).column("url").to_pylist())
+        known_jobs_urls.discard(None)
+        _log.debug("got %s known jobs urls", len(known_jobs_urls))
+        return known_jobs_urls
+
+    def convert_value(self, column: str, value: Any) -> Any:
+        if value is None:
+            return None
+        if column in self.DATETIME_COLUMNS:
+            return value if isinstance(value, datetime) else None
+        return str(value)
+
+    def to_table(self, jobs: List[Dict[str, Any]]) -> Any:
+        data = {column: [self.convert_value(column, job.get(column, None)) for job in jobs] for column in self.columns}
+        return self._pa.Table.from_pydict(data, schema=self.schema)
+
+    @staticmethod
+    def get_scrape_date(job: Dict[str, Any]) -> str:
+        scraped_time = job.get("scraped_time", None)
+        return (scraped_time if isinstance(scraped_time, datetime) else datetime.now(timezone.utc)).strftime("%Y-%m-%d")
+
+    def store_jobs(self, jobs: List[Dict[str, Any]]):
+        partitions = {}  # type: Dict[str, List[Dict[str, Any]]]
+        for job in jobs:
+            partitions.setdefault(self.get_scrape_date(job), []).append(job)
+
+        for scrape_date, partition_jobs in partitions.items():
+            partition = self.site_dir.joinpath(f"scrape_date={scrape_date}")
+            partition.mkdir(parents=True, exist_ok=True)
+            file = partition.joinpath(f"part-{datetime.now(timezone.utc):%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8]}.parquet")
+            _log.debug("writing %s jobs to: '%s'", len(partition_jobs), str(file))
+            self._pq.write_table(self.to_table(partition_jobs), str(file))
+
+        self.compact(self.compact_after_files)
+
+    def compact(self, max_files: int = 1):
+        """Merge the files of each partition that has more than 'max_files' of them into single file"""
+
+        for partition, files in self.get_partition_files().items():
+            if len(files) <= max_files:
+                continue
+
+            _log.info("compacting %s files of partition: '%s'", len(files), str(partition))
+            table = self._pa.concat_tables([self._pq.read_table(str(file)) for file in files])
+            tmp_file = partition.joinpath(self.COMPACTED_TMP_FILENAME)
+            self._pq.write_table(table, str(tmp_file))
+
+            compacted_file = partition.joinpath(f"part-{uuid.uuid4().hex[:8]}-compacted.parquet")
+            manifest = partition.joinpath(self.MANIFEST_FILENAME)
+            manifest_tmp = partition.joinpath(self.MANIFEST_FILENAME + ".tmp")
+            manifest_tmp.write_text(json.dumps({"compacted": compacted_file.name,
+                                                "merged": [file.name for file in files]}), encoding="utf-8")
+            os.replace(str(manifest_tmp), str(manifest))
+            os.replace(str(tmp_file), str(compacted_file))
+            for file in files:
+                file.unlink()
+            manifest.unlink()
+
+    def get_revision(self) -> Optional[str]:
+        files = [file for partition_files in self.get_partition_files().values() for file in partition_files]
+        return f"{len(files)}:{max((file.stat().st_mtime_ns for file in files), default=0)}"
@@ -0,0 +1,163 @@
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, List, Optional
+
+import soupsieve
+from bs4 import BeautifulSoup, Tag
+
+__all__ = [
+    "BACKENDS",
+    "DEFAULT_BACKEND",
+    "HtmlBackend",
+    "LxmlBackend",
+    "SoupBackend",
+    "get_backend"
+]
+
+_log = logging.getLogger(__name__)
+_log.addHandler(logging.NullHandler())
+
+
+class HtmlBackend(ABC):
+    """Engine used by the job parsers for parsing html and looking up elements by (context-relative) CSS selectors"""
+
+    NAME: str
+
+    def __init__(self):
+        self._compiled = {}  # selector -> compiled selector
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+    def compile(self, selector: str) -> Any:
+        """Compile (once) CSS selector that matches the descendants of the context element"""
+
+        try:
+            return self._compiled[selector]
+        except KeyError:
+            compiled = self._compiled[selector] = self._compile(selector)
+            return compiled
+
+    @abstractmethod
+    def _compile(self, selector: str) -> Any:
+        pass
+
+    @abstractmethod
+    def parse_document(self, html: str) -> Any:
+        pass
+
+    @abstractmethod
+    def parse_fragment(self, html: str) -> Optional[Any]:
+        """Parse the outerHTML of a single element"""
+
+        pass
+
+    @abstractmethod
+    def select(self, compiled: Any, context: Any) -> List[Any]:
+        pass
+
+    @abstractmethod
+    def select_one(self, compiled: Any, context: Any) -> Optional[Any]:
+        pass
+
+    @abstractmethod
+    def get_text(self, element: Any) -> str:
+        pass
+
+    @abstractmethod
+    def get_attribute(self, element: Any, name: str) -> Optional[str]:
+        pass
+
+
+class SoupBackend(HtmlBackend):
+    """BeautifulSoup (with 'lxml' tree builder) + soupsieve"""
+
+    NAME = "bs4"
+
+    def _compile(self, selector: str) -> Any:
+        return soupsieve.compile(":scope " + selector)
+
+    def parse_document(self, html: str) -> BeautifulSoup:
+        return BeautifulSoup(html, "lxml")
+
+    def parse_fragment(self, html: str) -> Optional[Tag]:
+        body = BeautifulSoup(html, "lxml").body
+        return body.find(True, recursive=False) if body else None
+
+    def select(self, compiled: Any, context: Tag) -> List[Tag]:
+        return compiled.select(context)
+
+    def select_one(self, compiled: Any, context: Tag) -> Optional[Tag]:
+        return compiled.select_one(context)
+
+    def get_text(self, element: Tag) -> str:
+        return element.get_text()
+
+    def get_attribute(self, element: Tag, name: str) -> Optional[str]:
+        return element.get(name, None)
+
+
+class LxmlBackend(HtmlBackend):
+    """lxml.html + CSS selectors translated to XPath (requires 'cssselect': pip install scrape-jobs[lxml])"""
+
+    NAME = "lxml"
+
+    def __init__(self):
+        super().__init__()
+        try:
+            import lxml.html
+            from cssselect import HTMLTranslator
+            from lxml.etree import XPath
+        except ImportError as err:
+            raise RuntimeError("The 'lxml' parsing backend requires the 'cssselect' package!") from err
+
+        self._html = lxml.html
+        self._xpath_cls = XPath
+        self._translator = HTMLTranslator()
+
+    def _compile(self, selector: str) -> Any:
+        xpath = self._translator.css_to_xpath(selector, prefix="descendant::")
+        return self._xpath_cls(xpath), self._xpath_cls(f"({xpath})[1]")
+
+    def parse_document(self, html: str) -> Any:
+        return self._html.document_fromstring(html)
+
+    def parse_fragment(self, html: str) -> Optional[Any]:
+        try:
+            return self._html.fragment_fromstring(html.strip())
+        except Exception as err:
+            _log.warning("could not parse html fragment! (%s) %s", type(err).__name__, err)
+            return None
+
+    def select(self, compiled: Any, context: Any) -> List[Any]:
+        select_all, _ = compiled
+        return select_all(context)
+
+    def select_one(self, compiled: Any, context: Any) -> Optional[Any]:
+        _, select_first = compiled
+        elements = select_first(context)
+        return elements[0] if elements else None
+
+    def get_text(self, element: Any) -> str:
+        return element.text_content()
+
+    def get_attribute(self, element: Any, name: str) -> Optional[str]:
+        return element.get(name, None)
+
+
+BACKENDS = {
+    SoupBackend.NAME: SoupBackend,
+    LxmlBackend.NAME: LxmlBackend
+}
+
+DEFAULT_BACKEND = SoupBackend.NAME
+
+
+def get_backend(name: str = None) -> HtmlBackend:
+    name = name or DEFAULT_BACKEND
+    _log.debug("getting html parsing backend: '%s'", name)
+    try:
+        clz = BACKENDS[name]
+    except KeyError as kerr:
+        raise ValueError(f"Unknown html parsing backend: '{name}'! (available: {sorted(BACKENDS)})") from kerr
+    return clz()
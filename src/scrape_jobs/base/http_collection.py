@@ -0,0 +1,166 @@
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterator, List, Set
+
+from scrape_jobs import run_report
+from scrape_jobs.base.data_collection import ACollector, JobParser, Page, filter_unknown_jobs
+
+__all__ = ["HttpCollector"]
+
+_log = logging.getLogger(__name__)
+_log.addHandler(logging.NullHandler())
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/83.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "en-US,en;q=0.9"
+}
+
+
+class HttpCollector(ACollector):
+    """Collects the (plain HTML) results pages of the searches over HTTP, without browser.
+
+    The pages of each search are requested by number (urls made by 'build_url', e.g. 'SeekPage.build_results_url'),
+    up to 'max_pages' of them. The requests are plain (blocking) 'requests' calls, submitted to a pool of
+    'concurrency' threads, so the next pages are fetched while the current one is parsed, and the results are yielded
+    in the pages order. It stops on the same conditions as 'Page'.
+    """
+
+    def __init__(self,
+                 searches: List[Dict[str, Any]],
+                 build_url: Callable[[Dict[str, Any], int], str],
+                 parser: JobParser,
+                 max_post_age_days: int,
+                 max_attempts: int,
+                 concurrency: int = 4,
+                 timeout: float = 10.0,
+                 max_pages: int = 100,
+                 stop_after_known_pages: int = 0):
+        import requests  # only when the collector is used (not loaded by every run)
+
+        self.searches = searches
+        self.build_url = build_url
+        self.parser = parser
+        self.utc_posted_after = Page.calc_utc_posted_after(max_post_age_days)
+        self.max_attempts = max_attempts
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self.stop_after_known_pages = stop_after_known_pages
+        self.known_jobs_urls = set()  # type: Set[str]
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        self.requests_count = 0
+        _log.info("initialized %s: searches=%s, max_post_age_days=%s, max_attempts=%s, concurrency=%s, timeout=%s, "
+                  "max_pages=%s, stop_after_known_pages=%s, utc_posted_after=%s",
+                  type(self).__name__, len(searches), max_post_age_days, max_attempts, concurrency, timeout,
+                  max_pages, stop_after_known_pages, self.utc_posted_after)
+
+    def set_known_jobs_urls(self, known_jobs_urls: Set[str]):
+        self.known_jobs_urls = known_jobs_urls
+
+    def is_known_page(self, visible_results: List[Dict[str, Any]]) -> bool:
+        # no emptiness (size) check of the known urls - with none of them, the first lookup fails anyway
+        known_jobs_urls = self.known_jobs_urls
+        return bool(visible_results) and all(result.get("url", None) in known_jobs_urls for result in visible_results)
+
+    def fetch(self, url: str) -> str:
+        _log.debug("requesting: %s", url)
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.text
+
+    def get_visible_results(self, html: str) -> List[Dict[str, Any]]:
+        report = run_report.get_report()
+        parser = self.parser
+        with report.span("collect.soup"):
+            tags = parser.find_new(parser.parse_document(html), memoize=False)
+        with report.span("collect.parse"):
+            results = [parser.parse(tag) for tag in tags]
+        report.count("cards", len(results))
+        return results
+
+    def iter_search_jobs(self,
+                         executor: ThreadPoolExecutor,
+                         search_params: Dict[str, Any]) -> Iterator[List[Dict[str, Any]]]:
+        _log.info("collecting search: %s", search_params)
+        report = run_report.get_report()
+        in_flight: Dict[int, Future] = {}
+        next_page_number = 1
+        collected_count = 0
+        known_pages = 0
+        remaining_attempts = self.max_attempts
+        try:
+            for page_number in range(1, self.max_pages + 1):
+                while (len(in_flight) < self.concurrency) and (next_page_number <= self.max_pages):
+                    url = self.build_url(search_params, next_page_number)
+                    in_flight[next_page_number] = executor.submit(self.fetch, url)
+                    self.requests_count += 1
+                    report.count("requests")
+                    next_page_number += 1
+
+                # only the time the parsing waits for the page (the next ones are fetched meanwhile)
+                with report.span("collect.wait"):
+                    html = in_flight.pop(page_number).result()
+                report.count("pages")
+                visible_results = self.get_visible_results(html)
+                _log.info("page #%s visible results: %s", page_number, len(visible_results))
+
+                if not visible_results:
+                    _log.info("no visible results were present! Exiting loop...")
+                    break
+
+                with report.span("collect.dedup"):
+                    if self.stop_after_known_pages > 0:
+                        known_pages = (known_pages + 1) if self.is_known_page(visible_results) else 0
+                        if known_pages >= self.stop_after_known_pages:
+                            _log.info("%s consecutive page(s) contained only already stored jobs! Exiting loop...",
+                                      known_pages)
+                            break
+
+                    unknown_results = filter_unknown_jobs(visible_results, self.parser.known_identities)
+                    recent_results = [result
+                                      for result
+                                      in unknown_results
+                                      if (result.get("posted_time", None) is not None
+                                          and result["posted_time"] > self.utc_posted_after)]
+                _log.info("page #%s unknown results: %s, recent results: %s",
+                          page_number, len(unknown_results), len(recent_results))
+
+                if recent_results:
+                    collected_count += len(recent_results)
+                    report.count("collected", len(recent_results))
+                    remaining_attempts = self.max_attempts
+                    recent_results.sort(key=itemgetter("posted_time"))
+                    yield recent_results
+                else:
+                    remaining_attempts -= 1
+                    _log.warning("no new results were collected from this page! remaining attempts: %s",
+                                 remaining_attempts)
+                    if remaining_attempts <= 0:
+                        break
+        finally:
+            # the requests already running are left to complete, their pages are not needed
+            for future in in_flight.values():
+                future.cancel()
+
+        _log.info("total of %s results collected for search: %s", collected_count, search_params)
+
+    def iter_jobs(self) -> Iterator[List[Dict[str, Any]]]:
+        """Yield the recent results of each page (sorted by posted time), the searches are collected one by one"""
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="http") as executor:
+                for search_params in self.searches:
+                    yield from self.iter_search_jobs(executor, search_params)
+        finally:
+            _log.info("made %s requests", self.requests_count)
+
+    def collect_jobs(self) -> List[Dict[str, Any]]:
+        collected_results = [job for batch in self.iter_jobs() for job in batch]
+        collected_results.sort(key=itemgetter("posted_time"))
+        return collected_results
+
+    def close(self):
+        self.session.close()
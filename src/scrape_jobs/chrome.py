@@ -0,0 +1,96 @@
+"""Chrome driver creation with optional resource-blocking profile.
+
+The result pages are only read for their job cards, so the browser can skip everything else:
+
+    - 'block_resources' - resource types (see RESOURCE_URL_PATTERNS) blocked by their urls (through the DevTools
+      'Network.setBlockedURLs'), the images are also disabled in the profile preferences
+
+    - 'block_domains' - requests to these domains (and their subdomains) are blocked, e.g. ad and tracker scripts
+
+    - 'allow_domains' - when given, all other hosts are made unresolvable (through '--host-resolver-rules')
+"""
+
+import atexit
+import logging
+from typing import List, Sequence
+
+from hed_utils.selenium import chrome_driver
+from selenium.webdriver import Chrome, ChromeOptions
+
+__all__ = [
+    "RESOURCE_URL_PATTERNS",
+    "create_driver",
+    "get_blocked_url_patterns",
+    "get_chrome_options",
+    "get_host_resolver_rules"
+]
+
+_log = logging.getLogger(__name__)
+_log.addHandler(logging.NullHandler())
+
+RESOURCE_URL_PATTERNS = {
+    "image": ("png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp"),
+    "font": ("woff", "woff2", "ttf", "otf", "eot"),
+    "media": ("mp4", "webm", "ogg", "ogv", "mp3", "wav", "m4a", "m3u8", "ts"),
+    "stylesheet": ("css",)
+}
+
+
+def get_blocked_url_patterns(block_resources: Sequence[str] = (), block_domains: Sequence[str] = ()) -> List[str]:
+    unknown = [resource for resource in block_resources if resource not in RESOURCE_URL_PATTERNS]
+    if unknown:
+        raise ValueError(f"Unknown resource types: {unknown}! (available: {', '.join(RESOURCE_URL_PATTERNS)})")
+
+    patterns = []
+    for resource in block_resources:
+        for extension in RESOURCE_URL_PATTERNS[resource]:
+            patterns.extend([f"*.{extension}", f"*.{extension}?*"])
+    for domain in block_domains:
+        patterns.extend([f"*://{domain}/*", f"*://*.{domain}/*"])
+    return patterns
+
+
+def get_host_resolver_rules(allow_domains: Sequence[str]) -> str:
+    """Map every host, except the allowed domains and their subdomains, to a non-existing address"""
+
+    rules = ["MAP * ~NOTFOUND"]
+    for domain in allow_domains:
+        rules.extend([f"EXCLUDE {domain}", f"EXCLUDE *.{domain}"])
+    return ", ".join(rules)
+
+
+def get_chrome_options(headless: bool,
+                       block_resources: Sequence[str] = (),
+                       allow_domains: Sequence[str] = ()) -> ChromeOptions:
+    options: ChromeOptions = chrome_driver.get_options(headless=headless)
+    if "image" in block_resources:
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    if allow_domains:
+        options.add_argument(f"--host-resolver-rules={get_host_resolver_rules(allow_domains)}")
+    return options
+
+
+def create_driver(headless: bool,
+                  block_resources: Sequence[str] = (),
+                  block_domains: Sequence[str] = (),
+                  allow_domains: Sequence[str] = ()) -> Chrome:
+    """Create Chrome driver (quit at program exit) applying the resource-blocking profile, if any"""
+
+    patterns = get_blocked_url_patterns(block_resources, block_domains)
+    options = get_chrome_options(headless, block_resources, allow_domains)
+    _log.debug("creating Chrome driver: headless=%s, block_resources=%s, block_domains=%s, allow_domains=%s",
+               headless, list(block_resources), list(block_domains), list(allow_domains))
+
+    driver = Chrome(options=options)
+    atexit.register(driver.quit)
+
+    if patterns:
+        _log.debug("blocking %s url patterns", len(patterns))
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        except Exception:
+            driver.quit()
+            raise
+
+    return driver
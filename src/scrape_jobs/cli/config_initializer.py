@@ -1,12 +1,10 @@
 import argparse
 import logging
 import sys
+from datetime import datetime
 from pathlib import Path
 from tempfile import gettempdir
 
-from hed_utils.support import log
-from hed_utils.support.file_utils import get_stamp
-
 from scrape_jobs import __version__, config
 
 _log = logging.getLogger(__name__)
@@ -15,14 +13,20 @@ _log.addHandler(logging.NullHandler())
 
 def get_log_filepath() -> str:
     filename = "scrape-jobs-init-config_"
-    filename += get_stamp()
+    filename += datetime.utcnow().strftime("%Y-%m-%d_%H_%M_%S")  # same stamp as 'hed_utils' file_utils.get_stamp
     filename += ".log"
     return str(Path(gettempdir()).joinpath(filename).absolute())
 
 
 def init_logging(level):
+    # plain logging setup, as 'hed_utils.support' would load all of its (gspread, selenium etc.) dependencies
     logfile = get_log_filepath()
-    log.init(level=level or logging.INFO, file=logfile, log_format=config.LOG_FORMAT)
+    level = level or logging.INFO
+    file_handler = logging.FileHandler(logfile)
+    file_handler.setLevel(level)
+    logging.basicConfig(level=level,
+                        format=config.LOG_FORMAT,
+                        handlers=[logging.StreamHandler(sys.stdout), file_handler])
     _log.info("initialized log-file at: %s", logfile)
 
 
@@ -89,3 +93,7 @@ def run():
 
     call_args = sys.argv[1:]
     main(call_args)
+
+
+if __name__ == "__main__":
+    run()
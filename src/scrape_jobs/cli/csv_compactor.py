@@ -0,0 +1,105 @@
+import argparse
+import logging
+import sys
+from pathlib import Path
+from tempfile import gettempdir
+
+from scrape_jobs import __version__, config
+
+_log = logging.getLogger(__name__)
+_log.addHandler(logging.NullHandler())
+
+
+def get_log_filepath() -> str:
+    from hed_utils.support.file_utils import get_stamp
+
+    filename = "scrape-jobs-compact-csv_"
+    filename += get_stamp()
+    filename += ".log"
+    return str(Path(gettempdir()).joinpath(filename).absolute())
+
+
+def init_logging(level):
+    from hed_utils.support import log
+
+    logfile = get_log_filepath()
+    log.init(level=level or logging.INFO, file=logfile, log_format=config.LOG_FORMAT)
+    _log.info("initialized log-file at: %s", logfile)
+
+
+def parse_args(args):
+    """Parse command line parameters
+
+    Args:
+      args ([str]): command line parameters as list of strings
+
+    Returns:
+      :obj:`argparse.Namespace`: command line parameters namespace
+    """
+
+    parser = argparse.ArgumentParser(description="compact the 'scrape-jobs' CSV storage file and rebuild its index")
+
+    parser.add_argument("--version",
+                        action="version",
+                        version="scrape-jobs-compact-csv {ver}".format(ver=__version__))
+
+    parser.add_argument("-v",
+                        "--verbose",
+                        dest="loglevel",
+                        help="set loglevel to INFO",
+                        action="store_const",
+                        const=logging.INFO)
+
+    parser.add_argument("-vv",
+                        "--very-verbose",
+                        dest="loglevel",
+                        help="set loglevel to DEBUG",
+                        action="store_const",
+                        const=logging.DEBUG)
+
+    parser.add_argument("-f",
+                        dest="file",
+                        action="store",
+                        default=None,
+                        help="defaults to the site's fallback CSV file in the temp dir")
+
+    parser.add_argument(dest="site",
+                        action="store",
+                        choices={"seek.com.au", "linkedin.com"},
+                        type=str,
+                        help="site whose jobs are stored in the file")
+
+    return parser.parse_args(args)
+
+
+def compact_csv(site: str, file: str = None):
+    from scrape_jobs import runner
+    from scrape_jobs.base.data_storage import IndexedCsvJobsStorage
+
+    filepath = file or runner.get_csv_filepath(site)
+    storage = IndexedCsvJobsStorage(runner.get_column_names(site), filepath)
+    if not storage.filepath.exists():
+        raise RuntimeError(f"No such CSV file: '{storage.filepath}'")
+
+    rows = storage.compact()
+    _log.info("compacted '%s' (rows: %s)", str(storage.filepath), rows)
+
+
+def main(call_args):
+    """Main entry point allowing external calls"""
+
+    args = parse_args(call_args)
+    init_logging(args.loglevel)
+    _log.info("'scrape-jobs-compact-csv' called with args: %s", args)
+    compact_csv(args.site, args.file)
+
+
+def run():
+    """Entry point for console_scripts"""
+
+    call_args = sys.argv[1:]
+    main(call_args)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,104 @@
+import argparse
+import logging
+import signal
+import sys
+from functools import partial
+from pathlib import Path
+
+from scrape_jobs import __version__, config
+from scrape_jobs.cli.jobs_scraper import get_sites, init_logging, init_worker_logging
+
+_log = logging.getLogger(__name__)
+_log.addHandler(logging.NullHandler())
+
+
+def parse_args(args):
+    """Parse command line parameters
+
+    Args:
+      args ([str]): command line parameters as list of strings
+
+    Returns:
+      :obj:`argparse.Namespace`: command line parameters namespace
+    """
+
+    parser = argparse.ArgumentParser(description="Scrape jobs on schedule ('daemon_interval' minutes), keeping the "
+                                                 "browser and the known jobs urls warm between the runs.")
+
+    parser.add_argument("--version",
+                        action="version",
+                        version="scrape-jobs-daemon {ver}".format(ver=__version__))
+
+    parser.add_argument("-v",
+                        "--verbose",
+                        dest="loglevel",
+                        help="set loglevel to INFO",
+                        action="store_const",
+                        const=logging.INFO)
+
+    parser.add_argument("-vv",
+                        "--very-verbose",
+                        dest="loglevel",
+                        help="set loglevel to DEBUG",
+                        action="store_const",
+                        const=logging.DEBUG)
+
+    default_file = str(Path.cwd().joinpath(config.CONFIG_FILENAME).absolute())
+    parser.add_argument("-c",
+                        dest="config_file",
+                        action="store",
+                        default=default_file,
+                        type=str,
+                        help=f"defaults to '{default_file}'")
+
+    parser.add_argument("--runs",
+                        dest="runs",
+                        action="store",
+                        default=0,
+                        type=int,
+                        help="stop after this many runs (default: 0 - run until terminated)")
+
+    parser.add_argument(dest="sites",
+                        action="store",
+                        nargs="+",
+                        choices={"seek.com.au", "linkedin.com", "all"},
+                        type=str,
+                        help="site(s) to scrape ('all' for all sites), each site is served in its own process")
+
+    return parser.parse_args(args)
+
+
+def main(call_args):
+    """Main entry point allowing external calls
+
+    Args:
+      call_args ([str]): command line parameter list
+    """
+
+    args = parse_args(call_args)
+    init_logging(args.loglevel)
+
+    from scrape_jobs import daemon, runner
+
+    _log.info("'scrape-jobs-daemon' called with args: %s", args)
+    sites = get_sites(args.sites)
+    if len(sites) == 1:
+        result = daemon.run_site_daemon(sites[0], args.config_file, max_runs=args.runs)
+        return 0 if result.succeeded else 1
+
+    # on SIGTERM the site processes are terminated too, and they stop after their current run
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(1))
+    results = daemon.run_site_daemons(sites, args.config_file, partial(init_worker_logging, args.loglevel), args.runs)
+    print(runner.format_site_results(results))
+    return 0 if all(result.succeeded for result in results) else 1
+
+
+def run():
+    """Entry point for 'scrape-jobs-daemon' CLI"""
+
+    call_args = sys.argv[1:]
+    sys.exit(main(call_args))
+
+
+if __name__ == "__main__":
+    run()
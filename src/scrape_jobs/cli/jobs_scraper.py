@@ -1,13 +1,11 @@
 import argparse
 import logging
 import sys
+from functools import partial
 from pathlib import Path
 from tempfile import gettempdir
 
-from hed_utils.support import log
-from hed_utils.support.file_utils import get_stamp
-
-from scrape_jobs import __version__, runner, config
+from scrape_jobs import __version__, config
 from scrape_jobs.config import LOG_FORMAT
 
 __author__ = "Hrissimir"
@@ -56,26 +54,74 @@ def parse_args(args):
                         type=str,
                         help=f"defaults to '{default_file}'")
 
-    parser.add_argument(dest="site",
+    parser.add_argument("--report",
+                        dest="report",
+                        action="store_true",
+                        help="print the timings and the counts of the run phases (also saved as JSON next to the log)")
+
+    parser.add_argument("--profile",
+                        dest="profile",
                         action="store",
-                        choices={"seek.com.au", "linkedin.com"},
+                        choices=("cprofile", "sampling"),
+                        default=None,
+                        help="profile the run (of each site) and save the profile (pstats / collapsed stacks) next to "
+                             "the log, the top hot spots are printed at the end")
+
+    parser.add_argument(dest="sites",
+                        action="store",
+                        nargs="+",
+                        choices={"seek.com.au", "linkedin.com", "all"},
                         type=str,
-                        help="site to scrape")
+                        help="site(s) to scrape ('all' for all sites), multiple sites are scraped in parallel")
 
     return parser.parse_args(args)
 
 
-def get_log_filepath() -> str:
+# The modules pulling in selenium, the site packages and the storage backends (hed_utils, runner etc.) are imported in
+# the functions needing them, so '--version', '--help' and the argument errors are answered right away.
+
+
+def get_log_filepath(site: str = None) -> str:
+    from hed_utils.support.file_utils import get_stamp
+
     filename = "scrape-jobs_"
+    if site:
+        filename += site.replace(".", "_")
+        filename += "_"
     filename += get_stamp()
     filename += ".log"
     return str(Path(gettempdir()).joinpath(filename).absolute())
 
 
-def init_logging(level):
-    logfile = get_log_filepath()
+def init_logging(level, site: str = None) -> str:
+    from hed_utils.support import log
+
+    logfile = get_log_filepath(site)
     log.init(level=level or logging.INFO, file=logfile, log_format=LOG_FORMAT)
     _log.info("initialized log-file at: %s", logfile)
+    return logfile
+
+
+def init_worker_logging(level, site: str = None) -> str:
+    """Init the logging of (forked) site worker process, into its own log file.
+
+    The root handlers inherited from the parent are dropped first, otherwise the basic config is skipped and the
+    worker keeps writing into the parent's log file too.
+    """
+
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+        handler.close()
+    return init_logging(level, site)
+
+
+def get_sites(args_sites) -> list:
+    from scrape_jobs import runner
+
+    if "all" in args_sites:
+        return list(runner.SITES)
+    return list(dict.fromkeys(args_sites))  # unique, in the given order
 
 
 def main(call_args):
@@ -86,14 +132,36 @@ def main(call_args):
     """
 
     args = parse_args(call_args)
-    init_logging(args.loglevel)
+    logfile = init_logging(args.loglevel)
+
+    from scrape_jobs import profiling, run_report, runner
 
     _log.info("'scrape-jobs' called with args: %s", args)
-    runner.run_with_config_file(args.site, args.config_file)
+    sites = get_sites(args.sites)
+    if len(sites) == 1:
+        try:
+            with profiling.profiled(args.profile, logfile):
+                runner.run_with_config_file(sites[0], args.config_file, runner.get_report_filepath(logfile))
+        finally:
+            if args.report:
+                print(run_report.get_report().format_table())
+        return 0
+
+    results = runner.run_sites(sites,
+                               args.config_file,
+                               worker_init=partial(init_worker_logging, args.loglevel),
+                               print_report=args.report,
+                               profile=args.profile)
+    print(runner.format_site_results(results))
+    return 0 if all(result.succeeded for result in results) else 1
 
 
 def run():
     """Entry point for 'scrape-jobs' CLI"""
 
     call_args = sys.argv[1:]
-    main(call_args)
+    sys.exit(main(call_args))
+
+
+if __name__ == "__main__":
+    run()
@@ -2,14 +2,15 @@ import logging
 import pkgutil
 from collections import namedtuple
 from configparser import ConfigParser
-
-from hed_utils.support.config_tool import parse_file, format_parser
+from typing import Any, Dict, List
 
 __all__ = [
     "LOG_FORMAT",
     "CONFIG_FILENAME",
+    "RunConfig",
     "SearchConfig",
     "SheetsConfig",
+    "StorageConfig",
     "TimeConfig",
     "Config",
     "get_sample_contents"
@@ -22,9 +23,17 @@ LOG_FORMAT = "%(asctime)s | %(levelname)8s | %(message)s"
 CONFIG_FILENAME = "scrape-jobs.ini"
 SAMPLE_FILENAME = "sample_config.ini"
 
-SearchConfig = namedtuple("SearchConfig", "driver_headless search_params max_post_age_days max_attempts")
-SheetsConfig = namedtuple("SheetsConfig", "spreadsheet_title worksheet_title json_filepath")
+SearchConfig = namedtuple("SearchConfig",
+                          "driver_headless search_params max_post_age_days max_attempts incremental_extraction "
+                          "html_backend replay_dir replay_latency stop_after_known_pages searches search_workers "
+                          "url_search collector http_concurrency http_max_pages block_resources block_domains "
+                          "allow_domains")
+SheetsConfig = namedtuple("SheetsConfig",
+                          "spreadsheet_title worksheet_title json_filepath sheets_chunk_size sheets_max_retries "
+                          "sheets_write_behind sheets_urls_cache")
+StorageConfig = namedtuple("StorageConfig", "storage url_index sqlite_filepath csv_index parquet_dir")
 TimeConfig = namedtuple("TimeConfig", "tz_name posted_fmt scraped_fmt")
+RunConfig = namedtuple("RunConfig", "streaming daemon_interval metrics_dir")
 
 
 def get_sample_contents():
@@ -34,18 +43,41 @@ def get_sample_contents():
 
 class Config:
     DEFAULT_MAX_ATTEMPTS = 3
+    DEFAULT_INCREMENTAL_EXTRACTION = False
+    DEFAULT_HTML_BACKEND = "bs4"
+    DEFAULT_REPLAY_LATENCY = 0.0
+    DEFAULT_STREAMING = False
+    DEFAULT_STOP_AFTER_KNOWN_PAGES = 0
+    DEFAULT_URL_INDEX = False
+    DEFAULT_STORAGE = "sheets"
+    DEFAULT_SHEETS_CHUNK_SIZE = 500
+    DEFAULT_SHEETS_MAX_RETRIES = 5
+    DEFAULT_SHEETS_WRITE_BEHIND = False
+    DEFAULT_SHEETS_URLS_CACHE = False
+    DEFAULT_CSV_INDEX = False
+    DEFAULT_SEARCH_WORKERS = 2
+    DEFAULT_DAEMON_INTERVAL = 60.0
+    DEFAULT_URL_SEARCH = False
+    DEFAULT_COLLECTOR = "browser"
+    DEFAULT_HTTP_CONCURRENCY = 4
+    DEFAULT_HTTP_MAX_PAGES = 100
     SECTION: str
     search_config: SearchConfig
     sheets_config: SheetsConfig
+    storage_config: StorageConfig
     time_config: TimeConfig
+    run_config: RunConfig
 
     def __init__(self):
         self.search_config = None
         self.sheets_config = None
+        self.storage_config = None
         self.time_config = None
+        self.run_config = None
 
     def __repr__(self):
-        return f"{type(self).__name__}({self.search_config}, {self.sheets_config}, {self.time_config})"
+        return (f"{type(self).__name__}({self.search_config}, {self.sheets_config}, {self.storage_config}, "
+                f"{self.time_config}, {self.run_config})")
 
     @classmethod
     def parse_search_config(cls, parser: ConfigParser) -> SearchConfig:
@@ -53,7 +85,52 @@ class Config:
         return SearchConfig(driver_headless=parser.getboolean(cls.SECTION, "driver_headless"),
                             search_params=dict(),
                             max_post_age_days=parser.getint(cls.SECTION, "max_post_age_days"),
-                            max_attempts=parser.getint(cls.SECTION, "max_attempts", fallback=cls.DEFAULT_MAX_ATTEMPTS))
+                            max_attempts=parser.getint(cls.SECTION, "max_attempts", fallback=cls.DEFAULT_MAX_ATTEMPTS),
+                            incremental_extraction=parser.getboolean(
+                                cls.SECTION, "incremental_extraction", fallback=cls.DEFAULT_INCREMENTAL_EXTRACTION),
+                            html_backend=parser.get(cls.SECTION, "html_backend", fallback=cls.DEFAULT_HTML_BACKEND),
+                            replay_dir=parser.get(cls.SECTION, "replay_dir", fallback="") or None,
+                            replay_latency=parser.getfloat(
+                                cls.SECTION, "replay_latency", fallback=cls.DEFAULT_REPLAY_LATENCY),
+                            stop_after_known_pages=parser.getint(
+                                cls.SECTION, "stop_after_known_pages", fallback=cls.DEFAULT_STOP_AFTER_KNOWN_PAGES),
+                            searches=list(),
+                            search_workers=parser.getint(
+                                cls.SECTION, "search_workers", fallback=cls.DEFAULT_SEARCH_WORKERS),
+                            url_search=parser.getboolean(cls.SECTION, "url_search", fallback=cls.DEFAULT_URL_SEARCH),
+                            collector=parser.get(cls.SECTION, "collector", fallback=cls.DEFAULT_COLLECTOR),
+                            http_concurrency=parser.getint(
+                                cls.SECTION, "http_concurrency", fallback=cls.DEFAULT_HTTP_CONCURRENCY),
+                            http_max_pages=parser.getint(
+                                cls.SECTION, "http_max_pages", fallback=cls.DEFAULT_HTTP_MAX_PAGES),
+                            block_resources=cls.parse_list(parser, "block_resources"),
+                            block_domains=cls.parse_list(parser, "block_domains"),
+                            allow_domains=cls.parse_list(parser, "allow_domains"))
+
+    @classmethod
+    def parse_list(cls, parser: ConfigParser, option: str) -> List[str]:
+        """Parse comma (or new-line) separated values of optional option"""
+
+        value = parser.get(cls.SECTION, option, fallback="")
+        return [item.strip() for item in value.replace("\n", ",").split(",") if item.strip()]
+
+    @classmethod
+    def parse_searches(cls, parser: ConfigParser, options: Dict[str, str]) -> List[Dict[str, Any]]:
+        """Parse the search params (param name -> config option), where each option may hold one value per line.
+
+        The options having single value apply to all searches, the rest must have one value per search.
+        """
+
+        values = {param: [line.strip() for line in parser.get(cls.SECTION, option).splitlines() if line.strip()] or [""]
+                  for param, option in options.items()}
+        count = max(len(param_values) for param_values in values.values())
+        for param, param_values in values.items():
+            if len(param_values) not in {1, count}:
+                raise ValueError(f"Expected 1 or {count} values of '{options[param]}', got: {param_values}")
+
+        return [{param: (param_values[0] if len(param_values) == 1 else param_values[i])
+                 for param, param_values in values.items()}
+                for i in range(count)]
 
     @classmethod
     def parse_time_config(cls, parser: ConfigParser) -> TimeConfig:
@@ -67,7 +144,32 @@ class Config:
         _log.debug("parsing sheets config...")
         return SheetsConfig(spreadsheet_title=parser.get(cls.SECTION, "spreadsheet_title"),
                             worksheet_title=parser.get(cls.SECTION, "worksheet_title"),
-                            json_filepath=parser.get(cls.SECTION, "json_filepath"))
+                            json_filepath=parser.get(cls.SECTION, "json_filepath"),
+                            sheets_chunk_size=parser.getint(
+                                cls.SECTION, "sheets_chunk_size", fallback=cls.DEFAULT_SHEETS_CHUNK_SIZE),
+                            sheets_max_retries=parser.getint(
+                                cls.SECTION, "sheets_max_retries", fallback=cls.DEFAULT_SHEETS_MAX_RETRIES),
+                            sheets_write_behind=parser.getboolean(
+                                cls.SECTION, "sheets_write_behind", fallback=cls.DEFAULT_SHEETS_WRITE_BEHIND),
+                            sheets_urls_cache=parser.getboolean(
+                                cls.SECTION, "sheets_urls_cache", fallback=cls.DEFAULT_SHEETS_URLS_CACHE))
+
+    @classmethod
+    def parse_storage_config(cls, parser: ConfigParser) -> StorageConfig:
+        _log.debug("parsing storage config...")
+        return StorageConfig(storage=parser.get(cls.SECTION, "storage", fallback=cls.DEFAULT_STORAGE),
+                             url_index=parser.getboolean(cls.SECTION, "url_index", fallback=cls.DEFAULT_URL_INDEX),
+                             sqlite_filepath=parser.get(cls.SECTION, "sqlite_filepath", fallback="") or None,
+                             csv_index=parser.getboolean(cls.SECTION, "csv_index", fallback=cls.DEFAULT_CSV_INDEX),
+                             parquet_dir=parser.get(cls.SECTION, "parquet_dir", fallback="") or None)
+
+    @classmethod
+    def parse_run_config(cls, parser: ConfigParser) -> RunConfig:
+        _log.debug("parsing run config...")
+        return RunConfig(streaming=parser.getboolean(cls.SECTION, "streaming", fallback=cls.DEFAULT_STREAMING),
+                         daemon_interval=parser.getfloat(
+                             cls.SECTION, "daemon_interval", fallback=cls.DEFAULT_DAEMON_INTERVAL),
+                         metrics_dir=parser.get(cls.SECTION, "metrics_dir", fallback="") or None)
 
     @classmethod
     def parse(cls, parser: ConfigParser):
@@ -75,11 +177,15 @@ class Config:
         config = cls()
         config.search_config = cls.parse_search_config(parser)
         config.sheets_config = cls.parse_sheets_config(parser)
+        config.storage_config = cls.parse_storage_config(parser)
         config.time_config = cls.parse_time_config(parser)
+        config.run_config = cls.parse_run_config(parser)
         return config
 
     @classmethod
     def parse_file(cls, src_file: str):
+        from hed_utils.support.config_tool import parse_file, format_parser  # not needed by 'scrape-jobs-init-config'
+
         _log.debug("reading '%s' config from file: '%s'", cls.__name__, src_file)
         parser = parse_file(src_file)
         _log.debug("got config contents:\n\n", format_parser(parser))
@@ -0,0 +1,237 @@
+"""Long-lived runner of the sites programs on schedule (see the 'scrape-jobs-daemon' CLI).
+
+Between the runs it keeps warm:
+
+    - the parsed config, the jobs processor and the jobs storage
+
+    - the known jobs urls (in memory, read again from the storage only when its revision changes)
+
+    - the driver(s), which are recycled after failed run
+
+The times and the outcome of the last run are saved to a state file, so a restarted daemon resumes the schedule
+instead of scraping again right away (set 'url_index = yes' to have the known jobs urls persisted too). The report of
+the last run (see 'run_report') is saved next to it.
+"""
+
+import json
+import logging
+import signal
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from hed_utils.selenium import SharedDriver
+
+from scrape_jobs import run_report, runner
+from scrape_jobs.base.data_collection import ACollector
+from scrape_jobs.base.data_processing import AProcessor
+from scrape_jobs.base.data_storage import AStorage, IndexedStorage, MemoryUrlIndex
+from scrape_jobs.config import Config
+from scrape_jobs.program import Program
+from scrape_jobs.runner import MultiSearchCollector, SiteResult
+
+__all__ = [
+    "SiteDaemon",
+    "run_site_daemon",
+    "run_site_daemons"
+]
+
+_log = logging.getLogger(__name__)
+_log.addHandler(logging.NullHandler())
+
+
+class SiteDaemon:
+    """Runs the site's program every 'daemon_interval' minutes, reusing what was set up for the first run.
+
+    The schedule is kept by the 'clock' (seconds since epoch, 'time.time' by default).
+    """
+
+    def __init__(self,
+                 site: str,
+                 config: Config,
+                 state_filepath: str,
+                 report_filepath: str = None,
+                 clock: Callable[[], float] = time.time):
+        self.site = site
+        self.config = config
+        self.interval_seconds = config.run_config.daemon_interval * 60
+        self.state_filepath = Path(state_filepath).absolute()
+        self.report_filepath = report_filepath
+        self.clock = clock
+        self.state = self.load_state()
+        self.processor: Optional[AProcessor] = None
+        self.storage: Optional[AStorage] = None
+        self.multi_search_collector: Optional[MultiSearchCollector] = None
+        self.driver_ready = False
+        self._stop_event = threading.Event()
+        _log.info("initialized %s: site='%s', interval_seconds=%s, state_filepath='%s'",
+                  type(self).__name__, site, self.interval_seconds, str(self.state_filepath))
+
+    def load_state(self) -> Dict[str, Any]:
+        try:
+            with self.state_filepath.open(mode="r", encoding="utf-8") as fp:
+                state = json.load(fp)
+        except FileNotFoundError:
+            return {"site": self.site, "runs": 0, "failures": 0}
+        except Exception as err:
+            _log.warning("Error while reading daemon state! (%s) %s", type(err).__name__, err)
+            return {"site": self.site, "runs": 0, "failures": 0}
+
+        _log.info("loaded daemon state: %s", state)
+        return state
+
+    def save_state(self):
+        tmp_filepath = self.state_filepath.with_name(self.state_filepath.name + ".tmp")
+        with tmp_filepath.open(mode="w", encoding="utf-8") as fp:
+            json.dump(self.state, fp, indent=2)
+        tmp_filepath.replace(self.state_filepath)
+
+    def prepare(self):
+        """Prepare the processor and the storage, keeping the known jobs urls in memory between the runs"""
+
+        self.processor = runner.prepare_processor(self.config.time_config)
+        storage = runner.prepare_storage(self.site, self.config.storage_config, self.config.sheets_config)
+        if not isinstance(storage, IndexedStorage):
+            storage = IndexedStorage(storage, MemoryUrlIndex())
+        self.storage = storage
+
+    def prepare_collector(self) -> ACollector:
+        """Get collector for the next run, creating the driver(s) only if there are none from the previous run"""
+
+        search_cfg = self.config.search_config
+        if search_cfg.collector != "browser":
+            return runner.prepare_collector(self.site, search_cfg)
+
+        if len(search_cfg.searches) > 1:
+            if self.multi_search_collector is None:
+                self.multi_search_collector = MultiSearchCollector(self.site, search_cfg, keep_workers=True)
+            return self.multi_search_collector
+
+        if not self.driver_ready:
+            runner.init_search_driver(search_cfg)
+            self.driver_ready = True
+        # the page is created on each run, as it calculates the max post age at init
+        return runner.create_page(self.site, search_cfg, search_cfg.search_params)
+
+    def recycle(self):
+        """Quit the driver(s), so new ones are created for the next run"""
+
+        if self.multi_search_collector is not None:
+            self.multi_search_collector.close(terminate=True)
+
+        if self.driver_ready:
+            self.driver_ready = False
+            try:
+                SharedDriver().quit()
+            except Exception as err:
+                _log.debug("could not quit driver! (%s) %s", type(err).__name__, err)
+
+    def run_once(self) -> SiteResult:
+        _log.info("Starting scheduled run #%s of '%s'...", self.state.get("runs", 0) + 1, self.site)
+        self.state["last_started"] = self.clock()
+        start_time = perf_counter()
+        report = run_report.new_report(self.site)
+        program = None
+        try:
+            with report.span("prepare.collector"):
+                collector = self.prepare_collector()
+            program = Program(collector, self.processor, self.storage, streaming=self.config.run_config.streaming)
+            program.execute()
+            report.finish(True)
+            result = SiteResult(self.site, True, perf_counter() - start_time, "")
+            _log.info("Scheduled run completed! [took: %d min. %d s.]", result.seconds // 60, result.seconds % 60)
+        except Exception as err:
+            _log.exception("Error during scheduled run, recycling the driver(s)! ( %s ) %s", type(err).__name__, err)
+            self.recycle()
+            report.finish(False, program.failed_stage if program else "prepare", err)
+            result = SiteResult(self.site, False, perf_counter() - start_time, report.error)
+
+        runner.publish_report(report, self.report_filepath, self.config.run_config.metrics_dir)
+
+        self.state["runs"] = self.state.get("runs", 0) + 1
+        self.state["failures"] = self.state.get("failures", 0) + (0 if result.succeeded else 1)
+        self.state.update(last_finished=self.clock(),
+                          last_succeeded=result.succeeded,
+                          last_seconds=round(result.seconds, 3),
+                          last_error=result.error,
+                          last_failed_stage=report.failed_stage,
+                          next_run=self.state["last_started"] + self.interval_seconds)
+        self.save_state()
+        return result
+
+    def get_seconds_to_next_run(self) -> float:
+        last_started = self.state.get("last_started", None)
+        if last_started is None:
+            return 0.0
+        return max(0.0, last_started + self.interval_seconds - self.clock())
+
+    def serve(self, max_runs: int = 0) -> SiteResult:
+        """Run on schedule until stopped (or 'max_runs' are done, if set) and return the result of the last run"""
+
+        self.prepare()
+        result = SiteResult(self.site, True, 0.0, "")
+        runs = 0
+        try:
+            while not self._stop_event.is_set():
+                delay = self.get_seconds_to_next_run()
+                if delay:
+                    _log.info("Next run of '%s' at: %s", self.site, datetime.fromtimestamp(self.clock() + delay))
+                    if self._stop_event.wait(delay):
+                        break
+
+                result = self.run_once()
+                runs += 1
+                if max_runs and (runs >= max_runs):
+                    break
+        finally:
+            self.close()
+
+        _log.info("'%s' daemon stopped! (runs: %s)", self.site, runs)
+        return result
+
+    def stop(self):
+        """Stop serving after the current run (if any)"""
+
+        _log.info("Stopping '%s' daemon...", self.site)
+        self._stop_event.set()
+
+    def close(self):
+        self.recycle()
+        self.multi_search_collector = None
+
+
+def run_site_daemon(site: str,
+                    configfile: str,
+                    worker_init: Callable[[str], None] = None,
+                    max_runs: int = 0) -> SiteResult:
+    """Serve the site's daemon (until SIGTERM or 'max_runs') and report the outcome instead of raising"""
+
+    start_time = perf_counter()
+    try:
+        if worker_init:
+            worker_init(site)
+        config = runner.read_config(site, configfile)
+        daemon = SiteDaemon(site,
+                            config,
+                            runner.get_daemon_state_filepath(site),
+                            runner.get_daemon_report_filepath(site))
+        signal.signal(signal.SIGTERM, lambda signum, frame: daemon.stop())
+        return daemon.serve(max_runs)
+    except BaseException as err:
+        _log.exception("Error while running '%s' daemon! (%s) %s", site, type(err).__name__, err)
+        cause = err.__cause__ or err
+        return SiteResult(site, False, perf_counter() - start_time, f"{type(cause).__name__}: {cause}")
+
+
+def run_site_daemons(sites: Sequence[str],
+                     configfile: str,
+                     worker_init: Callable[[str], None] = None,
+                     max_runs: int = 0) -> List[SiteResult]:
+    """Serve the daemon of each site in its own process (with its own browser)"""
+
+    configfile = str(Path(configfile).absolute())
+    _log.info("Starting daemons of %s sites: %s", len(sites), list(sites))
+    return runner.run_site_processes(run_site_daemon, sites, (configfile, worker_init, max_runs))
@@ -12,10 +12,10 @@ class LinkedinConfig(Config):
     def parse_search_config(cls, parser: ConfigParser) -> SearchConfig:
         search_config = super().parse_search_config(parser)
 
-        # update the search_params dict with parsed values
-        search_params = search_config.search_params
-        search_params["keywords"] = parser.get(cls.SECTION, "search_keywords")
-        search_params["location"] = parser.get(cls.SECTION, "search_location")
-        search_params["date_posted"] = parser.get(cls.SECTION, "date_posted")
+        # update the searches list and the search_params dict (of the first search) with parsed values
+        search_config.searches.extend(cls.parse_searches(parser, {"keywords": "search_keywords",
+                                                                  "location": "search_location",
+                                                                  "date_posted": "date_posted"}))
+        search_config.search_params.update(search_config.searches[0])
 
         return search_config
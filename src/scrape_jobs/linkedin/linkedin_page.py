@@ -1,10 +1,8 @@
 import logging
 from typing import Dict, Any
+from urllib.parse import quote, urlencode
 
-from hed_utils.selenium import FindBy, SharedDriver
 from hed_utils.support.text_tool import normalize_spacing
-from hed_utils.support.time_tool import poll_for_result
-from selenium.webdriver.common.keys import Keys
 
 from scrape_jobs.base.data_collection import Page
 from scrape_jobs.linkedin import LinkedinJob
@@ -14,23 +12,63 @@ __all__ = ["LinkedinPage"]
 _log = logging.getLogger(__name__)
 _log.addHandler(logging.NullHandler())
 
+# 'hed_utils.selenium' and selenium are imported by the methods driving the browser only, so the results urls can be
+# built without them (e.g. by the http collector)
+
 
 class LinkedinPage(Page):
     PAGE_URL = "https://www.linkedin.com/jobs"
+    RESULTS_URL = "https://www.linkedin.com/jobs/search"
+    RESULTS_PER_PAGE = 25
+    DATE_POSTED_FILTERS = {"past 24 hours": "r86400", "past week": "r604800", "past month": "r2592000"}
+    SEE_MORE_JOBS_SELECTOR = "button.see-more-jobs"
+    # the infinite scroll fetches more results in background, so the page is considered settled after longer quiet
+    SCROLL_QUIET_SECONDS = 2.0
+
+    def __init__(self,
+                 search_params: Dict[str, Any],
+                 max_post_age_days: int,
+                 max_attempts: int,
+                 incremental: bool = False,
+                 backend: str = None,
+                 stop_after_known_pages: int = 0,
+                 url_search: bool = False):
+        super().__init__(search_params,
+                         max_post_age_days,
+                         max_attempts,
+                         parser=LinkedinJob(backend=backend),
+                         incremental=incremental,
+                         stop_after_known_pages=stop_after_known_pages,
+                         url_search=url_search)
+        from hed_utils.selenium import FindBy
 
-    def __init__(self, search_params: Dict[str, Any], max_post_age_days: int, max_attempts: int):
-        super().__init__(search_params, max_post_age_days, max_attempts, parser=LinkedinJob())
         self._keywords_input = FindBy.NAME("keywords", visible_only=True)
         self._location_input = FindBy.NAME("location", visible_only=True)
         self._search_button = FindBy.CSS_SELECTOR("button[type='submit'][aria-label='Search']", visible_only=True)
-        self._see_more_jobs_button = FindBy.CSS_SELECTOR("button.see-more-jobs", visible_only=True)
+        self._see_more_jobs_button = FindBy.CSS_SELECTOR(self.SEE_MORE_JOBS_SELECTOR, visible_only=True)
         self._search_results = FindBy.CSS_SELECTOR("section.results__list > ul > li.result-card", visible_only=True)
         self._date_posted_filter = DatePostedFilter()
 
+    @classmethod
+    def build_results_url(cls, search_params: Dict[str, Any], page_number: int) -> str:
+        """Build the url of the (public, sorted by date) results page with the given number"""
+
+        query = {"keywords": search_params.get("keywords", ""),
+                 "location": search_params.get("location", ""),
+                 "sortBy": "DD"}
+        date_posted = cls.DATE_POSTED_FILTERS.get(search_params.get("date_posted", "").strip().lower(), None)
+        if date_posted:
+            query["f_TPR"] = date_posted
+        if page_number > 1:
+            query["start"] = (page_number - 1) * cls.RESULTS_PER_PAGE
+        return f"{cls.RESULTS_URL}?{urlencode(query, quote_via=quote)}"
+
     def perform_search(self):
         self.set_search_params()
 
     def set_search_params(self):
+        from selenium.webdriver.common.keys import Keys
+
         _log.info("setting search params...")
         search_params = self.search_params
 
@@ -52,23 +90,22 @@ class LinkedinPage(Page):
         self._date_posted_filter.set_value(date_posted)
 
     def wait_for_results_to_load(self):
-        self.driver.wait_for_page_load()
-        return self._search_results.is_visible(timeout=20)
+        return self.wait_for_elements(self.parser.SELECTOR, visible_only=True, timeout=20) > 0
 
     def has_more_results(self) -> bool:
         self.scroll_to_bottom()
-        return self._see_more_jobs_button.is_visible(timeout=10)
+        return self.wait_for_elements(self.SEE_MORE_JOBS_SELECTOR,
+                                      visible_only=True,
+                                      timeout=10,
+                                      quiet=self.SCROLL_QUIET_SECONDS) > 0
 
     def load_more_results(self):
         initial_results_count = self.visible_jobs_count
-
-        def more_results_loaded():
-            return initial_results_count < self.visible_jobs_count
-
         self._see_more_jobs_button.click()
-        self.driver.wait_for_page_load()
-
-        poll_for_result(more_results_loaded, timeout_seconds=10, poll_frequency=1)
+        self.wait_for_elements(self.parser.SELECTOR,
+                               min_count=initial_results_count,
+                               timeout=10,
+                               quiet=self.SCROLL_QUIET_SECONDS)
 
     def scroll_to_bottom(self):
         _log.debug("scrolling last result into view...")
@@ -84,6 +121,8 @@ class LinkedinPage(Page):
 class DatePostedFilter:
 
     def __init__(self):
+        from hed_utils.selenium import FindBy, SharedDriver
+
         self._driver = SharedDriver()
         self._open_filter_button = FindBy.XPATH("//div[@id='TIME_POSTED-dropdown']/../button")
         self._filter_body = FindBy.CSS_SELECTOR("div#TIME_POSTED-dropdown")
@@ -0,0 +1,145 @@
+"""Prometheus metrics of the runs, written for the node exporter's textfile collector (see 'metrics_dir' option).
+
+After each run the metrics of the site are written (atomically, as the collector expects) to
+'<metrics_dir>/scrape_jobs_<site>.prom'. The gauges describe the last run (see 'run_report'), while the '_total'
+counters are carried over from the previous file, so they keep counting across separate (e.g. cron) runs.
+"""
+
+import logging
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from scrape_jobs.program import Program
+from scrape_jobs.run_report import RunReport
+
+__all__ = [
+    "format_metrics",
+    "get_textfile_path",
+    "read_totals",
+    "write_textfile"
+]
+
+_log = logging.getLogger(__name__)
+_log.addHandler(logging.NullHandler())
+
+PREFIX = "scrape_jobs"
+
+# 'prepare' covers everything before the program execution (config, driver, collector, processor and storage)
+FAILURE_STAGES = ("prepare",) + Program.STAGES
+
+JOB_COUNTS = ("collected", "new", "stored")
+
+STORAGE_PHASES = {
+    "read": "program.known_urls",
+    "write": "program.store"
+}
+
+TOTAL_PATTERN = re.compile(r"^(" + PREFIX + r"_\w+_total)(\{.*\})?\s+(\S+)$")
+
+Sample = Tuple[Dict[str, str], float]
+
+
+def get_textfile_path(metrics_dir: str, site: str) -> Path:
+    return Path(metrics_dir).joinpath(f"{PREFIX}_{site.replace('.', '_')}.prom")
+
+
+def format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+               for value in labels.values())
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + "}"
+
+
+def format_value(value: float) -> str:
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(round(float(value), 6))
+
+
+def format_metric(name: str, metric_type: str, description: str, samples: Iterable[Sample]) -> List[str]:
+    lines = [f"# HELP {PREFIX}_{name} {description}", f"# TYPE {PREFIX}_{name} {metric_type}"]
+    lines.extend(f"{PREFIX}_{name}{format_labels(labels)} {format_value(value)}" for labels, value in samples)
+    return lines
+
+
+def read_totals(path: Path) -> Dict[str, float]:
+    """Read the counters ('name{labels}' -> value) from the previous textfile, if any"""
+
+    try:
+        text = path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return {}
+
+    totals = {}
+    for line in text.splitlines():
+        match = TOTAL_PATTERN.match(line)
+        if match:
+            name, labels, value = match.groups()
+            try:
+                totals[name + (labels or "")] = float(value)
+            except ValueError:
+                _log.debug("skipping malformed sample: %s", line)
+    return totals
+
+
+def format_metrics(report: RunReport, totals: Dict[str, float] = None) -> str:
+    """Format the metrics of the run, adding it to the given counters (from the previous textfile)"""
+
+    totals = totals or {}
+    site = {"site": report.site}
+    data = report.to_dict()
+    phases = data["phases"]
+    counts = data["counts"]
+
+    def total(name: str, labels: Dict[str, str], increment: float) -> Sample:
+        previous = totals.get(f"{PREFIX}_{name}{format_labels(labels)}", 0)
+        return labels, previous + increment
+
+    lines = []
+    lines += format_metric("last_run_timestamp_seconds", "gauge", "Start time of the last run.",
+                           [(site, report.started)])
+    lines += format_metric("last_run_duration_seconds", "gauge", "Duration of the last run.",
+                           [(site, report.seconds)])
+    lines += format_metric("last_run_success", "gauge", "Whether the last run succeeded (1) or failed (0).",
+                           [(site, bool(report.succeeded))])
+    lines += format_metric("last_run_failed", "gauge", "Whether the last run failed at the stage.",
+                           [(dict(site, stage=stage), report.failed_stage == stage) for stage in FAILURE_STAGES])
+    lines += format_metric("phase_duration_seconds", "gauge", "Time spent in the phase during the last run.",
+                           [(dict(site, phase=name), phase["seconds"]) for name, phase in phases.items()])
+    lines += format_metric("phase_calls", "gauge", "Times the phase was entered during the last run.",
+                           [(dict(site, phase=name), phase["calls"]) for name, phase in phases.items()])
+    lines += format_metric("storage_latency_seconds", "gauge", "Time spent reading from / writing to the storage "
+                                                               "during the last run.",
+                           [(dict(site, operation=operation), phases.get(phase, {}).get("seconds", 0))
+                            for operation, phase in STORAGE_PHASES.items()])
+    lines += format_metric("pages_loaded", "gauge", "Results pages loaded during the last run.",
+                           [(site, counts.get("pages", 0))])
+    lines += format_metric("cards_parsed", "gauge", "Result cards parsed during the last run.",
+                           [(site, counts.get("cards", 0))])
+    lines += format_metric("jobs", "gauge", "Jobs collected (recent results), new (not stored before) and stored "
+                                            "during the last run.",
+                           [(dict(site, kind=kind), counts.get(kind, 0)) for kind in JOB_COUNTS])
+    lines += format_metric("runs_total", "counter", "Runs completed (successfully or not).",
+                           [total("runs_total", site, 1)])
+    lines += format_metric("failures_total", "counter", "Failed runs by stage.",
+                           [total("failures_total", dict(site, stage=stage), int(report.failed_stage == stage))
+                            for stage in FAILURE_STAGES])
+    lines += format_metric("jobs_stored_total", "counter", "Jobs stored.",
+                           [total("jobs_stored_total", site, counts.get("stored", 0))])
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(report: RunReport, metrics_dir: str) -> str:
+    """Write the metrics of the (finished) run to the site's textfile in the given dir and return its path"""
+
+    path = get_textfile_path(metrics_dir, report.site)
+    text = format_metrics(report, read_totals(path))
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    tmp_path.replace(path)
+    _log.info("saved metrics at: %s", str(path.absolute()))
+    return str(path.absolute())
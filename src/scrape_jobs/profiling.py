@@ -0,0 +1,224 @@
+"""Profiling of whole runs (see the '--profile' option of 'scrape-jobs').
+
+Two profilers are available:
+
+    - 'cprofile' - deterministic (cProfile) profile of the main thread, saved as pstats ('.prof', for snakeviz,
+      pstats etc.), the collapsed stacks are approximated from its call graph
+
+    - 'sampling' - the stacks of all threads are sampled every few milliseconds, with low overhead, so the waits
+      for the browser / network are seen as they are - saved as collapsed stacks only
+
+The collapsed stacks ('.collapsed', one 'frame;frame;... count' line per stack) are the input of flamegraph.pl,
+speedscope and similar tools.
+"""
+
+import cProfile
+import logging
+import pstats
+import sys
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter
+from types import FrameType
+from typing import List, Optional, Tuple
+
+from tabulate import tabulate
+
+__all__ = [
+    "PROFILERS",
+    "CProfileProfiler",
+    "SamplingProfiler",
+    "create_profiler",
+    "profiled"
+]
+
+_log = logging.getLogger(__name__)
+_log.addHandler(logging.NullHandler())
+
+PROFILERS = ("cprofile", "sampling")
+
+FunctionKey = Tuple[str, int, str]  # (filename, line, name) as in pstats
+
+
+def format_function(key: FunctionKey) -> str:
+    filename, line, name = key
+    if filename == "~":  # built-in
+        return name
+    return f"{name} ({Path(filename).name}:{line})"
+
+
+class CProfileProfiler:
+    # the call paths taking less than this share of the run are not expanded
+    MIN_STACK_SHARE = 0.001
+    MAX_STACK_DEPTH = 200
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.seconds = 0.0
+        self._start_time = 0.0
+
+    def start(self):
+        self._start_time = perf_counter()
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+        self.seconds = perf_counter() - self._start_time
+
+    def get_stats(self) -> pstats.Stats:
+        return pstats.Stats(self.profile)
+
+    def iter_collapsed(self):
+        """Yield (stack, seconds) of the self time along each call path, spreading the time of each function over
+        its callers in proportion to their share of its cumulative time (recursive calls are not expanded)"""
+
+        stats = self.get_stats().stats
+        min_seconds = self.seconds * self.MIN_STACK_SHARE
+        callees = defaultdict(dict)  # caller -> callee -> (callee tt, callee ct) of the calls from the caller
+        for func, (_, _, _, _, callers) in stats.items():
+            for caller, (_, _, caller_tt, caller_ct) in callers.items():
+                callees[caller][func] = (caller_tt, caller_ct)
+
+        def walk(func: FunctionKey, path: List[str], self_seconds: float, total_seconds: float):
+            path = path + [format_function(func)]
+            if self_seconds >= min_seconds:
+                yield ";".join(path), self_seconds
+
+            func_total = stats[func][3]
+            if (func_total <= 0) or (len(path) >= self.MAX_STACK_DEPTH):
+                return
+            share = min(1.0, total_seconds / func_total)
+            for callee, (callee_tt, callee_ct) in callees[func].items():
+                if (format_function(callee) in path) or (callee_ct * share < min_seconds):
+                    continue
+                yield from walk(callee, path, callee_tt * share, callee_ct * share)
+
+        for func, (_, _, tt, ct, callers) in stats.items():
+            if not callers:
+                yield from walk(func, [], tt, ct)
+
+    def save(self, base_filepath: str) -> List[str]:
+        prof_filepath = str(Path(base_filepath).with_suffix(".prof"))
+        self.profile.dump_stats(prof_filepath)
+
+        collapsed_filepath = str(Path(base_filepath).with_suffix(".collapsed"))
+        with open(collapsed_filepath, mode="w", encoding="utf-8") as fp:
+            for stack, seconds in self.iter_collapsed():
+                # the flame graph tools expect integer counts, so the time is written in microseconds
+                fp.write(f"{stack} {int(seconds * 1_000_000)}\n")
+
+        return [prof_filepath, collapsed_filepath]
+
+    def format_hot_spots(self, limit: int = 15) -> str:
+        stats = self.get_stats().stats
+        top = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:limit]
+        rows = [[format_function(func), calls, f"{tt:.3f}", f"{ct:.3f}", f"{100 * tt / (self.seconds or 1):.1f}"]
+                for func, (_, calls, tt, ct, _) in top]
+        return tabulate(rows, headers=["FUNCTION", "CALLS", "SELF (s)", "TOTAL (s)", "SELF %"])
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples = Counter()  # stack -> samples count
+        self.seconds = 0.0
+        self._start_time = 0.0
+        self._stop_event = threading.Event()
+        self._thread = None  # type: Optional[threading.Thread]
+
+    @staticmethod
+    def get_stack(frame: FrameType) -> Tuple[str, ...]:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(format_function((code.co_filename, code.co_firstlineno, code.co_name)))
+            frame = frame.f_back
+        return tuple(reversed(stack))
+
+    def sample(self):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        own_ident = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident != own_ident:
+                self.samples[(names.get(ident, str(ident)),) + self.get_stack(frame)] += 1
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        self._start_time = perf_counter()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._thread.join()
+        self.seconds = perf_counter() - self._start_time
+        _log.debug("took %s samples in %.1f s.", sum(self.samples.values()), self.seconds)
+
+    def save(self, base_filepath: str) -> List[str]:
+        collapsed_filepath = str(Path(base_filepath).with_suffix(".collapsed"))
+        with open(collapsed_filepath, mode="w", encoding="utf-8") as fp:
+            for stack, count in sorted(self.samples.items()):
+                fp.write(f"{';'.join(stack)} {count}\n")
+        return [collapsed_filepath]
+
+    def format_hot_spots(self, limit: int = 15) -> str:
+        """Format the functions the main thread (running the program) was seen in most"""
+
+        main_name = threading.main_thread().name
+        self_counts = Counter()
+        total_counts = Counter()
+        main_samples = 0
+        for stack, count in self.samples.items():
+            if stack[0] != main_name or len(stack) < 2:
+                continue
+            main_samples += count
+            self_counts[stack[-1]] += count
+            for function in set(stack[1:]):
+                total_counts[function] += count
+
+        rows = [[function,
+                 count,
+                 f"{100 * count / main_samples:.1f}",
+                 f"{100 * total_counts[function] / main_samples:.1f}"]
+                for function, count in self_counts.most_common(limit)]
+        return tabulate(rows, headers=["FUNCTION", "SAMPLES", "SELF %", "TOTAL %"])
+
+
+def create_profiler(kind: str):
+    if kind == "cprofile":
+        return CProfileProfiler()
+    if kind == "sampling":
+        return SamplingProfiler()
+    raise ValueError(f"Unknown profiler: '{kind}'! (available: {', '.join(PROFILERS)})")
+
+
+@contextmanager
+def profiled(kind: Optional[str], base_filepath: str, limit: int = 15):
+    """Profile the block with the given kind of profiler (if any), then save the profile next to 'base_filepath'
+    (with its own extensions) and print the top hot spots"""
+
+    if not kind:
+        yield None
+        return
+
+    profiler = create_profiler(kind)
+    _log.info("profiling with: %s", type(profiler).__name__)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        try:
+            for filepath in profiler.save(base_filepath):
+                _log.info("saved profile at: %s", filepath)
+        except Exception as err:
+            _log.warning("Could not save profile! (%s) %s", type(err).__name__, err)
+        print(f"Top {limit} hot spots of '{Path(base_filepath).stem}' ({kind}, {profiler.seconds:.1f} s.):\n\n"
+              f"{profiler.format_hot_spots(limit)}\n",
+              flush=True)
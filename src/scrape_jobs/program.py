@@ -1,5 +1,8 @@
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Set
 
+from scrape_jobs import run_report
 from scrape_jobs.base.data_collection import ACollector
 from scrape_jobs.base.data_processing import AProcessor
 from scrape_jobs.base.data_storage import AStorage
@@ -9,27 +12,60 @@ _log.addHandler(logging.NullHandler())
 
 
 class Program:
-    def __init__(self, collector: ACollector, processor: AProcessor, storage: AStorage):
+    """Collects, filters, processes and stores the jobs - the time of each stage goes to the current run report
+    ('program.<stage>' phases) and the stage that failed (if any) is kept in 'failed_stage'"""
+
+    STAGES = ("known_urls", "collect", "filter", "process", "store")
+
+    def __init__(self, collector: ACollector, processor: AProcessor, storage: AStorage, streaming=False):
         self.collector = collector
         self.processor = processor
         self.storage = storage
+        self.streaming = streaming
+        self.failed_stage = None  # name of the stage that failed (if any)
+
+    def get_known_jobs_urls(self) -> Set[str]:
+        """Get the urls of the already stored jobs and hand them to the collector"""
+
+        try:
+            _log.info("Getting known jobs urls...")
+            with run_report.get_report().span("program.known_urls"):
+                known_jobs_urls = self.storage.get_known_jobs_urls()
+            self.collector.set_known_jobs_urls(known_jobs_urls)
+            return known_jobs_urls
+        except BaseException as err:
+            _log.exception("Error while getting known jobs urls! (%s) %s", type(err).__name__, err)
+            self.failed_stage = "known_urls"
+            raise RuntimeError() from err
 
     def execute(self):
+        self.failed_stage = None
+        if self.streaming:
+            self.execute_streaming()
+            return
+
+        report = run_report.get_report()
+        known_jobs_urls = self.get_known_jobs_urls()
+
         try:
             _log.info("Collecting jobs...")
-            collected_jobs = self.collector.collect_jobs()
+            with report.span("program.collect"):
+                collected_jobs = self.collector.collect_jobs()
             _log.info("Done with jobs collection! (got %s jobs)", len(collected_jobs))
         except BaseException as err:
             _log.exception("Error while collecting data! (%s) %s", type(err).__name__, err)
+            self.failed_stage = "collect"
             raise RuntimeError() from err
 
         try:
             _log.info("Filtering known jobs to avoid extra processing...")
-            known_jobs_urls = self.storage.get_known_jobs_urls()
-            previously_unknown_jobs = [job for job in collected_jobs if job["url"] not in known_jobs_urls]
+            with report.span("program.filter"):
+                previously_unknown_jobs = [job for job in collected_jobs if job["url"] not in known_jobs_urls]
+            report.count("new", len(previously_unknown_jobs))
             _log.info("Got %s new out of %s collected jobs!", len(previously_unknown_jobs), len(collected_jobs))
         except BaseException as err:
             _log.exception("Error while filtering collected jobs! (%s) %s", type(err).__name__, err)
+            self.failed_stage = "filter"
             raise RuntimeError() from err
 
         if not previously_unknown_jobs:
@@ -38,16 +74,139 @@ class Program:
 
         try:
             _log.info("Processing new jobs...")
-            processed_jobs = self.processor.process_jobs(previously_unknown_jobs)
+            with report.span("program.process"):
+                processed_jobs = self.process_jobs(previously_unknown_jobs)
             _log.info("Done with jobs processing!")
         except BaseException as err:
             _log.exception("Error while processing collected jobs! (%s) %s", type(err).__name__, err)
+            self.failed_stage = "process"
             raise RuntimeError() from err
 
         try:
             _log.info("Saving processed jobs...")
-            self.storage.store_jobs(processed_jobs)
+            with report.span("program.store"):
+                self.storage.store_jobs(processed_jobs)
+                self.storage.flush()
+            report.count("stored", len(processed_jobs))
             _log.info("Saved %s jobs!", len(processed_jobs))
         except BaseException as err:
             _log.exception("Error while storing processed jobs! (%s) %s", type(err).__name__, err)
+            self.failed_stage = "store"
             raise RuntimeError() from err
+
+    def process_jobs(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Process the jobs, unless the storage keeps them with their raw (typed) values"""
+
+        if self.storage.STORES_RAW_JOBS:
+            _log.debug("%s stores raw jobs, skipping processing", type(self.storage).__name__)
+            return jobs
+        return self.processor.process_jobs(jobs)
+
+    def filter_known_jobs(self,
+                          jobs: List[Dict[str, Any]],
+                          known_jobs_urls: Set[str],
+                          seen_jobs_urls: Set[str]) -> List[Dict[str, Any]]:
+        """Drop the jobs with known (or already seen) urls and add the urls of the remaining ones to the seen"""
+
+        previously_unknown_jobs = []
+        for job in jobs:
+            url = job["url"]
+            if (url not in seen_jobs_urls) and (url not in known_jobs_urls):
+                seen_jobs_urls.add(url)
+                previously_unknown_jobs.append(job)
+        return previously_unknown_jobs
+
+    @staticmethod
+    def check_stored(pending: List[Future]) -> List[Future]:
+        """Re-raise the error of the first failed storage write and return the ones that are still pending"""
+
+        for future in pending:
+            if future.done():
+                future.result()
+        return [future for future in pending if not future.done()]
+
+    def store_batch(self, jobs: List[Dict[str, Any]]):
+        """Store the batch of processed jobs (in the storage worker thread)"""
+
+        report = run_report.get_report()
+        with report.span("program.store"):
+            self.storage.store_jobs(jobs)
+        report.count("stored", len(jobs))
+
+    def execute_streaming(self):
+        """Filter, process and store the jobs batch by batch, as they are being collected.
+
+        The storage writes are done (in order) by a single background worker, so the collection of the next batch
+        is not waiting for them.
+        """
+
+        report = run_report.get_report()
+        known_jobs_urls = self.get_known_jobs_urls()
+        seen_jobs_urls = set()  # type: Set[str]
+
+        collected_count = 0
+        stored_count = 0
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="storage") as executor:
+            pending = []  # type: List[Future]
+            batches = self.collector.iter_jobs()
+            while True:
+                try:
+                    _log.info("Collecting next batch of jobs...")
+                    with report.span("program.collect"):
+                        batch = next(batches, None)
+                except BaseException as err:
+                    _log.exception("Error while collecting data! (%s) %s", type(err).__name__, err)
+                    self.failed_stage = "collect"
+                    raise RuntimeError() from err
+
+                if batch is None:
+                    _log.info("Done with jobs collection! (got %s jobs)", collected_count)
+                    break
+
+                collected_count += len(batch)
+                try:
+                    with report.span("program.filter"):
+                        previously_unknown_jobs = self.filter_known_jobs(batch, known_jobs_urls, seen_jobs_urls)
+                    report.count("new", len(previously_unknown_jobs))
+                    _log.info("Got %s new out of %s collected jobs in batch!", len(previously_unknown_jobs), len(batch))
+                except BaseException as err:
+                    _log.exception("Error while filtering collected jobs! (%s) %s", type(err).__name__, err)
+                    self.failed_stage = "filter"
+                    raise RuntimeError() from err
+
+                if not previously_unknown_jobs:
+                    continue
+
+                try:
+                    with report.span("program.process"):
+                        processed_jobs = self.process_jobs(previously_unknown_jobs)
+                except BaseException as err:
+                    _log.exception("Error while processing collected jobs! (%s) %s", type(err).__name__, err)
+                    self.failed_stage = "process"
+                    raise RuntimeError() from err
+
+                try:
+                    pending = self.check_stored(pending)
+                    pending.append(executor.submit(self.store_batch, processed_jobs))
+                    stored_count += len(processed_jobs)
+                except BaseException as err:
+                    _log.exception("Error while storing processed jobs! (%s) %s", type(err).__name__, err)
+                    self.failed_stage = "store"
+                    raise RuntimeError() from err
+
+            try:
+                _log.info("Waiting for %s pending storage writes...", len(pending))
+                with report.span("program.store_wait"):
+                    for future in pending:
+                        future.result()
+                with report.span("program.store"):
+                    self.storage.flush()
+            except BaseException as err:
+                _log.exception("Error while storing processed jobs! (%s) %s", type(err).__name__, err)
+                self.failed_stage = "store"
+                raise RuntimeError() from err
+
+        if stored_count:
+            _log.info("Saved %s jobs!", stored_count)
+        else:
+            _log.warning("There were no previously unknown jobs - all done!")
@@ -0,0 +1,396 @@
+"""Offline stand-in for the Chrome driver, serving a recorded sequence of result pages from disk.
+
+Install it as the shared driver and any 'Page' subclass will run its whole 'collect_jobs' loop against it:
+
+    SharedDriver.set_instance(ReplayDriver.from_dir("/path/to/snapshots", latency=0.5))
+
+    - 'get(url)' serves the first snapshot (or the n-th one for url with 'page=n' query), clicking a 'next page' /
+      'see more' control serves the next one.
+    - Element lookups (css, xpath, id, name, tag, class) are resolved against the current snapshot.
+    - Search-form controls that are not part of the recorded result pages are served as virtual elements, clicking
+      the ones that submit the form reloads the current snapshot.
+    - 'latency' seconds are slept on each simulated page load.
+"""
+
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+from scrape_jobs.base.data_collection import (COUNT_ELEMENTS_SCRIPT, EXTRACT_NEW_RESULTS_SCRIPT,
+                                              WAIT_FOR_ELEMENTS_SCRIPT)
+
+__all__ = [
+    "ADVANCE_SELECTORS",
+    "SEARCH_FORM_ELEMENTS",
+    "SUBMIT_FORM_ELEMENTS",
+    "ReplayDriver",
+    "ReplayElement"
+]
+
+_log = logging.getLogger(__name__)
+_log.addHandler(logging.NullHandler())
+
+# clicking on elements matching these selectors loads the next snapshot
+ADVANCE_SELECTORS = (
+    "a[data-automation='page-next']",  # seek.com.au
+    "button.see-more-jobs"  # linkedin.com
+)
+
+# locator -> texts of the virtual elements served when the locator does not match anything in the snapshot
+SEARCH_FORM_ELEMENTS = {
+    # seek.com.au
+    (By.ID, "keywords-input"): [""],
+    (By.CSS_SELECTOR, "input#SearchBar__Where"): [""],
+    (By.XPATH, "//input[contains(@id,'SearchBar__Where')]/../..//ul//li[contains(@id,'react-autowhatever')]"): [""],
+    (By.CSS_SELECTOR, "button[data-automation='searchButton']"): [""],
+    (By.XPATH, "//label[contains(@id,'sortby-label')]"): ["Sort by"],
+    (By.XPATH, "//label[contains(@id,'sortby-label')]/../ul/li[contains(.,'Date')]"): ["Date"],
+    # linkedin.com
+    (By.NAME, "keywords"): [""],
+    (By.NAME, "location"): [""],
+    (By.XPATH, "//div[@id='TIME_POSTED-dropdown']/../button"): ["Date Posted"],
+    (By.XPATH, "//div[@id='TIME_POSTED-dropdown']//div[contains(@class, 'filter-list')]/ul/li/label"):
+        ["Past 24 hours", "Past Week", "Past Month", "Any Time"],
+    (By.XPATH, "//div[contains(@class, 'dropdown-actions')]/button[contains(@class,'apply')]"): ["Done"],
+}
+
+# locators of the virtual elements which (on the live site) cause page load when clicked
+SUBMIT_FORM_ELEMENTS = {
+    # seek.com.au
+    (By.CSS_SELECTOR, "button[data-automation='searchButton']"),
+    (By.XPATH, "//label[contains(@id,'sortby-label')]/../ul/li[contains(.,'Date')]"),
+    # linkedin.com
+    (By.XPATH, "//div[contains(@class, 'dropdown-actions')]/button[contains(@class,'apply')]"),
+}
+
+HIDDEN_STYLES = ("display:none", "visibility:hidden")
+
+
+class ReplayElement:
+    """Element of a replayed snapshot (or virtual one if 'node' is None)"""
+
+    def __init__(self,
+                 driver: "ReplayDriver",
+                 node: Any = None,
+                 element_id: str = None,
+                 text: str = "",
+                 locator: Tuple[str, str] = None):
+        self._driver = driver
+        self._node = node
+        self._id = element_id
+        self._text = text
+        self._locator = locator
+
+    def __repr__(self):
+        return f"{type(self).__name__}(id='{self._id}')"
+
+    @property
+    def id(self) -> str:
+        return self._id
+
+    @property
+    def parent(self) -> "ReplayDriver":
+        return self._driver
+
+    @property
+    def locator(self) -> Optional[Tuple[str, str]]:
+        return self._locator
+
+    @property
+    def is_virtual(self) -> bool:
+        return self._node is None
+
+    @property
+    def tag_name(self) -> str:
+        return "virtual" if self.is_virtual else self._node.tag
+
+    @property
+    def text(self) -> str:
+        return self._text if self.is_virtual else " ".join(self._node.text_content().split())
+
+    def get_attribute(self, name: str) -> Optional[str]:
+        if self.is_virtual:
+            return self._text if name in {"innerText", "textContent", "value"} else None
+        if name in {"innerText", "textContent"}:
+            return self._node.text_content()
+        if name == "outerHTML":
+            return self._driver.serialize(self._node)
+        return self._node.get(name, None)
+
+    def get_property(self, name: str) -> Optional[str]:
+        return self.get_attribute(name)
+
+    def is_displayed(self) -> bool:
+        if self.is_virtual:
+            return True
+
+        for node in [self._node, *self._node.iterancestors()]:
+            style = (node.get("style", None) or "").replace(" ", "").lower()
+            if (node.get("hidden", None) is not None) or any(hidden in style for hidden in HIDDEN_STYLES):
+                return False
+        return True
+
+    def is_enabled(self) -> bool:
+        return True
+
+    def is_selected(self) -> bool:
+        return False
+
+    def click(self):
+        self._driver.on_click(self)
+
+    def submit(self):
+        pass
+
+    def clear(self):
+        pass
+
+    def send_keys(self, *value):
+        pass
+
+    def find_elements(self, by=By.ID, value=None) -> List["ReplayElement"]:
+        if self.is_virtual:
+            return [ReplayElement(self._driver, element_id=f"{self._id}/{by}={value}")]
+        return self._driver.find_nodes(by, value, context=self._node)
+
+    def find_element(self, by=By.ID, value=None) -> "ReplayElement":
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"({by}, {value})")
+        return elements[0]
+
+    def find_element_by_xpath(self, xpath) -> "ReplayElement":
+        return self.find_element(By.XPATH, xpath)
+
+    def find_elements_by_xpath(self, xpath) -> List["ReplayElement"]:
+        return self.find_elements(By.XPATH, xpath)
+
+    def find_element_by_tag_name(self, name) -> "ReplayElement":
+        return self.find_element(By.TAG_NAME, name)
+
+    def find_elements_by_tag_name(self, name) -> List["ReplayElement"]:
+        return self.find_elements(By.TAG_NAME, name)
+
+    def find_element_by_css_selector(self, css_selector) -> "ReplayElement":
+        return self.find_element(By.CSS_SELECTOR, css_selector)
+
+    def find_elements_by_css_selector(self, css_selector) -> List["ReplayElement"]:
+        return self.find_elements(By.CSS_SELECTOR, css_selector)
+
+
+class ReplayDriver:
+    """Implements the subset of the WebDriver surface used by the pages (through SharedDriver and FindBy)"""
+
+    def __init__(self,
+                 snapshots: Sequence[str],
+                 latency: float = 0.0,
+                 advance_selectors: Sequence[str] = ADVANCE_SELECTORS,
+                 search_form_elements: Dict[Tuple[str, str], List[str]] = None,
+                 submit_form_elements: Set[Tuple[str, str]] = None):
+        if not snapshots:
+            raise ValueError("At least one snapshot is required!")
+
+        try:
+            import lxml.html
+            from cssselect import HTMLTranslator
+        except ImportError as err:
+            raise RuntimeError("The replay driver requires the 'cssselect' package!") from err
+
+        self._html = lxml.html
+        self._translator = HTMLTranslator()
+        self.snapshots = [str(snapshot) for snapshot in snapshots]
+        self.latency = latency
+        self.advance_selectors = list(advance_selectors)
+        self.search_form_elements = SEARCH_FORM_ELEMENTS if search_form_elements is None else search_form_elements
+        self.submit_form_elements = SUBMIT_FORM_ELEMENTS if submit_form_elements is None else submit_form_elements
+        self.page_loads = 0
+        self._url = "about:blank"
+        self._index = -1
+        self._source = ""
+        self._root = None
+        self._advance_nodes = set()
+        self._extracted_paths = set()
+        _log.info("initialized %s: snapshots=%s, latency=%s", type(self).__name__, len(self.snapshots), latency)
+
+    def __repr__(self):
+        return f"{type(self).__name__}(snapshots={len(self.snapshots)}, latency={self.latency})"
+
+    @classmethod
+    def from_dir(cls, snapshots_dir: str, latency: float = 0.0, **kwargs) -> "ReplayDriver":
+        """Replay the '*.html' files from the given folder, in the order of their names"""
+
+        snapshots = sorted(Path(snapshots_dir).glob("*.html"))
+        if not snapshots:
+            raise ValueError(f"No '*.html' snapshots found in: '{snapshots_dir}'")
+        return cls([str(path) for path in snapshots], latency=latency, **kwargs)
+
+    @property
+    def snapshot_index(self) -> int:
+        return self._index
+
+    @property
+    def has_next_snapshot(self) -> bool:
+        return (self._index + 1) < len(self.snapshots)
+
+    def load_snapshot(self, index: int):
+        _log.debug("loading snapshot #%s: '%s'", index, self.snapshots[index])
+        if self.latency:
+            time.sleep(self.latency)
+
+        self._source = Path(self.snapshots[index]).read_text(encoding="utf-8")
+        self._root = self._html.document_fromstring(self._source)
+        self._index = index
+        self._extracted_paths = set()
+        self._advance_nodes = {node
+                               for selector in self.advance_selectors
+                               for node in self._root.xpath(self._css_to_xpath(selector, "descendant-or-self::"))}
+        self.page_loads += 1
+
+    def load_blank(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+        self._source = "<html><head></head><body></body></html>"
+        self._root = self._html.document_fromstring(self._source)
+        self._index = len(self.snapshots)
+        self._extracted_paths = set()
+        self._advance_nodes = set()
+        self.page_loads += 1
+
+    def serialize(self, node: Any) -> str:
+        return self._html.tostring(node, encoding="unicode", with_tail=False)
+
+    def _css_to_xpath(self, selector: str, prefix: str) -> str:
+        return self._translator.css_to_xpath(selector, prefix=prefix)
+
+    def _to_xpath(self, by: str, value: str, relative: bool) -> Optional[str]:
+        prefix = "descendant::" if relative else "descendant-or-self::"
+        if by == By.XPATH:
+            return value
+        if by == By.CSS_SELECTOR:
+            return self._css_to_xpath(value, prefix)
+        if by == By.TAG_NAME:
+            return self._css_to_xpath(value, prefix)
+        if by == By.CLASS_NAME:
+            return self._css_to_xpath("." + value, prefix)
+        if by in {By.ID, By.NAME}:
+            attribute = "id" if by == By.ID else "name"
+            escaped = value.replace("\\", "\\\\").replace("'", "\\'")
+            return self._css_to_xpath(f"*[{attribute}='{escaped}']", prefix)
+        _log.warning("unsupported replay locator strategy: '%s'", by)
+        return None
+
+    def _wrap(self, node: Any) -> ReplayElement:
+        return ReplayElement(self, node, element_id=f"{self._index}:{node.getroottree().getpath(node)}")
+
+    def find_nodes(self, by: str, value: str, context: Any = None) -> List[ReplayElement]:
+        if self._root is None:
+            return []
+
+        xpath = self._to_xpath(by, value, relative=(context is not None))
+        if xpath is None:
+            return []
+
+        nodes = (self._root if context is None else context).xpath(xpath)
+        return [self._wrap(node) for node in nodes if isinstance(getattr(node, "tag", None), str)]
+
+    def find_elements(self, by=By.ID, value=None) -> List[ReplayElement]:
+        elements = self.find_nodes(by, value)
+        if elements:
+            return elements
+
+        texts = self.search_form_elements.get((by, value), None)
+        if texts is None:
+            return []
+        return [ReplayElement(self, element_id=f"virtual:{by}={value}[{i}]", text=text, locator=(by, value))
+                for i, text in enumerate(texts)]
+
+    def find_element(self, by=By.ID, value=None) -> ReplayElement:
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"({by}, {value})")
+        return elements[0]
+
+    def on_click(self, element: ReplayElement):
+        if element.is_virtual:
+            if (element.locator in self.submit_form_elements) and (self._index >= 0):
+                self.load_snapshot(self._index)
+            return
+
+        if element._node not in self._advance_nodes:
+            return
+
+        if self.has_next_snapshot:
+            self.load_snapshot(self._index + 1)
+        else:
+            _log.warning("no more snapshots to replay!")
+
+    def extract_new_results(self, selector: str) -> List[str]:
+        fresh = []
+        for node in self._root.xpath(self._css_to_xpath(selector, "descendant-or-self::")):
+            path = node.getroottree().getpath(node)
+            if path not in self._extracted_paths:
+                self._extracted_paths.add(path)
+                fresh.append(self.serialize(node))
+        return fresh
+
+    def count_elements(self, selector: str, visible_only: bool) -> int:
+        elements = self.find_nodes(By.CSS_SELECTOR, selector)
+        return len([element for element in elements if element.is_displayed()] if visible_only else elements)
+
+    def execute_script(self, script: str, *args):
+        if script == EXTRACT_NEW_RESULTS_SCRIPT:
+            return self.extract_new_results(args[0])
+        if script == COUNT_ELEMENTS_SCRIPT:
+            return self.count_elements(args[0], args[1])
+        if script == WAIT_FOR_ELEMENTS_SCRIPT:
+            # the snapshot is loaded at once, so the wait is over right away
+            count = self.count_elements(args[0], args[1])
+            return {"count": count, "reason": "condition" if count > args[2] else "settled", "waited": 0}
+        if script.strip().startswith("return"):
+            return True  # page-load conditions
+        return None
+
+    def execute_async_script(self, script: str, *args):
+        return self.execute_script(script, *args)
+
+    def get(self, url: str):
+        _log.debug("replay: get '%s'", url)
+        self._url = url
+        page = parse_qs(urlparse(url).query).get("page", ["1"])[0]
+        index = int(page) - 1 if page.isdigit() else 0
+        if index < len(self.snapshots):
+            self.load_snapshot(max(0, index))
+        else:
+            _log.warning("no snapshot for page #%s!", page)
+            self.load_blank()
+
+    @property
+    def current_url(self) -> str:
+        return self._url if self._index < 1 else f"{self._url}#snapshot-{self._index}"
+
+    @property
+    def page_source(self) -> str:
+        return self._source
+
+    @property
+    def title(self) -> str:
+        titles = self._root.xpath("//title") if self._root is not None else []
+        return titles[0].text_content() if titles else ""
+
+    def set_page_load_timeout(self, time_to_wait):
+        pass
+
+    def set_script_timeout(self, time_to_wait):
+        pass
+
+    def implicitly_wait(self, time_to_wait):
+        pass
+
+    def quit(self):
+        _log.debug("replay: quit (page loads: %s)", self.page_loads)
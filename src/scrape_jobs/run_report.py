@@ -0,0 +1,132 @@
+"""Timing spans and counts of the run phases, saved as machine-readable (JSON) run report.
+
+The report of the current run is process-global (like the shared driver), so the phases are timed where they happen:
+
+    - 'prepare.*' - creating the driver, the collector, the processor and the storage
+
+    - 'collect.*' - per results page: opening the search, waiting for the results, extracting the cards html,
+      building the soup, parsing the cards, dropping the known ones and paginating
+
+    - 'program.*' - the stages of 'Program.execute': getting the known urls, collecting, filtering, processing, storing
+
+The counts are: pages, cards (parsed), collected (recent results), new (previously unknown) and stored (jobs).
+"""
+
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict
+
+from tabulate import tabulate
+
+__all__ = [
+    "RunReport",
+    "get_report",
+    "new_report"
+]
+
+_log = logging.getLogger(__name__)
+_log.addHandler(logging.NullHandler())
+
+
+class RunReport:
+    def __init__(self, site: str = None):
+        self.site = site
+        self.started = time.time()
+        self.seconds = 0.0
+        self.succeeded = None
+        self.failed_stage = None
+        self.error = ""
+        self.phases = {}  # phase name -> seconds of each of its spans
+        self.counts = {}  # type: Dict[str, int]
+        self._start_time = perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str):
+        """Add the time spent in the block (even if it raised) to the phase with the given name"""
+
+        start_time = perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, perf_counter() - start_time)
+
+    def add_time(self, name: str, seconds: float, calls: int = 1):
+        with self._lock:
+            phase = self.phases.setdefault(name, [0.0, 0])
+            phase[0] += seconds
+            phase[1] += calls
+
+    def count(self, name: str, value: int = 1):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + value
+
+    def merge(self, data: Dict[str, Any]):
+        """Add the phases and the counts of another report (as dict, e.g. from a search worker process)"""
+
+        for name, phase in data.get("phases", {}).items():
+            self.add_time(name, phase["seconds"], phase["calls"])
+        for name, value in data.get("counts", {}).items():
+            self.count(name, value)
+
+    def finish(self, succeeded: bool, failed_stage: str = None, error: BaseException = None):
+        self.seconds = perf_counter() - self._start_time
+        self.succeeded = succeeded
+        self.failed_stage = failed_stage
+        if error is not None:
+            cause = error.__cause__ or error
+            self.error = f"{type(cause).__name__}: {cause}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"site": self.site,
+                    "started": self.started,
+                    "seconds": round(self.seconds, 3),
+                    "succeeded": self.succeeded,
+                    "failed_stage": self.failed_stage,
+                    "error": self.error,
+                    "phases": {name: {"seconds": round(seconds, 6), "calls": calls}
+                               for name, (seconds, calls) in sorted(self.phases.items())},
+                    "counts": dict(sorted(self.counts.items()))}
+
+    def save(self, filepath: str):
+        path = Path(filepath)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with tmp_path.open(mode="w", encoding="utf-8") as fp:
+            json.dump(self.to_dict(), fp, indent=2)
+        tmp_path.replace(path)
+        _log.info("saved run report at: %s", str(path.absolute()))
+
+    def format_table(self) -> str:
+        data = self.to_dict()
+        phases = tabulate([[name, phase["calls"], f"{phase['seconds']:.3f}"]
+                           for name, phase in data["phases"].items()],
+                          headers=["PHASE", "CALLS", "SECONDS"])
+        counts = tabulate(list(data["counts"].items()), headers=["COUNT", "VALUE"])
+        if self.succeeded is None:
+            status = "NOT FINISHED"
+        else:
+            status = "OK" if self.succeeded else f"FAILED at '{self.failed_stage}' ({self.error})"
+        return f"'{self.site}' {status} [took: {self.seconds:.1f} s.]\n\n{phases}\n\n{counts}"
+
+
+_current = RunReport()
+
+
+def get_report() -> RunReport:
+    """Get the report of the current run"""
+
+    return _current
+
+
+def new_report(site: str = None) -> RunReport:
+    """Start the report of a new run, it becomes the current one"""
+
+    global _current
+    _current = RunReport(site)
+    return _current
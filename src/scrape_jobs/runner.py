@@ -1,43 +1,78 @@
+import importlib
 import logging
+import multiprocessing
+import multiprocessing.pool
+import sys
+from collections import namedtuple
+from multiprocessing.connection import Connection
+from multiprocessing.util import Finalize
+from operator import itemgetter
 from pathlib import Path
-from tempfile import gettempdir
+from tempfile import TemporaryDirectory, gettempdir
 from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
 
-from hed_utils.selenium import SharedDriver, chrome_driver
+from tabulate import tabulate
 
-from scrape_jobs.base.data_collection import ACollector
+from scrape_jobs import run_report
+from scrape_jobs.base.data_collection import ACollector, Page, filter_unknown_jobs
 from scrape_jobs.base.data_processing import TimeProcessor, AProcessor
-from scrape_jobs.base.data_storage import AStorage, CsvJobsStorage, GoogleSheetsJobsStorage
-from scrape_jobs.config import Config, SearchConfig, TimeConfig, SheetsConfig
-from scrape_jobs.linkedin import LinkedinConfig, LinkedinJob, LinkedinPage
+from scrape_jobs.base.data_storage import AStorage
+from scrape_jobs.config import Config, SearchConfig, TimeConfig, SheetsConfig, StorageConfig
 from scrape_jobs.program import Program
-from scrape_jobs.seek import SeekConfig, SeekJob, SeekPage
+from scrape_jobs.run_report import RunReport
+
+# the site packages are imported only when the site is used (see 'get_site_class')
+SITE_PACKAGES = {
+    "linkedin.com": "scrape_jobs.linkedin",
+    "seek.com.au": "scrape_jobs.seek"
+}
 
 CONFIG_CLASSES = {
-    "linkedin.com": LinkedinConfig,
-    "seek.com.au": SeekConfig
+    "linkedin.com": "LinkedinConfig",
+    "seek.com.au": "SeekConfig"
 }
 
 PAGE_CLASSES = {
-    "linkedin.com": LinkedinPage,
-    "seek.com.au": SeekPage
+    "linkedin.com": "LinkedinPage",
+    "seek.com.au": "SeekPage"
 }
 
-COLUMN_NAMES = {
-    "linkedin.com": LinkedinJob.KEYS,
-    "seek.com.au": SeekJob.KEYS
+JOB_CLASSES = {
+    "linkedin.com": "LinkedinJob",
+    "seek.com.au": "SeekJob"
 }
 
+SITES = tuple(SITE_PACKAGES)
+
+# The modules of the selenium driver (hed_utils.selenium), the storage backends, the metrics and the profiling are
+# imported by the functions using them, so e.g. a run with the http collector does not load selenium at all.
+
+SiteResult = namedtuple("SiteResult", "site succeeded seconds error")
+
 _log = logging.getLogger(__name__)
 _log.addHandler(logging.NullHandler())
 
 
+def get_site_class(site: str, class_names: Dict[str, str]) -> type:
+    """Get the site's class (from one of the *_CLASSES), importing the site's package on first use"""
+
+    return getattr(importlib.import_module(SITE_PACKAGES[site]), class_names[site])
+
+
+def get_column_names(site: str) -> List[str]:
+    try:
+        return get_site_class(site, JOB_CLASSES).KEYS
+    except KeyError as kerr:
+        raise RuntimeError(f"Storage column names not defined for site: '{site}'!") from kerr
+
+
 def read_config(site: str, configfile: str) -> Config:
     configfile = str(Path(configfile).absolute())
     _log.info("Reading '%s' config from file: '%s'", site, configfile)
 
     try:
-        clz = CONFIG_CLASSES[site]
+        clz = get_site_class(site, CONFIG_CLASSES)
     except KeyError as kerr:
         raise RuntimeError(f"Config not implemented for site: '{site}'!") from kerr
 
@@ -47,10 +82,21 @@ def read_config(site: str, configfile: str) -> Config:
         raise RuntimeError(f"Error while reading config file!") from err
 
 
-def init_driver(headless: bool):
+def init_driver(headless: bool,
+                block_resources: Sequence[str] = (),
+                block_domains: Sequence[str] = (),
+                allow_domains: Sequence[str] = ()):
+    from hed_utils.selenium import SharedDriver
+
+    from scrape_jobs import chrome
+
     try:
-        _log.info("Initializing driver... (headless: %s)", headless)
-        driver = chrome_driver.create_instance(headless=headless)
+        _log.info("Initializing driver... (headless: %s, block_resources: %s, block_domains: %s, allow_domains: %s)",
+                  headless, list(block_resources), list(block_domains), list(allow_domains))
+        driver = chrome.create_driver(headless,
+                                      block_resources=block_resources,
+                                      block_domains=block_domains,
+                                      allow_domains=allow_domains)
     except Exception as err:
         raise RuntimeError("Could not create driver instance!") from err
 
@@ -58,22 +104,236 @@ def init_driver(headless: bool):
     SharedDriver.set_instance(driver)
 
 
-def prepare_collector(site: str, search_cfg: SearchConfig) -> ACollector:
-    _log.info("Preparing jobs collector with config: %s", search_cfg)
+def init_replay_driver(replay_dir: str, latency: float):
+    from hed_utils.selenium import SharedDriver
 
-    init_driver(search_cfg.driver_headless)
+    from scrape_jobs.replay import ReplayDriver
 
     try:
-        clz = PAGE_CLASSES[site]
+        _log.info("Initializing replay driver... (replay_dir: '%s', latency: %s)", replay_dir, latency)
+        driver = ReplayDriver.from_dir(replay_dir, latency=latency)
+    except Exception as err:
+        raise RuntimeError("Could not create replay driver instance!") from err
+
+    SharedDriver.set_instance(driver)
+
+
+def init_search_driver(search_cfg: SearchConfig):
+    with run_report.get_report().span("prepare.driver"):
+        if search_cfg.replay_dir:
+            init_replay_driver(search_cfg.replay_dir, search_cfg.replay_latency)
+        else:
+            init_driver(search_cfg.driver_headless,
+                        block_resources=search_cfg.block_resources,
+                        block_domains=search_cfg.block_domains,
+                        allow_domains=search_cfg.allow_domains)
+
+
+def create_page(site: str, search_cfg: SearchConfig, search_params: Dict[str, Any]) -> Page:
+    try:
+        clz = get_site_class(site, PAGE_CLASSES)
     except KeyError as kerr:
         raise RuntimeError(f"Page not implemented for site: '{site}'!") from kerr
 
     try:
-        return clz(search_cfg.search_params, search_cfg.max_post_age_days, search_cfg.max_attempts)
+        return clz(dict(search_params),
+                   search_cfg.max_post_age_days,
+                   search_cfg.max_attempts,
+                   incremental=search_cfg.incremental_extraction,
+                   backend=search_cfg.html_backend,
+                   stop_after_known_pages=search_cfg.stop_after_known_pages,
+                   url_search=search_cfg.url_search)
     except Exception as err:
         raise RuntimeError(f"Error during {clz.__name__} initialization!") from err
 
 
+_search_worker = {}  # type: Dict[str, Any]
+
+
+def init_search_worker(site: str, search_cfg: SearchConfig):
+    """Create the (reusable) driver of the search worker process, it is quit when the worker exits"""
+
+    from hed_utils.selenium import SharedDriver
+
+    _search_worker.update(site=site, search_cfg=search_cfg)
+    run_report.new_report()  # not the one inherited from the parent process
+    init_search_driver(search_cfg)
+    Finalize(None, SharedDriver().quit, exitpriority=10)
+
+
+def collect_search(task: Tuple[Dict[str, Any], Set[str]]) -> Tuple[Dict[str, Any], List[Dict[str, Any]], Dict]:
+    """Collect the jobs of single search, in the search worker process, along with the report of what was done in
+    the worker since its previous search (including the driver creation, for the first one)"""
+
+    search_params, known_jobs_urls = task
+    page = create_page(_search_worker["site"], _search_worker["search_cfg"], search_params)
+    page.set_known_jobs_urls(known_jobs_urls)
+    try:
+        jobs = page.collect_jobs()
+        return search_params, jobs, run_report.get_report().to_dict()
+    finally:
+        run_report.new_report()
+
+
+class MultiSearchCollector(ACollector):
+    """Runs the searches of a site in a bounded pool of worker processes, each reusing its own driver.
+
+    The results of each search are yielded as soon as it completes, without the jobs found by the previous searches.
+    When 'keep_workers' is set, the pool (and the drivers) is kept between the 'iter_jobs' calls until 'close'.
+
+    Daemonic processes (e.g. 'multiprocessing.Pool' workers) can not have children, so in such the searches are run
+    one after another, with the shared driver of the process.
+    """
+
+    def __init__(self, site: str, search_cfg: SearchConfig, keep_workers=False):
+        self.site = site
+        self.search_cfg = search_cfg
+        self.keep_workers = keep_workers
+        self.known_jobs_urls = set()  # type: Set[str]
+        self.known_identities = set()  # type: Set[str]
+        self._pool = None  # type: Optional[multiprocessing.pool.Pool]
+        self._inline_driver = False
+        self._known_urls_dir = None  # type: Optional[TemporaryDirectory]
+        self._known_urls_copy = None  # UrlIndex copy of in-memory known urls (see 'get_workers_known_urls')
+        _log.info("initialized %s: site='%s', searches=%s, search_workers=%s, keep_workers=%s",
+                  type(self).__name__, site, len(search_cfg.searches), search_cfg.search_workers, keep_workers)
+
+    def set_known_jobs_urls(self, known_jobs_urls: Set[str]):
+        self.known_jobs_urls = known_jobs_urls
+
+    def get_pool(self) -> multiprocessing.pool.Pool:
+        if self._pool is None:
+            workers = max(1, min(self.search_cfg.search_workers, len(self.search_cfg.searches)))
+            _log.info("starting %s search worker(s)...", workers)
+            self._pool = multiprocessing.Pool(processes=workers,
+                                              initializer=init_search_worker,
+                                              initargs=(self.site, self.search_cfg))
+        return self._pool
+
+    def get_workers_known_urls(self) -> Set[str]:
+        """The known urls to send with each search task (the workers need them only for 'stop_after_known_pages').
+
+        The SQLite-backed sets are pickled as their database path, the in-memory ones are copied once per run to
+        temporary UrlIndex - so the tasks carry a path instead of the urls, and each worker reads them by itself.
+        """
+
+        from scrape_jobs.base.data_storage import SqliteUrlSet, UrlIndex
+
+        if not self.search_cfg.stop_after_known_pages:
+            return set()
+        if isinstance(self.known_jobs_urls, SqliteUrlSet):
+            return self.known_jobs_urls
+        if self._known_urls_copy is None:
+            self._known_urls_dir = TemporaryDirectory(prefix="scrape-jobs-")
+            self._known_urls_copy = UrlIndex(str(Path(self._known_urls_dir.name).joinpath("known_urls.sqlite")))
+        self._known_urls_copy.replace(self.known_jobs_urls, None)
+        return self._known_urls_copy
+
+    def iter_inline_searches(self, searches: List[Dict[str, Any]]):
+        """Run the searches one after another in the current process (same results as 'collect_search')"""
+
+        if not self._inline_driver:
+            init_search_driver(self.search_cfg)
+            self._inline_driver = True
+        for search_params in searches:
+            page = create_page(self.site, self.search_cfg, search_params)
+            page.set_known_jobs_urls(self.known_jobs_urls)
+            # the spans and counts go directly to the current report, so there is nothing to merge
+            yield search_params, page.collect_jobs(), {}
+
+    def iter_searches(self, searches: List[Dict[str, Any]]):
+        if multiprocessing.current_process().daemon:
+            _log.warning("running in daemonic process, so the searches are run one after another")
+            return self.iter_inline_searches(searches)
+        known_jobs_urls = self.get_workers_known_urls()
+        return self.get_pool().imap_unordered(collect_search,
+                                              [(search_params, known_jobs_urls) for search_params in searches])
+
+    def close(self, terminate=False):
+        """Stop the search workers (quitting their drivers)"""
+
+        if self._inline_driver:
+            self._inline_driver = False
+            quit_driver()
+
+        if self._known_urls_copy is not None:
+            self._known_urls_copy.close()
+            self._known_urls_dir.cleanup()
+            self._known_urls_copy = self._known_urls_dir = None
+
+        pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        if terminate:
+            pool.terminate()
+        else:
+            pool.close()
+        pool.join()
+
+    def iter_jobs(self) -> Iterator[List[Dict[str, Any]]]:
+        searches = self.search_cfg.searches
+        self.known_identities = set()
+
+        _log.info("running %s searches...", len(searches))
+        try:
+            for search_params, jobs, search_report in self.iter_searches(searches):
+                run_report.get_report().merge(search_report)
+                unknown_jobs = filter_unknown_jobs(jobs, self.known_identities)
+                _log.info("search %s got %s jobs (%s not found by the previous searches)",
+                          search_params, len(jobs), len(unknown_jobs))
+                if unknown_jobs:
+                    yield unknown_jobs
+        except BaseException:
+            self.close(terminate=True)
+            raise
+
+        if not self.keep_workers:
+            self.close()
+
+    def collect_jobs(self) -> List[Dict[str, Any]]:
+        collected_jobs = [job for batch in self.iter_jobs() for job in batch]
+        collected_jobs.sort(key=itemgetter("posted_time"))
+        return collected_jobs
+
+
+def create_http_collector(site: str, search_cfg: SearchConfig) -> ACollector:
+    from scrape_jobs.base.http_collection import HttpCollector
+
+    try:
+        build_url = get_site_class(site, PAGE_CLASSES).build_results_url
+        parser_cls = get_site_class(site, JOB_CLASSES)
+    except (KeyError, AttributeError) as err:
+        raise RuntimeError(f"HTTP collector not implemented for site: '{site}'!") from err
+
+    try:
+        return HttpCollector(search_cfg.searches or [search_cfg.search_params],
+                             build_url,
+                             parser_cls(backend=search_cfg.html_backend),
+                             search_cfg.max_post_age_days,
+                             search_cfg.max_attempts,
+                             concurrency=search_cfg.http_concurrency,
+                             max_pages=search_cfg.http_max_pages,
+                             stop_after_known_pages=search_cfg.stop_after_known_pages)
+    except Exception as err:
+        raise RuntimeError("Error during HttpCollector initialization!") from err
+
+
+def prepare_collector(site: str, search_cfg: SearchConfig) -> ACollector:
+    _log.info("Preparing jobs collector with config: %s", search_cfg)
+
+    if search_cfg.collector == "http":
+        return create_http_collector(site, search_cfg)
+
+    if search_cfg.collector != "browser":
+        raise RuntimeError(f"Unknown collector: '{search_cfg.collector}'! (available: browser, http)")
+
+    if len(search_cfg.searches) > 1:
+        return MultiSearchCollector(site, search_cfg)
+
+    init_search_driver(search_cfg)
+    return create_page(site, search_cfg, search_cfg.search_params)
+
+
 def prepare_processor(time_cfg: TimeConfig) -> AProcessor:
     _log.info("Preparing jobs processor with config: %s", time_cfg)
     try:
@@ -89,58 +349,294 @@ def get_csv_filepath(site: str) -> str:
     return str(Path(gettempdir()).joinpath(filename).absolute())
 
 
-def prepare_storage(site: str, sheets_cfg: SheetsConfig) -> AStorage:
-    _log.info("Preparing jobs storage with config: %s", sheets_cfg)
-    try:
-        columns = COLUMN_NAMES[site]
-    except KeyError as kerr:
-        raise RuntimeError(f"Storage column names not defined for site: '{site}'!") from kerr
+def get_urls_cache_filepath(site: str) -> str:
+    filename = site.replace(".", "_")
+    filename += "_sheet_urls"
+    filename += ".json"
+    return str(Path(gettempdir()).joinpath(filename).absolute())
+
+
+def get_sqlite_filepath() -> str:
+    return str(Path.home().joinpath("scrape_jobs.sqlite").absolute())
+
+
+def get_parquet_dir() -> str:
+    return str(Path.home().joinpath("scrape_jobs_parquet").absolute())
+
+
+def get_table_name(site: str) -> str:
+    return site.replace(".", "_")
+
+
+def get_index_filepath(site: str) -> str:
+    filename = site.replace(".", "_")
+    filename += "_urls"
+    filename += ".sqlite"
+    return str(Path(gettempdir()).joinpath(filename).absolute())
+
+
+def get_daemon_state_filepath(site: str) -> str:
+    filename = site.replace(".", "_")
+    filename += "_daemon"
+    filename += ".json"
+    return str(Path(gettempdir()).joinpath(filename).absolute())
+
+
+def get_daemon_report_filepath(site: str) -> str:
+    filename = site.replace(".", "_")
+    filename += "_daemon_report"
+    filename += ".json"
+    return str(Path(gettempdir()).joinpath(filename).absolute())
+
+
+def prepare_storage(site: str, storage_cfg: StorageConfig, sheets_cfg: SheetsConfig) -> AStorage:
+    _log.info("Preparing jobs storage with config: %s", storage_cfg)
+    storage = create_storage(site, storage_cfg, sheets_cfg)
+
+    if storage_cfg.url_index:
+        from scrape_jobs.base.data_storage import IndexedStorage, UrlIndex
+
+        try:
+            storage = IndexedStorage(storage, UrlIndex(get_index_filepath(site)))
+        except Exception as err:
+            raise RuntimeError("Error while initializing jobs urls index!") from err
+
+    return storage
+
+
+def create_storage(site: str, storage_cfg: StorageConfig, sheets_cfg: SheetsConfig) -> AStorage:
+    columns = get_column_names(site)
+
+    if storage_cfg.storage == "sqlite":
+        from scrape_jobs.base.data_storage import SqliteJobsStorage
+
+        try:
+            filepath = storage_cfg.sqlite_filepath or get_sqlite_filepath()
+            storage = SqliteJobsStorage(columns, filepath, get_table_name(site))
+            storage.init_table()
+            return storage
+        except Exception as err:
+            raise RuntimeError("Error while initializing SQLite storage!") from err
+
+    if storage_cfg.storage == "parquet":
+        from scrape_jobs.base.data_storage import ParquetJobsStorage
+
+        try:
+            return ParquetJobsStorage(columns, storage_cfg.parquet_dir or get_parquet_dir(), site)
+        except Exception as err:
+            raise RuntimeError("Error while initializing Parquet storage!") from err
+
+    if storage_cfg.storage != "sheets":
+        raise RuntimeError(f"Unknown storage: '{storage_cfg.storage}'! (available: sheets, sqlite, parquet)")
+
+    _log.info("Preparing Google-Sheets storage with config: %s", sheets_cfg)
+
+    from scrape_jobs.base.data_storage import CsvJobsStorage, GoogleSheetsJobsStorage, IndexedCsvJobsStorage
 
     try:
-        storage = GoogleSheetsJobsStorage(columns,
-                                          sheets_cfg.spreadsheet_title,
-                                          sheets_cfg.worksheet_title,
-                                          sheets_cfg.json_filepath)
+        return GoogleSheetsJobsStorage(columns,
+                                       sheets_cfg.spreadsheet_title,
+                                       sheets_cfg.worksheet_title,
+                                       sheets_cfg.json_filepath,
+                                       chunk_size=sheets_cfg.sheets_chunk_size,
+                                       max_retries=sheets_cfg.sheets_max_retries,
+                                       write_behind=sheets_cfg.sheets_write_behind,
+                                       urls_cache_filepath=(get_urls_cache_filepath(site)
+                                                            if sheets_cfg.sheets_urls_cache else None))
     except Exception as sheets_err:
         _log.warning("Error while initializing Google-Sheets storage! (%s) %s", type(sheets_err).__name__, sheets_err)
 
-        try:
-            filepath = get_csv_filepath(site)
-            _log.warning("Using fallback storage CSV file: %s", filepath)
-            storage = CsvJobsStorage(columns, filepath)
-            if not storage.filepath.exists():
-                storage.init_file()
-        except Exception as csv_err:
-            raise RuntimeError("Error while initializing CSV storage!") from csv_err
+    try:
+        filepath = get_csv_filepath(site)
+        _log.warning("Using fallback storage CSV file: %s", filepath)
+        storage = (IndexedCsvJobsStorage if storage_cfg.csv_index else CsvJobsStorage)(columns, filepath)
+        if not storage.filepath.exists():
+            storage.init_file()
+        return storage
+    except Exception as csv_err:
+        raise RuntimeError("Error while initializing CSV storage!") from csv_err
 
-    return storage
+
+def get_report_filepath(log_filepath: str) -> str:
+    """Get the path of the run report, next to the log file"""
+
+    return str(Path(log_filepath).with_suffix(".json").absolute())
 
 
 def prepare_program(site: str, config: Config) -> Program:
     _log.info("Preparing program for execution...")
+    report = run_report.get_report()
     try:
-        collector = prepare_collector(site, config.search_config)
-        processor = prepare_processor(config.time_config)
-        storage = prepare_storage(site, config.sheets_config)
-        return Program(collector, processor, storage)
+        with report.span("prepare.collector"):
+            collector = prepare_collector(site, config.search_config)
+        with report.span("prepare.processor"):
+            processor = prepare_processor(config.time_config)
+        with report.span("prepare.storage"):
+            storage = prepare_storage(site, config.storage_config, config.sheets_config)
+        return Program(collector, processor, storage, streaming=config.run_config.streaming)
     except Exception as err:
         raise RuntimeError("Error while creating program instance!") from err
 
 
-def run_with_config(site: str, config: Config):
-    program = prepare_program(site, config)
+def run_with_config(site: str, config: Config, report_filepath: str = None) -> RunReport:
+    """Run the site's program and return its report, which is also saved to 'report_filepath' (if given)"""
+
+    report = run_report.new_report(site)
+    program = None
     try:
+        program = prepare_program(site, config)
         _log.info("Starting program execution...")
         start_time = perf_counter()
         program.execute()
         end_time = perf_counter()
         took = end_time - start_time
         _log.info("Program execution completed! [took: %d min. %d s.]", took // 60, took % 60)
+        report.finish(True)
+        return report
     except Exception as err:
-        _log.exception("Error during program execution! ( %s ) %s", type(err).__name__, err)
+        report.finish(False, program.failed_stage if program else "prepare", err)
+        if program:
+            _log.exception("Error during program execution! ( %s ) %s", type(err).__name__, err)
         raise
+    finally:
+        publish_report(report, report_filepath, config.run_config.metrics_dir)
+
+
+def publish_report(report: RunReport, report_filepath: str = None, metrics_dir: str = None):
+    """Save the (finished) run report as JSON and write its Prometheus metrics, each only if its path is given"""
+
+    if report_filepath:
+        try:
+            report.save(report_filepath)
+        except Exception as err:
+            _log.warning("Could not save run report! (%s) %s", type(err).__name__, err)
+
+    if metrics_dir:
+        from scrape_jobs import metrics
+
+        try:
+            metrics.write_textfile(report, metrics_dir)
+        except Exception as err:
+            _log.warning("Could not write metrics! (%s) %s", type(err).__name__, err)
 
 
-def run_with_config_file(site: str, configfile: str):
+def run_with_config_file(site: str, configfile: str, report_filepath: str = None) -> RunReport:
     config = read_config(site, configfile)
-    run_with_config(site, config)
+    return run_with_config(site, config, report_filepath)
+
+
+def run_site(site: str,
+             configfile: str,
+             worker_init: Callable[[str], Optional[str]] = None,
+             print_report=False,
+             profile: str = None) -> SiteResult:
+    """Run the site's program (in a worker process) and report the outcome instead of raising, quitting the driver.
+
+    When 'worker_init' returns the path of the worker's log file, the run report (and the profile) is saved next to it.
+    """
+
+    from scrape_jobs import profiling
+
+    start_time = perf_counter()
+    try:
+        log_filepath = worker_init(site) if worker_init else None
+        report_filepath = get_report_filepath(log_filepath) if log_filepath else None
+        try:
+            with profiling.profiled(profile if log_filepath else None, log_filepath):
+                run_with_config_file(site, configfile, report_filepath)
+        finally:
+            if print_report:
+                print(run_report.get_report().format_table(), end="\n\n", flush=True)
+        return SiteResult(site, True, perf_counter() - start_time, "")
+    except BaseException as err:
+        _log.exception("Error while running '%s'! (%s) %s", site, type(err).__name__, err)
+        cause = err.__cause__ or err
+        return SiteResult(site, False, perf_counter() - start_time, f"{type(cause).__name__}: {cause}")
+    finally:
+        try:
+            quit_driver()
+        except Exception as err:
+            _log.debug("could not quit driver! (%s) %s", type(err).__name__, err)
+
+
+def quit_driver():
+    """Quit the shared driver, unless no driver was used (so selenium was never imported)"""
+
+    selenium = sys.modules.get("hed_utils.selenium", None)
+    if selenium is not None:
+        selenium.SharedDriver().quit()
+
+
+def _run_site_process(connection: Connection, target: Callable[..., SiteResult], site: str, args: tuple):
+    try:
+        connection.send(target(site, *args))
+    finally:
+        connection.close()
+
+
+def run_site_processes(target: Callable[..., SiteResult], sites: Sequence[str], args: tuple) -> List[SiteResult]:
+    """Call 'target(site, *args)' for each site in its own process, all of them at once, and collect their results.
+
+    The processes are not daemonic, so they can start worker processes of their own (e.g. for multiple searches).
+    A process dying without result (e.g. killed on OOM, or crashed) is reported as failed site with its exit code.
+    """
+
+    start_time = perf_counter()
+    processes = {}  # type: Dict[str, Tuple[multiprocessing.Process, Connection]]
+    try:
+        for site in sites:
+            reader, writer = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=_run_site_process,
+                                              args=(writer, target, site, args),
+                                              name=f"scrape-jobs-{site}")
+            process.start()
+            writer.close()  # so reading gets EOF once the process exits
+            processes[site] = (process, reader)
+
+        results = []
+        for site, (process, reader) in processes.items():
+            try:
+                result = reader.recv()
+            except EOFError:
+                result = None
+            process.join()
+            if (result is None) or (process.exitcode != 0):
+                result = SiteResult(site, False, perf_counter() - start_time,
+                                    f"process exited with code: {process.exitcode}")
+            results.append(result)
+        return results
+    except BaseException:
+        for process, _ in processes.values():
+            process.terminate()
+        raise
+    finally:
+        for process, reader in processes.values():
+            process.join()
+            reader.close()
+
+
+def run_sites(sites: Sequence[str],
+              configfile: str,
+              worker_init: Callable[[str], Optional[str]] = None,
+              print_report=False,
+              profile: str = None) -> List[SiteResult]:
+    """Run each site's program in its own process (with its own browser), all of them at once"""
+
+    configfile = str(Path(configfile).absolute())
+    _log.info("Running %s sites in parallel: %s", len(sites), list(sites))
+    results = run_site_processes(run_site, sites, (configfile, worker_init, print_report, profile))
+
+    for result in results:
+        if result.succeeded:
+            _log.info("'%s' completed! [took: %d min. %d s.]", result.site, result.seconds // 60, result.seconds % 60)
+        else:
+            _log.error("'%s' failed! (%s)", result.site, result.error)
+    return results
+
+
+def format_site_results(results: List[SiteResult]) -> str:
+    return tabulate([[result.site,
+                      "OK" if result.succeeded else "FAILED",
+                      f"{result.seconds:.1f}",
+                      result.error] for result in results],
+                    headers=["SITE", "RESULT", "SECONDS", "ERROR"])
@@ -12,9 +12,8 @@ class SeekConfig(Config):
     def parse_search_config(cls, parser: ConfigParser) -> SearchConfig:
         search_config = super().parse_search_config(parser)
 
-        # update the search_params dict with parsed values
-        search_params = search_config.search_params
-        search_params["what"] = parser.get(cls.SECTION, "search_what")
-        search_params["where"] = parser.get(cls.SECTION, "search_where")
+        # update the searches list and the search_params dict (of the first search) with parsed values
+        search_config.searches.extend(cls.parse_searches(parser, {"what": "search_what", "where": "search_where"}))
+        search_config.search_params.update(search_config.searches[0])
 
         return search_config
@@ -1,7 +1,6 @@
 import logging
 from typing import Any, Dict
-
-from hed_utils.selenium import FindBy
+from urllib.parse import quote, urlencode
 
 from scrape_jobs.base.data_collection import Page
 
@@ -12,20 +11,54 @@ from scrape_jobs.seek import SeekJob
 _log = logging.getLogger(__name__)
 _log.addHandler(logging.NullHandler())
 
+# 'hed_utils.selenium' (loading selenium) is imported by the methods driving the browser only, so the results urls can
+# be built without it (e.g. by the http collector)
+
 
 class SeekPage(Page):
     PAGE_URL = "https://www.seek.com.au/"
+    RESULTS_URL = "https://www.seek.com.au/jobs"
+    NEXT_PAGE_SELECTOR = "a[data-automation='page-next']"
+
+    def __init__(self,
+                 search_params: Dict[str, Any],
+                 max_post_age_days: int,
+                 max_attempts: int,
+                 incremental: bool = False,
+                 backend: str = None,
+                 stop_after_known_pages: int = 0,
+                 url_search: bool = False):
+        super().__init__(search_params,
+                         max_post_age_days,
+                         max_attempts,
+                         parser=SeekJob(backend=backend),
+                         incremental=incremental,
+                         stop_after_known_pages=stop_after_known_pages,
+                         url_search=url_search)
+        from hed_utils.selenium import FindBy
 
-    def __init__(self, search_params: Dict[str, Any], max_post_age_days: int, max_attempts: int):
-        super().__init__(search_params, max_post_age_days, max_attempts, parser=SeekJob())
         self.search_results = FindBy.TAG_NAME("article", visible_only=False)
         self.search_button = FindBy.CSS_SELECTOR("button[data-automation='searchButton']")
-        self.next_page_button = FindBy.CSS_SELECTOR("a[data-automation='page-next']")
+        self.next_page_button = FindBy.CSS_SELECTOR(self.NEXT_PAGE_SELECTOR)
         self.what_input = FindBy.ID("keywords-input")
         self.where_input = FindBy.CSS_SELECTOR("input#SearchBar__Where")
         self.where_autocomplete = FindBy.XPATH(
             "//input[contains(@id,'SearchBar__Where')]/../..//ul//li[contains(@id,'react-autowhatever')]")
 
+    @classmethod
+    def build_results_url(cls, search_params: Dict[str, Any], page_number: int) -> str:
+        """Build the url of the results page (sorted by listed date) with the given number"""
+
+        query = {"keywords": search_params.get("what", ""),
+                 "where": search_params.get("where", ""),
+                 "sortmode": "ListedDate"}
+        if page_number > 1:
+            query["page"] = page_number
+        return f"{cls.RESULTS_URL}?{urlencode(query, quote_via=quote)}"
+
+    def get_results_url(self, page_number: int) -> str:
+        return self.build_results_url(self.search_params, page_number)
+
     def perform_search(self):
         self.set_search_params()
         self.search_button.click()
@@ -33,6 +66,8 @@ class SeekPage(Page):
         self.sort_by_date()
 
     def sort_by_date(self):
+        from hed_utils.selenium import FindBy
+
         _log.info("sorting results by date...")
         sort_by = FindBy.XPATH("//label[contains(@id,'sortby-label')]")
         sort_by.click()
@@ -58,11 +93,11 @@ class SeekPage(Page):
         self.driver.wait_for_page_load()
 
     def wait_for_results_to_load(self):
-        self.driver.wait_for_page_load()
-        return self.search_results.is_visible(timeout=15)
+        return self.wait_for_elements(self.parser.SELECTOR, timeout=15) > 0
 
     def has_more_results(self) -> bool:
-        return self.next_page_button.is_visible(timeout=5)
+        # the pagination is rendered along with the results, so it is known as soon as the page is settled
+        return self.wait_for_elements(self.NEXT_PAGE_SELECTOR, visible_only=True, timeout=5) > 0
 
     def load_more_results(self):
         if self.search_results.is_visible():
@@ -0,0 +1,46 @@
+from configparser import ConfigParser
+
+import pytest
+
+from scrape_jobs.config import get_sample_contents
+from scrape_jobs.seek import SeekConfig
+
+# the options of the sample config that must be given (the rest fall back to the code defaults)
+REQUIRED_OPTIONS = {"spreadsheet_title", "worksheet_title", "json_filepath", "tz_name", "scraped_fmt", "posted_fmt",
+                    "driver_headless", "max_post_age_days"}
+
+# the options the sample config sets to other than their (disabled) code defaults
+ENABLED_OPTIONS = {"block_resources"}
+
+
+def read_sample(without_option: str = None) -> ConfigParser:
+    parser = ConfigParser(interpolation=None)
+    parser.read_string(get_sample_contents().decode("utf-8"))
+    parser.set("DEFAULT", "driver_headless", "yes")
+    if without_option:
+        parser.remove_option("DEFAULT", without_option)
+    return parser
+
+
+def get_optional_options():
+    return [option for option in read_sample().defaults() if option not in (REQUIRED_OPTIONS | ENABLED_OPTIONS)]
+
+
+@pytest.mark.parametrize("option", get_optional_options())
+def test_sample_values_match_code_defaults(option):
+    sample_config = SeekConfig.parse(read_sample())
+    config = SeekConfig.parse(read_sample(without_option=option))
+
+    assert config.search_config == sample_config.search_config
+    assert config.sheets_config == sample_config.sheets_config
+    assert config.storage_config == sample_config.storage_config
+    assert config.run_config == sample_config.run_config
+
+
+def test_block_resources_off_by_default():
+    parser = read_sample()
+    parser.set("DEFAULT", "block_resources", "")
+
+    assert SeekConfig.parse(parser).search_config.block_resources == []
+    assert SeekConfig.parse(read_sample(without_option="block_resources")).search_config.block_resources == []
+    assert SeekConfig.parse(read_sample()).search_config.block_resources == ["image", "font", "media"]
@@ -0,0 +1,158 @@
+import random
+from typing import Dict, List
+
+import pytest
+
+from scrape_jobs.base.data_storage import CsvOffsetIndex, IndexedCsvJobsStorage
+
+COLUMNS = ["title", "url", "posted_time"]
+
+NON_ASCII_URLS = ["https://example.com/jobs/ä", "https://example.com/jobs/日本語", "https://example.com/jobs/z",
+                  "https://example.com/jobs/ž", "https://example.com/jobs/a"]
+
+
+def load_index(tmp_path, urls: List[str]) -> CsvOffsetIndex:
+    filepath = tmp_path.joinpath("jobs.csv.idx")
+    CsvOffsetIndex.write(filepath, [(url, 10 * number, 10 * number + 10) for number, url in enumerate(urls)], 1000)
+    index = CsvOffsetIndex.load(filepath)
+    assert index is not None
+    return index
+
+
+def make_jobs(*urls, title="title") -> List[Dict[str, str]]:
+    return [{"title": f"{title} of {url}", "url": url, "posted_time": f"2020-01-{number + 1:02d}"}
+            for number, url in enumerate(urls)]
+
+
+@pytest.fixture
+def make_storage(tmp_path):
+    filepath = str(tmp_path.joinpath("jobs.csv"))
+    storages = []
+
+    def make_storage() -> IndexedCsvJobsStorage:
+        for previous_storage in storages:
+            previous_storage.close()
+        storage = IndexedCsvJobsStorage(COLUMNS, filepath)
+        if not storage.filepath.exists():
+            storage.init_file()
+        storages.append(storage)
+        return storage
+
+    yield make_storage
+    for storage in storages:
+        storage.close()
+
+
+def test_find_sorted_in_empty_index(tmp_path):
+    index = load_index(tmp_path, [])
+
+    assert len(index) == 0
+    assert index.find_sorted("https://example.com") is None
+    assert "https://example.com" not in index
+    assert list(index) == []
+    index.close()
+
+
+@pytest.mark.parametrize("urls", [["b"], ["b", "d"], ["d", "b"]])
+def test_find_sorted_in_small_index(tmp_path, urls):
+    index = load_index(tmp_path, urls)
+
+    for number, url in enumerate(urls):
+        assert index.find_sorted(url) == 10 * number
+    for missing_url in ["", "a", "c", "e", "bb", "b\t"]:
+        assert index.find_sorted(missing_url) is None
+    assert set(index) == set(urls)
+    index.close()
+
+
+def test_find_sorted_in_large_index(tmp_path):
+    urls = [f"https://example.com/jobs/{number}" for number in range(1000)]
+    random.Random(1).shuffle(urls)
+    index = load_index(tmp_path, urls)
+
+    assert all(index.find_sorted(url) == 10 * number for number, url in enumerate(urls))
+    assert index.find_sorted("https://example.com/jobs/1000") is None
+    assert index.find_sorted("https://example.com/jobs/-1") is None
+    index.close()
+
+
+def test_find_sorted_non_ascii_urls(tmp_path):
+    index = load_index(tmp_path, NON_ASCII_URLS)
+
+    for number, url in enumerate(NON_ASCII_URLS):
+        assert index.find_sorted(url) == 10 * number
+    assert index.find_sorted("https://example.com/jobs/ö") is None
+    index.close()
+
+
+def test_read_job_with_quoted_newlines(make_storage):
+    storage = make_storage()
+    jobs = make_jobs("https://example.com/1", "https://example.com/2", "https://example.com/3",
+                     title="multi\nline, \"quoted\"")
+    storage.store_jobs(jobs)
+
+    storage = make_storage()  # the sorted index is rebuilt from the CSV
+    storage.rebuild_index()
+    for job in jobs:
+        assert storage.read_job(job["url"]) == job
+    assert storage.read_job("https://example.com/4") is None
+
+
+def test_read_job_with_non_ascii_urls(make_storage):
+    storage = make_storage()
+    jobs = make_jobs(*NON_ASCII_URLS)
+    storage.store_jobs(jobs)
+
+    storage = make_storage()
+    assert set(storage.get_known_jobs_urls()) == set(NON_ASCII_URLS)
+    for job in jobs:
+        assert storage.read_job(job["url"]) == job
+
+
+def test_lookups_after_appends_before_resort(make_storage):
+    storage = make_storage()
+    sorted_jobs = make_jobs("https://example.com/b", "https://example.com/d", title="sorted")
+    storage.store_jobs(sorted_jobs)
+    storage.rebuild_index()
+
+    storage = make_storage()
+    appended_jobs = make_jobs("https://example.com/a", "https://example.com/c", title="appended")
+    storage.store_jobs(appended_jobs)
+    assert storage.load_index().appended_count == 2
+
+    storage = make_storage()  # the appended lines are loaded from the index file
+    index = storage.get_known_jobs_urls()
+    assert index.appended_count == 2
+    assert len(index) == 4
+    for job in sorted_jobs + appended_jobs:
+        assert job["url"] in index
+        assert storage.read_job(job["url"]) == job
+
+
+def test_lookups_after_resort(make_storage, monkeypatch):
+    monkeypatch.setattr(IndexedCsvJobsStorage, "MAX_APPENDED", 1)
+    storage = make_storage()
+    jobs = make_jobs(*[f"https://example.com/{number}" for number in range(5)])
+    for job in jobs:
+        storage.store_jobs([job])
+
+    storage = make_storage()
+    assert storage.load_index().appended_count == 0
+    for job in jobs:
+        assert storage.read_job(job["url"]) == job
+
+
+def test_lookups_after_compaction(make_storage):
+    storage = make_storage()
+    jobs = make_jobs("https://example.com/c", "https://example.com/a", "https://example.com/b")
+    storage.store_jobs(jobs)
+    storage.store_jobs(make_jobs("https://example.com/a", title="duplicate"))
+
+    assert storage.compact() == 3
+    assert storage.load_index().appended_count == 0
+    for job in jobs:
+        assert storage.read_job(job["url"]) == job
+
+    storage = make_storage()
+    assert len(storage.get_known_jobs_urls()) == 3
+    assert storage.read_job("https://example.com/a") == jobs[1]
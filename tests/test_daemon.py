@@ -0,0 +1,102 @@
+import json
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+
+from benchmarks.fixtures import make_job
+from scrape_jobs.base.data_collection import ACollector
+from scrape_jobs.config import RunConfig, SheetsConfig, StorageConfig, TimeConfig
+from scrape_jobs.daemon import SiteDaemon
+
+INTERVAL_MINUTES = 10
+
+
+class Clock:
+
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class JobsCollector(ACollector):
+
+    def __init__(self, jobs: List[Dict[str, Any]] = None, error: Exception = None):
+        self.jobs = jobs or []
+        self.error = error
+
+    def collect_jobs(self) -> List[Dict[str, Any]]:
+        if self.error:
+            raise self.error
+        return list(self.jobs)
+
+
+def make_config(tmp_path) -> SimpleNamespace:
+    return SimpleNamespace(
+        time_config=TimeConfig(tz_name="UTC", posted_fmt=None, scraped_fmt=None),
+        storage_config=StorageConfig(storage="sqlite", url_index=False,
+                                     sqlite_filepath=str(tmp_path.joinpath("jobs.sqlite")),
+                                     csv_index=False, parquet_dir=""),
+        sheets_config=SheetsConfig(spreadsheet_title="", worksheet_title="", json_filepath="", sheets_chunk_size=500,
+                                   sheets_max_retries=5, sheets_write_behind=False, sheets_urls_cache=False),
+        run_config=RunConfig(streaming=False, daemon_interval=INTERVAL_MINUTES, metrics_dir=""),
+        search_config=None)
+
+
+@pytest.fixture
+def state_filepath(tmp_path) -> str:
+    return str(tmp_path.joinpath("daemon.json"))
+
+
+def make_daemon(tmp_path, state_filepath, clock, collector) -> SiteDaemon:
+    daemon = SiteDaemon("seek.com.au", make_config(tmp_path), state_filepath,
+                        str(tmp_path.joinpath("report.json")), clock=clock)
+    daemon.prepare_collector = lambda: collector
+    daemon.prepare()
+    return daemon
+
+
+def test_run_stores_jobs_and_schedules_the_next_one(tmp_path, state_filepath):
+    clock = Clock(1000.0)
+    daemon = make_daemon(tmp_path, state_filepath, clock, JobsCollector([make_job(1), make_job(2)]))
+    assert daemon.get_seconds_to_next_run() == 0.0
+
+    result = daemon.serve(max_runs=1)
+
+    assert result.succeeded
+    assert set(daemon.storage.get_known_jobs_urls()) == {make_job(1)["url"], make_job(2)["url"]}
+    with open(state_filepath, encoding="utf-8") as fp:
+        state = json.load(fp)
+    assert (state["runs"], state["failures"], state["last_succeeded"]) == (1, 0, True)
+    assert state["next_run"] == 1000.0 + INTERVAL_MINUTES * 60
+    assert tmp_path.joinpath("report.json").exists()
+
+    clock.now += 5 * 60
+    assert daemon.get_seconds_to_next_run() == 5 * 60
+    clock.now += 6 * 60
+    assert daemon.get_seconds_to_next_run() == 0.0
+
+
+def test_restarted_daemon_resumes_the_schedule(tmp_path, state_filepath):
+    clock = Clock(1000.0)
+    make_daemon(tmp_path, state_filepath, clock, JobsCollector([make_job(1)])).run_once()
+
+    clock.now += 60
+    restarted = make_daemon(tmp_path, state_filepath, clock, JobsCollector())
+    assert restarted.state["runs"] == 1
+    assert restarted.get_seconds_to_next_run() == (INTERVAL_MINUTES - 1) * 60
+
+
+def test_failed_run_is_recorded(tmp_path, state_filepath):
+    daemon = make_daemon(tmp_path, state_filepath, Clock(1000.0), JobsCollector(error=ValueError("page crashed")))
+
+    result = daemon.run_once()
+
+    assert not result.succeeded
+    assert "page crashed" in result.error
+    assert (daemon.state["runs"], daemon.state["failures"], daemon.state["last_succeeded"]) == (1, 1, False)
+    assert daemon.state["last_failed_stage"] == "collect"
+    # a failed run keeps the schedule
+    assert daemon.state["next_run"] == 1000.0 + INTERVAL_MINUTES * 60
@@ -0,0 +1,79 @@
+import pytest
+from hed_utils.selenium import SharedDriver
+
+from benchmarks.fixtures import REPLAY_PAGES, make_job, write_snapshots
+from scrape_jobs.base.data_collection import WAIT_FOR_ELEMENTS_SCRIPT, filter_unknown_jobs, get_job_identity
+from scrape_jobs.replay import ReplayDriver
+from scrape_jobs.seek import SeekPage
+
+
+class WaitingDriver:
+    """Answers the wait script with the given result, recording the arguments it was called with"""
+
+    def __init__(self, result):
+        self.result = result
+        self.calls = []
+
+    def execute_async_script(self, script, *args):
+        self.calls.append((script, args))
+        return self.result
+
+
+@pytest.fixture
+def seek_page():
+    yield SeekPage(dict(REPLAY_PAGES["seek.com.au"][1]), 36500, 3)
+    SharedDriver.set_instance(None)
+
+
+def test_filter_unknown_jobs_over_pagination():
+    """Every page repeats the last results of the previous one, every 10th result has no url"""
+
+    known_identities = set()
+    for number in range(0, 1000, 25):
+        repeated = [make_job(n, with_url=bool(n % 10)) for n in range(max(0, number - 5), number)]
+        fresh = [make_job(n, with_url=bool(n % 10)) for n in range(number, number + 25)]
+
+        assert filter_unknown_jobs(repeated + fresh, known_identities) == fresh
+    assert len(known_identities) == 1000
+
+
+def test_filter_unknown_jobs_in_same_batch():
+    jobs = [make_job(1), make_job(2, with_url=False), make_job(1), make_job(2, with_url=False), make_job(3)]
+
+    assert filter_unknown_jobs(jobs, set()) == [jobs[0], jobs[1], jobs[4]]
+
+
+def test_job_identity():
+    job = make_job(1)
+    assert get_job_identity(job) == "https://example.com/job/1"
+
+    job_without_url = make_job(1, with_url=False)
+    assert get_job_identity(job_without_url).startswith("sha1:")
+    assert get_job_identity(job_without_url) == get_job_identity(dict(job_without_url, posted_time="today"))
+    assert get_job_identity(job_without_url) != get_job_identity(dict(job_without_url, company="Other"))
+
+
+def test_wait_for_elements_runs_the_wait_in_page(seek_page):
+    driver = WaitingDriver({"count": 7, "reason": "condition", "waited": 120})
+    SharedDriver.set_instance(driver)
+
+    assert seek_page.wait_for_elements("article", min_count=5, visible_only=True, timeout=2.5, quiet=0.25) == 7
+    # the times are passed in milliseconds, the async callback is appended by the driver
+    assert driver.calls == [(WAIT_FOR_ELEMENTS_SCRIPT, ("article", True, 5, 250, 2500))]
+    assert seek_page.wait_seconds > 0
+
+
+def test_wait_for_elements_without_result(seek_page):
+    SharedDriver.set_instance(WaitingDriver(None))
+
+    assert seek_page.wait_for_elements("article") == 0
+    assert seek_page.wait_seconds > 0
+
+
+def test_wait_for_elements_in_replayed_page(seek_page, tmp_path):
+    SharedDriver.set_instance(ReplayDriver(write_snapshots("seek.com.au", str(tmp_path), 2, 10)))
+    seek_page.driver.get(seek_page.get_results_url(1))
+
+    assert seek_page.wait_for_elements(seek_page.parser.SELECTOR) == 10
+    assert seek_page.wait_for_elements(seek_page.NEXT_PAGE_SELECTOR, visible_only=True) == 1
+    assert seek_page.wait_for_elements("article.missing", timeout=0.1) == 0
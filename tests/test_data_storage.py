@@ -0,0 +1,136 @@
+import pickle
+from typing import Dict, List, Optional, Set
+
+import pytest
+
+from scrape_jobs.base.data_storage import AStorage, IndexedStorage, MemoryUrlIndex, SqliteUrlSet, UrlIndex
+
+
+class FakeStorage(AStorage):
+    """Storage keeping the urls in memory, with 'write_behind' the writes are visible only after 'flush'"""
+
+    def __init__(self, write_behind=False):
+        super().__init__(["url"])
+        self.write_behind = write_behind
+        self.urls = []  # type: List[str]
+        self.pending = []  # type: List[str]
+        self.reads = 0
+
+    def get_known_jobs_urls(self) -> Set[str]:
+        self.reads += 1
+        return set(self.urls)
+
+    def store_jobs(self, jobs: List[Dict[str, str]]):
+        urls = [job["url"] for job in jobs]
+        if self.write_behind:
+            self.pending.extend(urls)
+        else:
+            self.urls.extend(urls)
+
+    def flush(self):
+        self.urls.extend(self.pending)
+        self.pending = []
+
+    def get_revision(self) -> Optional[str]:
+        return str(len(self.urls))
+
+
+def make_jobs(*urls) -> List[Dict[str, str]]:
+    return [{"url": url} for url in urls]
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def index(request, tmp_path):
+    if request.param == "memory":
+        url_index = MemoryUrlIndex()
+    else:
+        url_index = UrlIndex(str(tmp_path.joinpath("urls.sqlite")))
+    yield url_index
+    url_index.close()
+
+
+def run(storage: IndexedStorage, *urls) -> Set[str]:
+    known_jobs_urls = set(storage.get_known_jobs_urls())
+    storage.store_jobs(make_jobs(*urls))
+    storage.flush()
+    return known_jobs_urls
+
+
+@pytest.mark.parametrize("write_behind", [False, True])
+def test_indexed_storage_reads_storage_only_when_changed(index, write_behind):
+    storage = FakeStorage(write_behind=write_behind)
+    indexed = IndexedStorage(storage, index)
+
+    assert run(indexed, "a", "b") == set()
+    assert run(indexed, "c") == {"a", "b"}
+    assert run(indexed) == {"a", "b", "c"}
+    assert storage.reads == 1
+    assert index.revision == storage.get_revision() == "3"
+
+
+def test_indexed_storage_reconciles_after_foreign_write(index):
+    storage = FakeStorage()
+    indexed = IndexedStorage(storage, index)
+    run(indexed, "a")
+
+    indexed.get_known_jobs_urls()
+    storage.urls.append("foreign")  # another writer, after the index was synced
+    indexed.store_jobs(make_jobs("b"))
+    indexed.flush()
+    assert index.revision == "1"  # not moved over the foreign write
+
+    assert set(indexed.get_known_jobs_urls()) == {"a", "b", "foreign"}
+    assert storage.reads == 2
+
+
+def test_url_index_replace(tmp_path):
+    filepath = str(tmp_path.joinpath("urls.sqlite"))
+    index = UrlIndex(filepath)
+    index.update(["a", "b", ""], "1")
+    index.replace(["c"], "2")
+    index.close()
+
+    index = UrlIndex(filepath)
+    assert (set(index), index.revision) == ({"c"}, "2")
+    index.close()
+
+
+def test_url_index_replace_is_atomic(tmp_path):
+    index = UrlIndex(str(tmp_path.joinpath("urls.sqlite")))
+    index.update(["a"], "1")
+
+    def failing_urls():
+        yield "b"
+        raise RuntimeError("failed while reading the storage")
+
+    with pytest.raises(RuntimeError):
+        index.replace(failing_urls(), "2")
+
+    assert (set(index), index.revision) == ({"a"}, "1")
+    index.close()
+
+
+def test_url_index_is_pickled_as_its_path(tmp_path):
+    index = UrlIndex(str(tmp_path.joinpath("urls.sqlite")))
+    index.update((f"https://example.com/job/{number}" for number in range(1000)), "1")
+
+    data = pickle.dumps(index)
+    view = pickle.loads(data)
+    index.update(["added"], "2")
+
+    assert len(data) < 1000
+    assert isinstance(view, SqliteUrlSet) and (view.filepath == index.filepath)
+    assert ("https://example.com/job/0" in view) and ("added" in view) and ("missing" not in view)
+    index.close()
+
+
+def test_url_index_emptiness_is_checked_without_counting(tmp_path):
+    index = UrlIndex(str(tmp_path.joinpath("urls.sqlite")))
+    queries = []
+    index._connection.set_trace_callback(queries.append)
+
+    assert not index
+    index.update(["a"], "1")
+    assert index
+    assert not [query for query in queries if "COUNT" in query.upper()]
+    index.close()
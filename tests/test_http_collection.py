@@ -0,0 +1,78 @@
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import pytest
+
+from benchmarks.fixtures import FIXTURES, REPLAY_PAGES, write_snapshots
+from benchmarks.http_collection import FixtureServer
+from scrape_jobs.base.http_collection import HttpCollector
+from scrape_jobs.linkedin import LinkedinPage
+
+CARDS_PER_PAGE = LinkedinPage.RESULTS_PER_PAGE
+
+
+@pytest.fixture(params=sorted(REPLAY_PAGES))
+def site(request):
+    return request.param
+
+
+@pytest.fixture
+def pages(site, tmp_path):
+    snapshots = write_snapshots(site, str(tmp_path), 4, CARDS_PER_PAGE, cumulative=False)
+    return [Path(snapshot).read_text(encoding="utf-8") for snapshot in snapshots]
+
+
+@pytest.fixture
+def server(pages):
+    with FixtureServer(pages) as server:
+        yield server
+
+
+def make_collector(site, server, **kwargs) -> HttpCollector:
+    page_cls, search_params = REPLAY_PAGES[site]
+    parser_cls, _ = FIXTURES[site]
+
+    def build_url(params, page_number):
+        parts = urlsplit(page_cls.build_results_url(params, page_number))
+        return f"{server.url}{parts.path}?{parts.query}"
+
+    return HttpCollector([dict(search_params)], build_url, parser_cls(), 36500, 3, **kwargs)
+
+
+def parse_urls(site, html):
+    parser = FIXTURES[site][0]()
+    return [parser.parse(tag)["url"] for tag in parser.find_all(parser.parse_document(html))]
+
+
+@pytest.mark.parametrize("concurrency", [1, 3])
+def test_collects_the_jobs_of_every_page(site, pages, server, concurrency):
+    collector = make_collector(site, server, concurrency=concurrency)
+    batches = list(collector.iter_jobs())
+    collector.close()
+
+    assert len(batches) == len(pages)
+    for batch, page in zip(batches, pages):
+        assert sorted(job["url"] for job in batch) == sorted(parse_urls(site, page))
+    # every page and the (empty) one after the last, plus the pages that were already requested by then
+    assert collector.requests_count == len(pages) + concurrency
+    assert len(pages) + 1 <= server.requests <= collector.requests_count
+
+
+def test_stops_at_max_pages(site, server):
+    collector = make_collector(site, server, concurrency=1, max_pages=2)
+    batches = list(collector.iter_jobs())
+    collector.close()
+
+    assert len(batches) == 2
+    assert server.requests == 2
+
+
+def test_stops_after_known_pages(site, pages, server):
+    collector = make_collector(site, server, concurrency=1, stop_after_known_pages=2)
+    collector.set_known_jobs_urls({url for page in pages[:2] for url in parse_urls(site, page)})
+    batches = list(collector.iter_jobs())
+    collector.close()
+
+    # the known pages are still yielded (the storage drops the stored jobs), the collection stops at the second one
+    assert len(batches) == 1
+    assert server.requests == 2
@@ -0,0 +1,115 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from benchmarks.fixtures import FIXTURES, load_fixture, make_page
+from scrape_jobs.base import html_parsing
+from scrape_jobs.base.html_parsing import BACKENDS
+from scrape_jobs.linkedin import LinkedinJob
+from scrape_jobs.seek import SeekJob, seek_job
+
+# cards in the sample page of each site, and the fields that some of the cards leave empty
+EXPECTED_CARDS = {"seek.com.au": 20, "linkedin.com": 25}
+OPTIONAL_FIELDS = {"salary"}
+
+
+@pytest.fixture(autouse=True)
+def fixed_time(monkeypatch):
+    """The seek posted times are relative to the parse time, fix it so the parsed jobs can be compared"""
+
+    monkeypatch.setattr(seek_job, "utc_moment", lambda: datetime(2020, 2, 1, 12, 0, tzinfo=timezone.utc))
+
+
+def parse_all(parser_cls, html: str, backend: str = None):
+    parser = parser_cls(backend=backend)
+    jobs = [parser.parse(tag) for tag in parser.find_all(parser.parse_document(html))]
+    for job in jobs:
+        job.pop("scraped_time")
+    return jobs
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+@pytest.mark.parametrize("site", sorted(FIXTURES))
+def test_parse_sample_page(site, backend):
+    parser_cls, filename = FIXTURES[site]
+    jobs = parse_all(parser_cls, load_fixture(filename), backend)
+
+    assert len(jobs) == EXPECTED_CARDS[site]
+    for job in jobs:
+        assert list(job) == [key for key in parser_cls.KEYS if key != "scraped_time"]
+        assert all(job[key] is not None for key in job if key not in OPTIONAL_FIELDS)
+        assert job["url"].startswith("https://") and "?" not in job["url"]
+    assert len({job["url"] for job in jobs}) == len(jobs)
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+@pytest.mark.parametrize("site", sorted(FIXTURES))
+def test_backends_parse_the_same_jobs(site, backend):
+    parser_cls, filename = FIXTURES[site]
+    for html in [load_fixture(filename), make_page(parser_cls, filename, 60)]:
+        assert parse_all(parser_cls, html, backend) == parse_all(parser_cls, html)
+
+
+@pytest.mark.parametrize("site", sorted(FIXTURES))
+def test_made_page_has_unique_cards(site):
+    parser_cls, filename = FIXTURES[site]
+    jobs = parse_all(parser_cls, make_page(parser_cls, filename, 60, first_number=100))
+
+    assert len(jobs) == 60
+    assert len({job["url"] for job in jobs}) == 60
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+@pytest.mark.parametrize("site", sorted(FIXTURES))
+def test_find_new_skips_known_cards(site, backend):
+    parser_cls, filename = FIXTURES[site]
+    parser = parser_cls(backend=backend)
+
+    first_page = parser.parse_document(make_page(parser_cls, filename, 30))
+    assert len(parser.find_new(first_page)) == 30
+    assert parser.find_new(first_page) == []
+
+    overlapping_page = parser.parse_document(make_page(parser_cls, filename, 30, first_number=20))
+    new_tags = parser.find_new(overlapping_page, memoize=False)
+    expected_jobs = parse_all(parser_cls, make_page(parser_cls, filename, 20, first_number=30))
+    assert [parser.parse(tag)["url"] for tag in new_tags] == [job["url"] for job in expected_jobs]
+    assert len(parser.find_new(overlapping_page)) == 20
+
+
+@pytest.mark.parametrize("site", sorted(FIXTURES))
+def test_field_getters_match_parse(site):
+    parser_cls, filename = FIXTURES[site]
+    parser = parser_cls()
+    tags = parser.find_all(parser.parse_document(load_fixture(filename)))
+    assert tags
+
+    for tag in tags:
+        job = parser.parse(tag)
+        for name in parser_cls.FIELDS:
+            assert getattr(parser_cls, f"get_{name}")(tag) == job[name]
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+@pytest.mark.parametrize("site", sorted(FIXTURES))
+def test_selectors_are_compiled_once_per_class_and_backend(site, backend, monkeypatch):
+    parser_cls, filename = FIXTURES[site]
+    parser = parser_cls(backend=backend)
+    tag = parser.find_all(parser.parse_document(load_fixture(filename)))[0]
+    monkeypatch.setattr(html_parsing.HtmlBackend, "compile", lambda *args: pytest.fail("selector compiled again"))
+
+    assert parser_cls(backend=backend).backend is parser.backend
+    assert parser_cls.read_field(tag, "url", backend) == parser.parse(tag)["url"]
+
+
+def test_parsers_do_not_share_compiled_selectors():
+    assert LinkedinJob.get_compiled() is LinkedinJob.get_compiled()
+    assert LinkedinJob.get_compiled().fields["url"].convert == LinkedinJob.parse_url
+    assert SeekJob.get_compiled().fields["url"].convert == SeekJob.parse_url
+
+
+@pytest.mark.parametrize("parser_cls, href, url", [
+    (SeekJob, "/job/50123400?type=standout", "https://seek.com.au/job/50123400"),
+    (LinkedinJob, "/jobs/view/qa-engineer-123?refId=1", "https://www.linkedin.com/jobs/view/qa-engineer-123"),
+    (LinkedinJob, "https://bg.linkedin.com/jobs/view/qa-123?refId=1", "https://bg.linkedin.com/jobs/view/qa-123")])
+def test_parse_url_of_each_site(parser_cls, href, url):
+    assert parser_cls.parse_url(href) == url
@@ -0,0 +1,94 @@
+import re
+
+from scrape_jobs import metrics
+from scrape_jobs.run_report import RunReport
+
+SAMPLE_PATTERN = re.compile(r'^(scrape_jobs_[a-z_]+)(\{[a-z_]+="(?:[^"\\]|\\.)*"(?:,[a-z_]+="(?:[^"\\]|\\.)*")*\})? '
+                            r'(-?[0-9.e+-]+)$')
+
+
+def make_report(site="seek.com.au", stored=3, failed_stage=None) -> RunReport:
+    report = RunReport(site)
+    report.add_time("program.known_urls", 0.25)
+    report.add_time("program.store", 1.5)
+    report.add_time("collect.wait", 4.125, calls=3)
+    report.count("pages", 3)
+    report.count("cards", 60)
+    report.count("collected", 10)
+    report.count("new", 4)
+    report.count("stored", stored)
+    report.finish(failed_stage is None, failed_stage, RuntimeError("failed") if failed_stage else None)
+    return report
+
+
+def parse_samples(text: str):
+    """Check the exposition format (every sample is preceded by HELP and TYPE of its metric) and get the samples"""
+
+    assert text.endswith("\n")
+    samples, described = {}, {}
+    for line in text.splitlines():
+        if line.startswith("# HELP "):
+            name = line.split(" ")[2]
+            assert name not in described, f"described twice: {name}"
+            described[name] = None
+        elif line.startswith("# TYPE "):
+            _, _, name, metric_type = line.split(" ")
+            assert (name in described) and (described[name] is None)
+            assert metric_type in {"gauge", "counter"}
+            described[name] = metric_type
+        else:
+            match = SAMPLE_PATTERN.match(line)
+            assert match, f"malformed sample: {line}"
+            name, labels, value = match.groups()
+            assert described.get(name, None), f"sample of undescribed metric: {line}"
+            assert (described[name] == "counter") == name.endswith("_total")
+            samples[name + (labels or "")] = float(value)
+    return samples
+
+
+def test_metrics_format():
+    samples = parse_samples(metrics.format_metrics(make_report()))
+
+    assert samples['scrape_jobs_last_run_success{site="seek.com.au"}'] == 1
+    assert samples['scrape_jobs_phase_duration_seconds{site="seek.com.au",phase="collect.wait"}'] == 4.125
+    assert samples['scrape_jobs_phase_calls{site="seek.com.au",phase="collect.wait"}'] == 3
+    assert samples['scrape_jobs_storage_latency_seconds{site="seek.com.au",operation="read"}'] == 0.25
+    assert samples['scrape_jobs_storage_latency_seconds{site="seek.com.au",operation="write"}'] == 1.5
+    assert samples['scrape_jobs_jobs{site="seek.com.au",kind="new"}'] == 4
+    assert samples['scrape_jobs_runs_total{site="seek.com.au"}'] == 1
+    assert samples['scrape_jobs_jobs_stored_total{site="seek.com.au"}'] == 3
+    assert all(value == 0 for name, value in samples.items() if name.startswith("scrape_jobs_failures_total"))
+
+
+def test_failed_stage():
+    samples = parse_samples(metrics.format_metrics(make_report(failed_stage="store")))
+
+    assert samples['scrape_jobs_last_run_success{site="seek.com.au"}'] == 0
+    assert [name for name, value in samples.items() if name.startswith("scrape_jobs_last_run_failed") and value] == [
+        'scrape_jobs_last_run_failed{site="seek.com.au",stage="store"}']
+    assert samples['scrape_jobs_failures_total{site="seek.com.au",stage="store"}'] == 1
+
+
+def test_label_values_are_escaped():
+    text = metrics.format_metrics(make_report(site='odd "site"\\\nname'))
+
+    assert 'site="odd \\"site\\"\\\\\\nname"' in text
+    parse_samples(text)
+
+
+def test_totals_are_carried_over_between_runs(tmp_path):
+    metrics_dir = str(tmp_path)
+    metrics.write_textfile(make_report(stored=3), metrics_dir)
+    metrics.write_textfile(make_report(stored=2, failed_stage="collect"), metrics_dir)
+    path = metrics.write_textfile(make_report(stored=5), metrics_dir)
+
+    textfile = tmp_path.joinpath("scrape_jobs_seek_com_au.prom")
+    assert path == str(textfile)
+    assert not list(tmp_path.glob("*.tmp"))
+    totals = metrics.read_totals(textfile)
+    assert totals['scrape_jobs_runs_total{site="seek.com.au"}'] == 3
+    assert totals['scrape_jobs_jobs_stored_total{site="seek.com.au"}'] == 10
+    assert totals['scrape_jobs_failures_total{site="seek.com.au",stage="collect"}'] == 1
+    assert totals['scrape_jobs_failures_total{site="seek.com.au",stage="store"}'] == 0
+    # the gauges describe only the last run
+    assert 'scrape_jobs_jobs{site="seek.com.au",kind="stored"} 5' in textfile.read_text(encoding="utf-8")
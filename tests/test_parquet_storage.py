@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+import pytest
+
+from scrape_jobs.base import data_storage
+from scrape_jobs.base.data_collection import ACollector
+from scrape_jobs.base.data_processing import TimeProcessor
+from scrape_jobs.program import Program
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+COLUMNS = ["scraped_time", "posted_time", "title", "url"]
+
+SCRAPED_TIME = datetime(2020, 2, 1, 12, 30, tzinfo=timezone.utc)
+
+
+class JobsCollector(ACollector):
+
+    def __init__(self, jobs: List[Dict[str, Any]]):
+        self.jobs = jobs
+
+    def collect_jobs(self) -> List[Dict[str, Any]]:
+        return list(self.jobs)
+
+
+def make_jobs(*numbers, scraped_time=SCRAPED_TIME) -> List[Dict[str, Any]]:
+    return [{"scraped_time": scraped_time,
+             "posted_time": SCRAPED_TIME - timedelta(hours=number),
+             "title": f"Title {number}",
+             "url": f"https://example.com/job/{number}"}
+            for number in numbers]
+
+
+def make_storage(tmp_path, compact_after_files=20) -> data_storage.ParquetJobsStorage:
+    return data_storage.ParquetJobsStorage(COLUMNS, str(tmp_path), "seek.com.au",
+                                           compact_after_files=compact_after_files)
+
+
+def read_rows(storage: data_storage.ParquetJobsStorage) -> List[Dict[str, Any]]:
+    files = [file for partition_files in storage.get_partition_files().values() for file in partition_files]
+    rows = [row for file in files for row in pq.read_table(str(file)).to_pylist()]
+    return sorted(rows, key=lambda row: row["url"])
+
+
+def test_stored_jobs_are_read_back_typed(tmp_path):
+    storage = make_storage(tmp_path)
+    jobs = make_jobs(1, 2) + make_jobs(3, scraped_time=SCRAPED_TIME + timedelta(days=1))
+    jobs[0]["title"] = None
+    storage.store_jobs(jobs)
+
+    assert read_rows(storage) == jobs
+    assert sorted(partition.name for partition in storage.get_partition_files()) == ["scrape_date=2020-02-01",
+                                                                                     "scrape_date=2020-02-02"]
+    assert storage.get_known_jobs_urls() == {job["url"] for job in jobs}
+
+
+def test_jobs_without_scraped_time_go_to_the_current_date(tmp_path):
+    storage = make_storage(tmp_path)
+    storage.store_jobs(make_jobs(1, scraped_time=None))
+
+    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    assert [partition.name for partition in storage.get_partition_files()] == [f"scrape_date={today}"]
+
+
+def test_program_stores_only_unknown_jobs(tmp_path):
+    storage = make_storage(tmp_path)
+    Program(JobsCollector(make_jobs(1, 2)), TimeProcessor("UTC"), storage).execute()
+    Program(JobsCollector(make_jobs(2, 3)), TimeProcessor("UTC"), storage).execute()
+
+    assert [row["url"] for row in read_rows(storage)] == [job["url"] for job in make_jobs(1, 2, 3)]
+
+
+def test_partition_files_are_compacted(tmp_path):
+    storage = make_storage(tmp_path, compact_after_files=2)
+    for number in range(5):
+        storage.store_jobs(make_jobs(number))
+
+    files = list(storage.get_partition_files().values())
+    assert [len(partition_files) for partition_files in files] == [1]
+    assert read_rows(storage) == make_jobs(0, 1, 2, 3, 4)
+    assert not list(tmp_path.rglob("*.tmp")) and not list(tmp_path.rglob(storage.MANIFEST_FILENAME))
+
+
+def test_interrupted_compaction_is_finished(tmp_path, monkeypatch):
+    storage = make_storage(tmp_path)
+    for number in range(3):
+        storage.store_jobs(make_jobs(number))
+
+    def crash(path):
+        raise KeyboardInterrupt(f"crashed before removing: {path}")
+
+    # the compacted file is already in place, the merged files are still there
+    with monkeypatch.context() as patch:
+        patch.setattr(data_storage.Path, "unlink", crash)
+        with pytest.raises(KeyboardInterrupt):
+            storage.compact()
+
+    storage = make_storage(tmp_path)
+    assert [len(partition_files) for partition_files in storage.get_partition_files().values()] == [1]
+    assert read_rows(storage) == make_jobs(0, 1, 2)
+    assert not list(tmp_path.rglob(storage.MANIFEST_FILENAME))
+
+
+def test_interrupted_compaction_is_rolled_back(tmp_path, monkeypatch):
+    storage = make_storage(tmp_path)
+    for number in range(3):
+        storage.store_jobs(make_jobs(number))
+    replace = data_storage.os.replace
+
+    def crash(src, dst):
+        if dst.endswith("-compacted.parquet"):
+            raise KeyboardInterrupt(f"crashed before replacing: {dst}")
+        replace(src, dst)
+
+    # the merged files are listed in the manifest, but the compacted file is not in place yet
+    with monkeypatch.context() as patch:
+        patch.setattr(data_storage.os, "replace", crash)
+        with pytest.raises(KeyboardInterrupt):
+            storage.compact()
+
+    storage = make_storage(tmp_path)
+    assert [len(partition_files) for partition_files in storage.get_partition_files().values()] == [3]
+    assert read_rows(storage) == make_jobs(0, 1, 2)
+    assert not list(tmp_path.rglob("*.tmp")) and not list(tmp_path.rglob(storage.MANIFEST_FILENAME))
@@ -0,0 +1,77 @@
+import pstats
+import threading
+import time
+
+import pytest
+
+from scrape_jobs import profiling
+
+
+def busy_work(seconds: float) -> int:
+    total = 0
+    end_time = time.perf_counter() + seconds
+    while time.perf_counter() < end_time:
+        total += sum(range(1000))
+    return total
+
+
+def read_collapsed(filepath: str):
+    """Get the (stack frames, count) of each line of the collapsed stacks file"""
+
+    stacks = []
+    with open(filepath, encoding="utf-8") as fp:
+        for line in fp:
+            stack, _, count = line.rstrip("\n").rpartition(" ")
+            assert stack and count.isdigit(), f"malformed line: {line}"
+            stacks.append((stack.split(";"), int(count)))
+    return stacks
+
+
+def test_cprofile_artifacts(tmp_path, capsys):
+    base_filepath = str(tmp_path.joinpath("seek_com_au"))
+    with profiling.profiled("cprofile", base_filepath, limit=5) as profiler:
+        busy_work(0.2)
+
+    assert isinstance(profiler, profiling.CProfileProfiler)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["seek_com_au.collapsed", "seek_com_au.prof"]
+    stats = pstats.Stats(str(tmp_path.joinpath("seek_com_au.prof"))).stats
+    assert any(name == "busy_work" for (_, _, name) in stats)
+
+    stacks = read_collapsed(str(tmp_path.joinpath("seek_com_au.collapsed")))
+    assert any(frame.startswith("busy_work (test_profiling.py:") for frames, _ in stacks for frame in frames)
+    # the self time (in microseconds) along the call paths adds up to (at most) the profiled time
+    assert 0 < sum(count for _, count in stacks) <= profiler.seconds * 1_000_000
+    assert "Top 5 hot spots of 'seek_com_au' (cprofile" in capsys.readouterr().out
+
+
+def test_sampling_artifacts(tmp_path, capsys):
+    base_filepath = str(tmp_path.joinpath("seek_com_au"))
+    with profiling.profiled("sampling", base_filepath) as profiler:
+        busy_work(0.2)
+
+    assert isinstance(profiler, profiling.SamplingProfiler)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["seek_com_au.collapsed"]
+    stacks = read_collapsed(str(tmp_path.joinpath("seek_com_au.collapsed")))
+    main_stacks = [frames for frames, _ in stacks if frames[0] == threading.main_thread().name]
+    assert any(frames[-1].startswith("busy_work (test_profiling.py:") for frames in main_stacks)
+    # the sampling thread does not sample itself
+    assert not any(frames[0] == "sampling-profiler" for frames, _ in stacks)
+    assert "busy_work" in capsys.readouterr().out
+
+
+def test_profile_is_saved_when_the_block_raises(tmp_path):
+    with pytest.raises(ValueError):
+        with profiling.profiled("cprofile", str(tmp_path.joinpath("run"))):
+            raise ValueError("run failed")
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["run.collapsed", "run.prof"]
+
+
+def test_not_profiled(tmp_path):
+    with profiling.profiled(None, str(tmp_path.joinpath("run"))) as profiler:
+        pass
+
+    assert profiler is None
+    assert not list(tmp_path.iterdir())
+    with pytest.raises(ValueError, match="Unknown profiler: 'other'"):
+        profiling.create_profiler("other")
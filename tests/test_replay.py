@@ -0,0 +1,82 @@
+from pathlib import Path
+
+import pytest
+from hed_utils.selenium import SharedDriver
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+from benchmarks.fixtures import FIXTURES, REPLAY_PAGES, write_snapshots
+from scrape_jobs.replay import ReplayDriver
+
+PAGES = 3
+CARDS_PER_PAGE = 10
+
+
+@pytest.fixture(params=sorted(REPLAY_PAGES))
+def site(request):
+    return request.param
+
+
+@pytest.fixture
+def snapshots(site, tmp_path):
+    return write_snapshots(site, str(tmp_path), PAGES, CARDS_PER_PAGE)
+
+
+@pytest.fixture
+def driver(snapshots):
+    driver = ReplayDriver(snapshots)
+    SharedDriver.set_instance(driver)
+    yield driver
+    SharedDriver.set_instance(None)
+
+
+def get_session_urls(site, snapshots):
+    parser = FIXTURES[site][0]()
+    urls = set()
+    for snapshot in snapshots:
+        document = parser.parse_document(Path(snapshot).read_text(encoding="utf-8"))
+        urls.update(parser.parse(tag)["url"] for tag in parser.find_all(document))
+    return urls
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_page_collects_the_whole_session(site, snapshots, driver, incremental):
+    page_cls, search_params = REPLAY_PAGES[site]
+    page = page_cls(dict(search_params), 36500, 3, incremental=incremental)
+
+    jobs = page.collect_jobs()
+
+    assert len(jobs) == PAGES * CARDS_PER_PAGE
+    assert {job["url"] for job in jobs} == get_session_urls(site, snapshots)
+    assert driver.snapshot_index == PAGES - 1
+    assert not driver.has_next_snapshot
+
+
+def test_url_search_skips_the_search_form(tmp_path):
+    page_cls, search_params = REPLAY_PAGES["seek.com.au"]
+    driver = ReplayDriver(write_snapshots("seek.com.au", str(tmp_path), PAGES, CARDS_PER_PAGE))
+    SharedDriver.set_instance(driver)
+    try:
+        jobs = page_cls(dict(search_params), 36500, 3, url_search=True).collect_jobs()
+    finally:
+        SharedDriver.set_instance(None)
+
+    assert len({job["url"] for job in jobs}) == PAGES * CARDS_PER_PAGE
+    # the first page is opened by url, the rest by clicking 'next' (submitting the form would reload the snapshot)
+    assert driver.snapshot_index == PAGES - 1
+    assert driver.page_loads == PAGES
+
+
+def test_search_form_is_served_as_virtual_elements(driver):
+    driver.get("https://example.com")
+    page_loads = driver.page_loads
+
+    keywords = driver.find_element(By.NAME, "keywords")
+    assert keywords.is_virtual and (keywords.text == "")
+    with pytest.raises(NoSuchElementException):
+        driver.find_element(By.ID, "missing")
+
+    # submitting the (virtual) form reloads the current snapshot, clicking other virtual elements does nothing
+    driver.find_element(By.CSS_SELECTOR, "button[data-automation='searchButton']").click()
+    keywords.click()
+    assert (driver.page_loads, driver.snapshot_index) == (page_loads + 1, 0)
@@ -0,0 +1,52 @@
+from urllib.parse import parse_qs, urlsplit
+
+from scrape_jobs.linkedin import LinkedinPage
+from scrape_jobs.seek import SeekPage
+
+
+def split_url(url: str):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}{parts.path}", parse_qs(parts.query)
+
+
+def test_seek_results_url():
+    url = SeekPage.build_results_url({"what": "Automation QA", "where": "All Sydney NSW"}, 1)
+
+    assert url == "https://www.seek.com.au/jobs?keywords=Automation%20QA&where=All%20Sydney%20NSW&sortmode=ListedDate"
+    assert split_url(url) == ("https://www.seek.com.au/jobs", {"keywords": ["Automation QA"],
+                                                               "where": ["All Sydney NSW"],
+                                                               "sortmode": ["ListedDate"]})
+
+
+def test_seek_results_url_paging():
+    params = {"what": "QA & Test", "where": "Sydney"}
+
+    assert "page" not in split_url(SeekPage.build_results_url(params, 1))[1]
+    _, query = split_url(SeekPage.build_results_url(params, 3))
+    assert query["page"] == ["3"]
+    assert query["keywords"] == ["QA & Test"]
+
+
+def test_seek_results_url_without_location():
+    _, query = split_url(SeekPage.build_results_url({"what": "QA"}, 1))
+
+    # the empty 'where' searches everywhere
+    assert "where" not in query
+    assert "where=&" in SeekPage.build_results_url({"what": "QA"}, 1)
+
+
+def test_linkedin_results_url():
+    params = {"keywords": "Automation", "location": "Sofia", "date_posted": " Past Week "}
+
+    base, query = split_url(LinkedinPage.build_results_url(params, 1))
+    assert base == "https://www.linkedin.com/jobs/search"
+    assert query == {"keywords": ["Automation"], "location": ["Sofia"], "sortBy": ["DD"], "f_TPR": ["r604800"]}
+
+    _, query = split_url(LinkedinPage.build_results_url(params, 3))
+    assert query["start"] == [str(2 * LinkedinPage.RESULTS_PER_PAGE)]
+
+
+def test_linkedin_results_url_any_time():
+    _, query = split_url(LinkedinPage.build_results_url({"keywords": "QA", "date_posted": "Any Time"}, 1))
+
+    assert "f_TPR" not in query
@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+from scrape_jobs import run_report
+
+
+class PerfCounter:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def perf_counter(monkeypatch) -> PerfCounter:
+    counter = PerfCounter()
+    monkeypatch.setattr(run_report, "perf_counter", counter)
+    return counter
+
+
+def get_phases(report: run_report.RunReport):
+    return {name: (phase["seconds"], phase["calls"]) for name, phase in report.to_dict()["phases"].items()}
+
+
+def test_nested_spans_add_to_own_phases(perf_counter):
+    report = run_report.RunReport("seek.com.au")
+    with report.span("program.collect"):
+        for _ in range(3):
+            perf_counter.now += 1.0
+            with report.span("collect.wait"):
+                perf_counter.now += 2.0
+            with report.span("collect.parse"):
+                perf_counter.now += 0.5
+
+    # the outer span covers the time of the inner ones too
+    assert get_phases(report) == {"program.collect": (10.5, 1), "collect.wait": (6.0, 3), "collect.parse": (1.5, 3)}
+
+
+def test_span_is_timed_when_it_raises(perf_counter):
+    report = run_report.RunReport()
+    with pytest.raises(ValueError):
+        with report.span("program.store"):
+            with report.span("store.upload"):
+                perf_counter.now += 1.0
+                raise ValueError("upload failed")
+
+    assert get_phases(report) == {"program.store": (1.0, 1), "store.upload": (1.0, 1)}
+
+
+def test_merged_worker_report(perf_counter):
+    report = run_report.RunReport()
+    with report.span("collect.wait"):
+        perf_counter.now += 1.0
+    report.count("pages")
+
+    worker = run_report.RunReport()
+    with worker.span("collect.wait"):
+        perf_counter.now += 2.0
+    worker.count("pages", 2)
+    worker.count("cards", 50)
+    report.merge(json.loads(json.dumps(worker.to_dict())))
+
+    assert get_phases(report) == {"collect.wait": (3.0, 2)}
+    assert report.counts == {"pages": 3, "cards": 50}
+
+
+def test_saved_report(perf_counter, tmp_path):
+    report = run_report.new_report("seek.com.au")
+    assert run_report.get_report() is report
+
+    with report.span("program.collect"):
+        perf_counter.now += 1.25
+    perf_counter.now += 0.25
+    report.finish(False, "collect", RuntimeError("collection failed"))
+    filepath = tmp_path.joinpath("report.json")
+    report.save(str(filepath))
+
+    data = json.loads(filepath.read_text(encoding="utf-8"))
+    assert {key: data[key] for key in ("site", "seconds", "succeeded", "failed_stage", "error")} == {
+        "site": "seek.com.au", "seconds": 1.5, "succeeded": False, "failed_stage": "collect",
+        "error": "RuntimeError: collection failed"}
+    assert data["phases"] == {"program.collect": {"seconds": 1.25, "calls": 1}}
+    assert "FAILED at 'collect'" in report.format_table()
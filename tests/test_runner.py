@@ -0,0 +1,92 @@
+from types import SimpleNamespace
+
+import pytest
+
+from scrape_jobs import runner
+from scrape_jobs.base.data_storage import (IndexedStorage, MemoryUrlIndex, ParquetJobsStorage, SqliteJobsStorage,
+                                           UrlIndex)
+from scrape_jobs.config import SheetsConfig, StorageConfig
+
+
+SHEETS_CONFIG = SheetsConfig(spreadsheet_title="", worksheet_title="", json_filepath="", sheets_chunk_size=500,
+                             sheets_max_retries=5, sheets_write_behind=False, sheets_urls_cache=False)
+
+
+def make_storage_config(tmp_path, **kwargs) -> StorageConfig:
+    values = dict(storage="sqlite", url_index=False, sqlite_filepath=str(tmp_path.joinpath("jobs.sqlite")),
+                  csv_index=False, parquet_dir=str(tmp_path.joinpath("parquet")))
+    values.update(kwargs)
+    return StorageConfig(**values)
+
+
+@pytest.fixture(autouse=True)
+def index_filepath(tmp_path, monkeypatch):
+    monkeypatch.setattr(runner, "get_index_filepath", lambda site: str(tmp_path.joinpath("urls.sqlite")))
+
+
+@pytest.mark.parametrize("storage, storage_cls", [("sqlite", SqliteJobsStorage), ("parquet", ParquetJobsStorage)])
+def test_prepare_storage_with_url_index(tmp_path, storage, storage_cls):
+    if storage == "parquet":
+        pytest.importorskip("pyarrow")
+
+    prepared = runner.prepare_storage("seek.com.au", make_storage_config(tmp_path, storage=storage, url_index=True),
+                                      SHEETS_CONFIG)
+
+    assert isinstance(prepared, IndexedStorage)
+    assert isinstance(prepared.storage, storage_cls)
+    assert isinstance(prepared.index, UrlIndex)
+    prepared.index.close()
+    if storage == "sqlite":
+        prepared.storage.close()
+
+
+def test_prepare_storage_without_url_index(tmp_path):
+    prepared = runner.prepare_storage("seek.com.au", make_storage_config(tmp_path, storage="sqlite"), SHEETS_CONFIG)
+
+    assert isinstance(prepared, SqliteJobsStorage)
+    prepared.close()
+
+
+def test_prepare_storage_unknown(tmp_path):
+    with pytest.raises(RuntimeError, match="Unknown storage"):
+        runner.prepare_storage("seek.com.au", make_storage_config(tmp_path, storage="unknown", url_index=True),
+                               SHEETS_CONFIG)
+
+
+def make_multi_search_collector(stop_after_known_pages: int) -> runner.MultiSearchCollector:
+    search_cfg = SimpleNamespace(searches=[{"what": "a"}, {"what": "b"}], search_workers=2,
+                                 stop_after_known_pages=stop_after_known_pages)
+    return runner.MultiSearchCollector("seek.com.au", search_cfg)
+
+
+def test_search_workers_get_sqlite_urls_by_path(tmp_path):
+    index = UrlIndex(str(tmp_path.joinpath("jobs-urls.sqlite")))
+    collector = make_multi_search_collector(stop_after_known_pages=2)
+    collector.set_known_jobs_urls(index)
+
+    assert collector.get_workers_known_urls() is index
+    index.close()
+
+
+def test_search_workers_get_copy_of_memory_urls():
+    known_jobs_urls = MemoryUrlIndex()
+    known_jobs_urls.update(["a", "b"])
+    collector = make_multi_search_collector(stop_after_known_pages=2)
+    collector.set_known_jobs_urls(known_jobs_urls)
+
+    copy = collector.get_workers_known_urls()
+    assert isinstance(copy, UrlIndex) and (set(copy) == {"a", "b"})
+
+    known_jobs_urls.update(["c"])
+    assert collector.get_workers_known_urls() is copy
+    assert set(copy) == {"a", "b", "c"}
+
+    collector.close()
+    assert not copy.filepath.exists()
+
+
+def test_search_workers_get_no_urls_when_not_stopping_at_known_pages():
+    collector = make_multi_search_collector(stop_after_known_pages=0)
+    collector.set_known_jobs_urls({"a", "b"})
+
+    assert collector.get_workers_known_urls() == set()
@@ -0,0 +1,317 @@
+import re
+import threading
+from typing import Any, Dict, List
+
+import pytest
+import requests
+from gspread.exceptions import APIError
+from hed_utils.support import google_spreadsheet
+
+from scrape_jobs.base.data_storage import GoogleSheetsJobsStorage, SheetsUploader
+
+COLUMNS = ["title", "url"]
+
+
+class FakeResponse:
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+
+    def json(self) -> Dict[str, Any]:
+        return self.data
+
+
+class FakeErrorResponse:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+        self.text = f"error {status_code}"
+
+    def json(self) -> Dict[str, Any]:
+        return {"error": {"code": self.status_code, "message": self.text, "status": "ERROR"}}
+
+
+def api_error(status_code: int) -> APIError:
+    return APIError(FakeErrorResponse(status_code))
+
+
+class FakeClient:
+    def __init__(self, spreadsheet: "FakeSpreadsheet"):
+        self.spreadsheet = spreadsheet
+
+    def request(self, method: str, endpoint: str, params: Dict[str, Any] = None) -> FakeResponse:
+        assert (method, endpoint.rsplit("/", 1)[-1], params) == ("get", self.spreadsheet.id, {"fields": "modifiedTime"})
+        return FakeResponse({"modifiedTime": f"edit-{self.spreadsheet.edits}"})
+
+
+class FakeSpreadsheet:
+    A1_RANGE_PATTERN = re.compile(r"^'((?:[^']|'')*)'!([A-Z]+)(\d+):([A-Z]+)$")
+
+    def __init__(self, worksheet: "FakeWorksheet"):
+        self.id = "spreadsheet-id"
+        self.worksheet = worksheet
+        self.client = FakeClient(self)
+        self.edits = 0
+
+    def fetch_sheet_metadata(self) -> Dict[str, Any]:
+        return {"sheets": [{"properties": {"sheetId": self.worksheet.id,
+                                           "gridProperties": {"rowCount": len(self.worksheet.rows)}}}]}
+
+    def values_get(self, a1_range: str) -> Dict[str, Any]:
+        match = self.A1_RANGE_PATTERN.match(a1_range)
+        assert match, f"invalid range: {a1_range}"
+        title, column, first_row, last_column = match.groups()
+        assert (title.replace("''", "'"), column) == (self.worksheet.title, last_column)
+
+        values = self.worksheet.col_values(ord(column) - ord("A") + 1)[int(first_row) - 1:]
+        return {"values": [[value] if value else [] for value in values]}
+
+
+class FakeWorksheet:
+    """In-memory stand-in of gspread Worksheet, 'failures' are raised (in order) by the named methods"""
+
+    def __init__(self, rows: List[List[str]] = None, title="Jobs"):
+        self.id = 7
+        self.title = title
+        self.rows = [list(row) for row in (rows or [])]
+        self.spreadsheet = FakeSpreadsheet(self)
+        self.failures = {}  # type: Dict[str, List[Exception]]
+        self.calls = []  # type: List[str]
+        self.unblocked = threading.Event()
+        self.unblocked.set()
+
+    def _call(self, name: str):
+        self.unblocked.wait(timeout=5)
+        self.calls.append(name)
+        failures = self.failures.get(name, [])
+        if failures:
+            raise failures.pop(0)
+
+    def col_values(self, col: int) -> List[str]:
+        self._call("col_values")
+        values = [row[col - 1] if len(row) >= col else "" for row in self.rows]
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+    def add_rows(self, rows: int):
+        self._call("add_rows")
+        self.rows.extend([] for _ in range(rows))
+        self.spreadsheet.edits += 1
+
+    def update_cells(self, cells: List[Any]):
+        self._call("update_cells")
+        for cell in cells:
+            self.edit(cell.row, cell.col, cell.value)
+
+    def edit(self, row: int, col: int, value: str):
+        while len(self.rows) < row:
+            self.rows.append([])
+        cells = self.rows[row - 1]
+        cells.extend("" for _ in range(col - len(cells)))
+        cells[col - 1] = value
+        self.spreadsheet.edits += 1
+
+    def delete_last_rows(self, count: int):
+        del self.rows[-count:]
+        self.spreadsheet.edits += 1
+
+    def urls(self) -> List[str]:
+        return [row[1] for row in self.rows[1:] if len(row) > 1]
+
+
+def make_jobs(*urls) -> List[Dict[str, str]]:
+    return [{"title": f"title of {url}", "url": url} for url in urls]
+
+
+@pytest.fixture
+def worksheet() -> FakeWorksheet:
+    return FakeWorksheet([COLUMNS])
+
+
+@pytest.fixture
+def make_storage(monkeypatch, worksheet):
+    def make_storage(**kwargs) -> GoogleSheetsJobsStorage:
+        monkeypatch.setattr(google_spreadsheet, "open_worksheet", lambda **_: worksheet)
+        return GoogleSheetsJobsStorage(COLUMNS, "Spreadsheet", worksheet.title, "credentials.json", **kwargs)
+
+    return make_storage
+
+
+def test_revision_changes_on_append(make_storage, worksheet):
+    storage = make_storage()
+    revision = storage.get_revision()
+
+    storage.store_jobs(make_jobs("a", "b"))
+    storage.flush()
+
+    assert worksheet.urls() == ["a", "b"]
+    assert storage.get_revision() != revision
+
+
+def test_revision_changes_on_edit_in_place(make_storage, worksheet):
+    storage = make_storage()
+    storage.store_jobs(make_jobs("a", "b"))
+    revision = storage.get_revision()
+
+    worksheet.edit(2, 2, "replaced")
+
+    assert len(worksheet.rows) == 3
+    assert storage.get_revision() != revision
+
+
+def make_rows(*urls) -> List[List[str]]:
+    return [[f"title of {url}", url] for url in urls]
+
+
+@pytest.mark.parametrize("err, retryable", [(api_error(429), True),
+                                            (api_error(500), True),
+                                            (api_error(503), True),
+                                            (api_error(400), False),
+                                            (api_error(403), False),
+                                            (ConnectionError(), True),
+                                            (TimeoutError(), True),
+                                            (requests.ConnectionError(), True),
+                                            (requests.Timeout(), True),
+                                            (ValueError(), False)])
+def test_uploader_is_retryable(err, retryable):
+    assert SheetsUploader.is_retryable(err) is retryable
+
+
+def test_uploader_appends_in_chunks(worksheet):
+    uploader = SheetsUploader(worksheet, chunk_size=2, backoff_seconds=0)
+    uploader.upload(make_rows("a", "b", "c", "d", "e"))
+    uploader.upload(make_rows("f"))
+
+    assert worksheet.urls() == ["a", "b", "c", "d", "e", "f"]
+    assert worksheet.calls.count("add_rows") == 4
+    assert worksheet.calls.count("col_values") == 1  # the next row is read only once
+    assert uploader.uploaded_rows == 6
+
+
+def test_uploader_retries_quota_and_server_errors(worksheet):
+    worksheet.failures = {"update_cells": [api_error(429), api_error(500)], "add_rows": [api_error(503)]}
+    uploader = SheetsUploader(worksheet, max_retries=3, backoff_seconds=0)
+    uploader.upload(make_rows("a", "b"))
+
+    assert worksheet.urls() == ["a", "b"]
+    assert uploader.retries == 3
+
+
+def test_uploader_gives_up_after_max_retries(worksheet):
+    worksheet.failures = {"update_cells": [api_error(429)] * 3}
+    uploader = SheetsUploader(worksheet, max_retries=2, backoff_seconds=0)
+
+    with pytest.raises(APIError):
+        uploader.upload(make_rows("a"))
+    assert worksheet.calls.count("update_cells") == 3
+    assert uploader.retries == 2
+
+
+def test_uploader_does_not_retry_other_errors(worksheet):
+    worksheet.failures = {"update_cells": [api_error(400)]}
+    uploader = SheetsUploader(worksheet, max_retries=5, backoff_seconds=0)
+
+    with pytest.raises(APIError):
+        uploader.upload(make_rows("a"))
+    assert (worksheet.calls.count("update_cells"), uploader.retries) == (1, 0)
+
+
+def test_write_behind_uploads_in_order(worksheet):
+    uploader = SheetsUploader(worksheet, chunk_size=2, backoff_seconds=0, write_behind=True)
+    for url in "abcde":
+        uploader.upload(make_rows(url))
+    uploader.flush()
+
+    assert worksheet.urls() == list("abcde")
+
+
+def test_write_behind_skips_uploads_after_failure(worksheet):
+    worksheet.failures = {"update_cells": [api_error(400)]}
+    uploader = SheetsUploader(worksheet, max_retries=0, backoff_seconds=0, write_behind=True)
+    worksheet.unblocked.clear()
+    uploader.upload(make_rows("a"))
+    uploader.upload(make_rows("b"))  # queued behind the failing upload
+    worksheet.unblocked.set()
+
+    with pytest.raises(APIError):
+        uploader.flush()
+    assert worksheet.urls() == []
+    assert worksheet.calls.count("update_cells") == 1
+
+    uploader.upload(make_rows("c"))  # starts over after the reported failure
+    uploader.flush()
+    assert worksheet.urls() == ["c"]
+
+
+@pytest.fixture
+def make_cached_storage(make_storage, tmp_path):
+    def make_cached_storage() -> GoogleSheetsJobsStorage:
+        return make_storage(urls_cache_filepath=str(tmp_path.joinpath("urls.json")))
+
+    return make_cached_storage
+
+
+def sync(storage: GoogleSheetsJobsStorage, worksheet: FakeWorksheet) -> List[str]:
+    worksheet.calls.clear()
+    return storage.sync_urls_column()
+
+
+def test_sync_urls_column_fetches_only_appended_rows(make_cached_storage, worksheet):
+    storage = make_cached_storage()
+    storage.store_jobs(make_jobs("a", "b"))
+    assert sync(storage, worksheet) == ["url", "a", "b"]
+
+    storage.store_jobs(make_jobs("c"))
+    storage = make_cached_storage()  # the cache is kept in the file
+    assert sync(storage, worksheet) == ["url", "a", "b", "c"]
+    assert storage.get_known_jobs_urls() == {"url", "a", "b", "c"}
+
+
+def test_sync_urls_column_fetches_from_last_cached_row(make_cached_storage, worksheet, monkeypatch):
+    storage = make_cached_storage()
+    storage.store_jobs(make_jobs("a", "b"))
+    sync(storage, worksheet)
+
+    ranges = []
+    values_get = worksheet.spreadsheet.values_get
+
+    def recording_values_get(a1_range: str):
+        ranges.append(a1_range)
+        return values_get(a1_range)
+
+    monkeypatch.setattr(worksheet.spreadsheet, "values_get", recording_values_get)
+    storage.store_jobs(make_jobs("c"))
+    sync(storage, worksheet)
+
+    assert ranges == ["'Jobs'!B3:B"]
+
+
+def test_sync_urls_column_after_sheet_shrunk(make_cached_storage, worksheet):
+    storage = make_cached_storage()
+    storage.store_jobs(make_jobs("a", "b", "c"))
+    sync(storage, worksheet)
+
+    worksheet.delete_last_rows(2)
+    assert sync(storage, worksheet) == ["url", "a"]
+
+    storage = make_cached_storage()
+    storage.store_jobs(make_jobs("d"))
+    assert sync(storage, worksheet) == ["url", "a", "d"]
+
+
+def test_sync_urls_column_after_last_row_edited(make_cached_storage, worksheet):
+    storage = make_cached_storage()
+    storage.store_jobs(make_jobs("a", "b"))
+    sync(storage, worksheet)
+
+    worksheet.edit(3, 2, "replaced")
+    storage.store_jobs(make_jobs("c"))
+    assert sync(storage, worksheet) == ["url", "a", "replaced", "c"]
+
+
+def test_sync_urls_column_of_worksheet_with_quote_in_title(make_cached_storage, worksheet):
+    worksheet.title = "Bob's jobs"
+    storage = make_cached_storage()
+    storage.store_jobs(make_jobs("a"))
+
+    assert sync(storage, worksheet) == ["url", "a"]
+    assert storage.get_urls_range(2) == ["a"]
@@ -0,0 +1,82 @@
+import sqlite3
+from typing import Dict, List
+
+import pytest
+
+from scrape_jobs.base.data_storage import SqliteJobsStorage
+
+COLUMNS = ["title", "url", "posted_time"]
+
+
+def make_jobs(*urls, title="title") -> List[Dict[str, str]]:
+    return [{"title": f"{title} of {url}", "url": url, "posted_time": f"2020-01-{number + 1:02d}"}
+            for number, url in enumerate(urls)]
+
+
+@pytest.fixture
+def filepath(tmp_path) -> str:
+    return str(tmp_path.joinpath("jobs.sqlite"))
+
+
+@pytest.fixture
+def storage(filepath):
+    storage = SqliteJobsStorage(COLUMNS, filepath, "seek_com_au")
+    storage.init_table()
+    yield storage
+    storage.close()
+
+
+def read_rows(filepath: str, table: str) -> List[tuple]:
+    with sqlite3.connect(filepath) as connection:
+        return connection.execute(f'SELECT title, url, posted_time FROM "{table}" ORDER BY rowid').fetchall()
+
+
+def test_stored_jobs_are_read_back(storage, filepath):
+    jobs = make_jobs("https://example.com/1", "https://example.com/2")
+    storage.store_jobs(jobs)
+
+    assert read_rows(filepath, "seek_com_au") == [tuple(job[column] for column in COLUMNS) for job in jobs]
+    assert set(storage.get_known_jobs_urls()) == {"https://example.com/1", "https://example.com/2"}
+    assert "https://example.com/1" in storage.get_known_jobs_urls()
+    assert "https://example.com/3" not in storage.get_known_jobs_urls()
+
+
+def test_jobs_with_stored_url_are_ignored(storage, filepath):
+    storage.store_jobs(make_jobs("https://example.com/1", "https://example.com/2"))
+    storage.store_jobs(make_jobs("https://example.com/2", "https://example.com/3", title="changed"))
+
+    # the first stored row of each url is kept
+    assert [row[0] for row in read_rows(filepath, "seek_com_au")] == ["title of https://example.com/1",
+                                                                      "title of https://example.com/2",
+                                                                      "changed of https://example.com/3"]
+    assert len(storage.get_known_jobs_urls()) == 3
+
+
+def test_sites_have_own_tables(storage, filepath):
+    other = SqliteJobsStorage(COLUMNS, filepath, "linkedin_com")
+    other.init_table()
+    other.store_jobs(make_jobs("https://example.com/other"))
+    storage.store_jobs(make_jobs("https://example.com/1"))
+
+    assert set(other.get_known_jobs_urls()) == {"https://example.com/other"}
+    assert set(storage.get_known_jobs_urls()) == {"https://example.com/1"}
+    other.close()
+
+
+def test_revision_changes_on_store(storage, filepath):
+    revision = storage.get_revision()
+    storage.store_jobs(make_jobs("https://example.com/1"))
+    assert storage.get_revision() != revision
+
+    revision = storage.get_revision()
+    storage.store_jobs(make_jobs("https://example.com/1"))
+    assert storage.get_revision() == revision
+
+    reopened = SqliteJobsStorage(COLUMNS, filepath, "seek_com_au")
+    assert reopened.get_revision() == revision
+    reopened.close()
+
+
+def test_url_column_is_required(filepath):
+    with pytest.raises(ValueError, match="'url' column is required"):
+        SqliteJobsStorage(["title"], filepath, "seek_com_au")
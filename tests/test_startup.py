@@ -0,0 +1,69 @@
+import subprocess
+import sys
+from configparser import ConfigParser
+
+import pytest
+
+from scrape_jobs import __version__
+from scrape_jobs.config import get_sample_contents
+
+CLI_MODULES = ["scrape_jobs.cli.jobs_scraper",
+               "scrape_jobs.cli.jobs_daemon",
+               "scrape_jobs.cli.config_initializer",
+               "scrape_jobs.cli.csv_compactor"]
+
+# needed only once the run starts, so must not be imported for '--version'
+HEAVY_MODULES = {"selenium", "gspread", "pyarrow", "bs4", "requests"}
+
+
+def get_imported_modules(stderr: str):
+    """Names of the modules listed by '-X importtime' (one 'import time: self | cumulative | name' line each)"""
+
+    lines = [line.split("|")[-1] for line in stderr.splitlines() if line.startswith("import time:")]
+    return {line.strip() for line in lines[1:]}  # the first line is the header
+
+
+@pytest.mark.parametrize("module", CLI_MODULES)
+def test_version_does_not_import_heavy_modules(module):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-m", module, "--version"],
+                            stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE,
+                            universal_newlines=True)
+
+    assert result.returncode == 0, result.stderr
+    assert __version__ in result.stdout
+    imported = get_imported_modules(result.stderr)
+    assert "scrape_jobs" in imported
+    assert {name.split(".")[0] for name in imported} & HEAVY_MODULES == set()
+
+
+def test_base_submodules_are_imported_on_use():
+    script = ("import sys, scrape_jobs.base as base; "
+              "assert 'scrape_jobs.base.data_storage' not in sys.modules; "
+              "assert base.data_storage.SqliteJobsStorage; "
+              "assert 'scrape_jobs.base.data_storage' in sys.modules")
+    result = subprocess.run([sys.executable, "-c", script], stderr=subprocess.PIPE, universal_newlines=True)
+
+    assert result.returncode == 0, result.stderr
+
+
+@pytest.mark.parametrize("site", ["linkedin.com", "seek.com.au"])
+def test_http_collector_does_not_import_selenium(site, tmp_path):
+    parser = ConfigParser(interpolation=None)
+    parser.read_string(get_sample_contents().decode("utf-8"))
+    parser.set("DEFAULT", "driver_headless", "yes")
+    parser.set("DEFAULT", "collector", "http")
+    configfile = tmp_path.joinpath("config.ini")
+    with configfile.open(mode="w") as fp:
+        parser.write(fp)
+
+    script = ("import sys; from scrape_jobs import runner; "
+              f"search_cfg = runner.read_config({site!r}, {str(configfile)!r}).search_config; "
+              f"collector = runner.prepare_collector({site!r}, search_cfg); "
+              "assert type(collector).__name__ == 'HttpCollector', collector; "
+              "assert collector.build_url(search_cfg.search_params, 2).startswith('https://'); "
+              "collector.close(); "
+              "assert not [name for name in sys.modules if name.split('.')[0] == 'selenium'], 'selenium imported'")
+    result = subprocess.run([sys.executable, "-c", script], stderr=subprocess.PIPE, universal_newlines=True)
+
+    assert result.returncode == 0, result.stderr